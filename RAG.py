@@ -5,12 +5,24 @@ Manages ChromaDB vector stores for multiple document collections.
 Each PDF / subject gets its own collection, allowing multi-subject coexistence.
 """
 
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+from embedding_scheduler import EmbeddingScheduler, ScheduledEmbeddings
+from embedding_backends import backend_key, make_embeddings
+from retrieval_cache import RetrievalCache
+from page_cache import PageCache
+from lexical_index import LexicalIndexStore, reciprocal_rank_fusion
+from collection_router import CollectionRouter
+from reranking import mmr_select, threshold_select
+from compact_index import CompactIndexStore
+from vector_session import VectorSession
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from ingest_pipeline import run_pipeline
+from chunking import make_splitter
 from dotenv import load_dotenv
 import yaml
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import os
 import re
 
@@ -35,13 +47,148 @@ persist_directory = os.path.abspath(
 )
 default_collection = _rag_cfg.get("default_collection")
 embedding_model = _rag_cfg.get("embedding_model", "text-embedding-3-small")
+embedding_backend = _rag_cfg.get("embedding_backend", "openai")   # openai | local | hashed
+_backend_options = _rag_cfg.get(f"{embedding_backend}_embeddings", {})
+# Identifies backend + model in cache keys and chunk metadata.
+embedding_id = backend_key(embedding_backend, embedding_model, _backend_options)
 chunk_size = _rag_cfg.get("chunk_size", 1000)
 chunk_overlap = _rag_cfg.get("chunk_overlap", 200)
+_chunking_cfg = _rag_cfg.get("chunking", {})
+chunk_strategy = _chunking_cfg.get("strategy", "recursive")
+min_chunk_size = _chunking_cfg.get("min_chunk_size", 200)
+fallback_overlap = _chunking_cfg.get("fallback_overlap", 100)
+# Stored on every chunk; a file chunked with different settings is
+# re-chunked even if its bytes are unchanged.
+if chunk_strategy == "structured":
+    chunker_signature = f"{chunk_strategy}:{chunk_size}:{min_chunk_size}:{fallback_overlap}"
+else:
+    chunker_signature = f"{chunk_strategy}:{chunk_size}:{chunk_overlap}"
 retrieval_k = _rag_cfg.get("retrieval_k", 5)
+default_search_type = _rag_cfg.get("search_type", "similarity")   # similarity | mmr | threshold | bm25 | hybrid
+hybrid_fetch_k = _rag_cfg.get("hybrid_fetch_k", 20)
+mmr_fetch_k = _rag_cfg.get("mmr_fetch_k", 20)
+mmr_lambda = _rag_cfg.get("mmr_lambda", 0.5)
+score_threshold = _rag_cfg.get("score_threshold", 0.35)
+SEARCH_TYPES = ("similarity", "mmr", "threshold", "bm25", "hybrid")
+# Temporary collections used by reindex.py while swapping.
+REINDEX_SUFFIXES = ("__reindex", "__old")
+fanout_workers = _rag_cfg.get("fanout_workers", 8)
+_context_cfg = _rag_cfg.get("context_packing", {})
+context_packing = _context_cfg.get("enabled", True)
+context_max_tokens = _context_cfg.get("max_tokens", 1500)
+context_merge_gap = _context_cfg.get("merge_gap", 200)
+index_dir = os.path.abspath(_rag_cfg.get("index_dir", "./.indexes"))
+_ingest_cfg = _rag_cfg.get("ingest", {})
+ingest_max_jobs = _ingest_cfg.get("max_concurrent_jobs", 1)
 
 # Legacy alias so existing imports don't break
 collection_name = default_collection
 
+_embedding_cache_cfg = _rag_cfg.get("embedding_cache", {})
+embedding_cache = None
+if _embedding_cache_cfg.get("enabled", True):
+    embedding_cache = EmbeddingCache(
+        os.path.abspath(_embedding_cache_cfg.get("path", "./.cache/embeddings.sqlite")),
+        max_size_mb=_embedding_cache_cfg.get("max_size_mb", 512),
+    )
+
+
+_scheduler_cfg = _rag_cfg.get("embedding_scheduler", {})
+_embedding_scheduler = None
+
+
+def _get_embedding_scheduler() -> EmbeddingScheduler:
+    """Process-wide scheduler so concurrent ingests share one request budget."""
+    global _embedding_scheduler
+    if _embedding_scheduler is None:
+        _embedding_scheduler = EmbeddingScheduler(
+            _base_embeddings().embed_documents,
+            max_batch_tokens=_scheduler_cfg.get("max_batch_tokens", 8000),
+            max_batch_items=_scheduler_cfg.get("max_batch_items", 256),
+            concurrency=_scheduler_cfg.get("concurrency", 4),
+            max_retries=_scheduler_cfg.get("max_retries", 6),
+        )
+    return _embedding_scheduler
+
+
+_base_client = None
+
+
+def _base_embeddings():
+    """The configured backend's embeddings, created once and shared.
+
+    The OpenAI client is built without SDK retries: rate-limit backoff is
+    owned by the embedding scheduler, which wraps this same client.
+    """
+    global _base_client
+    if _base_client is None:
+        openai_kwargs = {"max_retries": 0} if embedding_backend == "openai" else {}
+        _base_client = make_embeddings(embedding_backend, embedding_model, _backend_options, **openai_kwargs)
+    return _base_client
+
+
+def _embeddings():
+    """Embeddings for ingest and queries — cache first, then the backend.
+
+    Remote (OpenAI) requests go through the batching / rate-limit scheduler;
+    a query shares its backoff but skips the batching queue.  Local
+    backends batch on the CPU themselves.
+    """
+    embeddings = _base_embeddings()
+    if embedding_backend == "openai":
+        embeddings = ScheduledEmbeddings(embeddings, _get_embedding_scheduler())
+    if embedding_cache is None:
+        return embeddings
+    return CachedEmbeddings(embeddings, embedding_cache, embedding_id)
+
+
+def _index_dimension(coll_name: str) -> int | None:
+    """Vector dimension from the compact index or routing summary, if either exists."""
+    return compact_indexes.dimension(coll_name) or collection_router.dimension(coll_name)
+
+
+# One Chroma client + bounded LRU of collection handles for the whole process.
+_session_cfg = _rag_cfg.get("vector_session", {})
+vector_session = VectorSession(
+    persist_directory,
+    _embeddings,
+    max_collections=_session_cfg.get("max_collections", 16),
+    memory_budget_mb=_session_cfg.get("memory_budget_mb", 1024),
+    dimension_hint=_index_dimension,
+)
+
+lexical_indexes = LexicalIndexStore(os.path.join(index_dir, "bm25"))
+# Int8 indexes for collections listed under rag.compact ("*" = all).
+_compact_cfg = _rag_cfg.get("compact", {})
+compact_collections = set(_compact_cfg.get("collections") or [])
+compact_rerank_k = _compact_cfg.get("rerank_k", 50)
+compact_indexes = CompactIndexStore(os.path.join(index_dir, "compact"))
+
+# An evicted collection's BM25 / compact index is reloaded from disk on next use.
+vector_session.add_eviction_listener(lexical_indexes.release)
+vector_session.add_eviction_listener(compact_indexes.release)
+collection_router = CollectionRouter(
+    os.path.join(index_dir, "router"),
+    keyword_weight=_rag_cfg.get("router_keyword_weight", 0.1),
+)
+
+_page_cache_cfg = _rag_cfg.get("page_cache", {})
+page_cache = None
+if _page_cache_cfg.get("enabled", True):
+    page_cache = PageCache(
+        os.path.abspath(_page_cache_cfg.get("path", "./.cache/pages.sqlite")),
+        max_size_mb=_page_cache_cfg.get("max_size_mb", 256),
+    )
+
+_retrieval_cache_cfg = _rag_cfg.get("retrieval_cache", {})
+retrieval_cache = None
+if _retrieval_cache_cfg.get("enabled", True):
+    retrieval_cache = RetrievalCache(
+        os.path.abspath(_retrieval_cache_cfg.get("path", "./.cache/retrieval.sqlite")),
+        ttl_seconds=_retrieval_cache_cfg.get("ttl_seconds", 86400),
+        max_entries=_retrieval_cache_cfg.get("max_entries", 5000),
+    )
+
 # ---------------------------------------------------------------------------
 # Collection name utilities
 # ---------------------------------------------------------------------------
@@ -67,19 +214,17 @@ def collection_name_from_filename(filename: str) -> str:
 
 
 def list_collections() -> list[str]:
-    """Return names of all existing ChromaDB collections."""
-    import chromadb
-    client = chromadb.PersistentClient(path=persist_directory)
-    return [c.name for c in client.list_collections()]
+    """Return names of all existing ChromaDB collections.
+
+    Shadow collections that ``reindex.py`` is building are left out.
+    """
+    return [c for c in vector_session.list_collections() if not c.endswith(REINDEX_SUFFIXES)]
 
 
 # ---------------------------------------------------------------------------
-# Retriever cache  (collection_name -> retriever)
+# Retrievers  (backed by the shared vector session)
 # ---------------------------------------------------------------------------
 
-_retrievers: dict = {}
-
-
 def get_retriever(coll_name: str | None = None):
     """Get a retriever for a given collection.
 
@@ -91,60 +236,455 @@ def get_retriever(coll_name: str | None = None):
     Returns
     -------
     A LangChain retriever backed by the specified Chroma collection.
+    ``threshold``, ``bm25`` and ``hybrid`` modes go through ``retrieve()``,
+    so ``rag.score_threshold`` is a cosine similarity from either entry point.
     """
     coll = coll_name
     if not coll:
         raise ValueError("Collection name is required for get_retriever().")
-    if coll not in _retrievers:
-        embeddings = OpenAIEmbeddings(model=embedding_model)
-        vectorstore = Chroma(
-            persist_directory=persist_directory,
-            collection_name=coll,
-            embedding_function=embeddings,
-        )
-        _retrievers[coll] = vectorstore.as_retriever(
-            search_type="similarity", search_kwargs={"k": retrieval_k}
+    if default_search_type in ("threshold", "bm25", "hybrid"):
+        # LangChain's score threshold applies to its own relevance score,
+        # not the cosine similarity retrieve() uses, so the same
+        # rag.score_threshold would cut off differently; bm25 / hybrid
+        # have no LangChain equivalent at all.
+        return CollectionRetriever(coll_name=coll, search_type=default_search_type, k=retrieval_k)
+    vectorstore = vector_session.vectorstore(coll)
+    if default_search_type == "mmr":
+        return vectorstore.as_retriever(
+            search_type="mmr",
+            search_kwargs={"k": retrieval_k, "fetch_k": mmr_fetch_k, "lambda_mult": mmr_lambda},
         )
-    return _retrievers[coll]
+    return vectorstore.as_retriever(
+        search_type="similarity", search_kwargs={"k": retrieval_k}
+    )
+
+
+class CollectionRetriever(BaseRetriever):
+    """LangChain retriever backed by ``retrieve()`` (same scoring and cache)."""
+
+    coll_name: str
+    search_type: str
+    k: int
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> list[Document]:
+        return retrieve(self.coll_name, query, self.k, self.search_type)
+
+
+def _fetch_by_ids(vectorstore, ids: list[str]) -> list[Document] | None:
+    """Fetch chunks by ID in the given order; ``None`` if any has gone."""
+    if not ids:
+        return []
+    got = vectorstore.get(ids=ids, include=["documents", "metadatas"])
+    by_id = {
+        cid: Document(page_content=text, metadata=meta or {}, id=cid)
+        for cid, text, meta in zip(got["ids"], got["documents"], got["metadatas"])
+    }
+    if len(by_id) != len(ids):
+        return None
+    return [by_id[cid] for cid in ids]
+
+
+def is_compact(coll_name: str) -> bool:
+    """True if dense search for *coll_name* uses the int8 compact index."""
+    return "*" in compact_collections or coll_name in compact_collections
+
+
+def _rebuild_indexes(coll_name: str, vectorstore):
+    """Rebuild the collection's derived indexes (BM25, routing summary and,
+    for compact collections, the int8 index).
+
+    Returns the new BM25 index.
+    """
+    got = vectorstore.get(include=["documents", "metadatas", "embeddings"])
+    collection_router.update(coll_name, got["embeddings"], got["documents"])
+    if is_compact(coll_name):
+        compact_indexes.build(coll_name, got["ids"], got["embeddings"])
+    else:
+        compact_indexes.drop(coll_name)
+    return lexical_indexes.build(coll_name, got["ids"], got["documents"], got["metadatas"])
+
+
+def _lexical_index(coll_name: str):
+    """BM25 index for a collection, built on first use for older collections."""
+    index = lexical_indexes.get(coll_name)
+    if index is None:
+        index = _rebuild_indexes(coll_name, vector_session.vectorstore(coll_name))
+    return index
+
+
+def route(query: str, limit: int | None = None) -> list[tuple[str, float]]:
+    """Rank collections by relevance to *query*, best first.
+
+    Uses each collection's centroid + keyword summary, so no vector index
+    is searched.  Collections ingested before routing existed get their
+    summary built on first use.
+    """
+    names = set(list_collections())
+    for name in names - set(collection_router.collections()):
+        _rebuild_indexes(name, vector_session.vectorstore(name))
+    vector = vector_session.embeddings.embed_query(query)
+    ranked = [hit for hit in collection_router.rank(vector, query) if hit[0] in names]
+    return ranked[:limit] if limit else ranked
+
+
+def _lexical_search(coll_name: str, query: str, k: int) -> list[Document]:
+    index = _lexical_index(coll_name)
+    return [
+        Document(page_content=index.texts[i], metadata=index.metadatas[i], id=index.ids[i])
+        for i, _score in index.search(query, k)
+    ]
 
 
-def setup_retriever(pdf_path: str, coll_name: str | None = None):
+def _compact_index(coll_name: str):
+    """Compact index for a compact collection, built on first use; else ``None``."""
+    if not is_compact(coll_name):
+        return None
+    index = compact_indexes.get(coll_name)
+    if index is None:
+        _rebuild_indexes(coll_name, vector_session.vectorstore(coll_name))
+        index = compact_indexes.get(coll_name)
+    return index
+
+
+def _compact_search(coll_name: str, vectorstore, vector, k: int):
+    """``(docs, float vectors, cosine scores)`` from the compact index, or
+    ``None`` if the collection isn't compact or the index is stale."""
+    index = _compact_index(coll_name)
+    if index is None:
+        return None
+    hits = index.search(vector, k, compact_rerank_k)
+    rows = [row for row, _score in hits]
+    docs = _fetch_by_ids(vectorstore, [index.ids[row] for row in rows])
+    if docs is None:
+        return None
+    return docs, index.vectors[rows], [score for _row, score in hits]
+
+
+def _dense_candidates(coll_name: str, vectorstore, query: str, fetch_k: int):
+    """Embed *query* and fetch *fetch_k* nearest chunks with their embeddings."""
+    vector = vector_session.embeddings.embed_query(query)
+    compact = _compact_search(coll_name, vectorstore, vector, fetch_k)
+    if compact is not None:
+        docs, embeddings, _scores = compact
+        return vector, docs, embeddings
+    got = vectorstore._collection.query(
+        query_embeddings=[vector],
+        n_results=fetch_k,
+        include=["documents", "metadatas", "embeddings"],
+    )
+    docs = [
+        Document(page_content=text, metadata=meta or {}, id=cid)
+        for cid, text, meta in zip(got["ids"][0], got["documents"][0], got["metadatas"][0])
+    ]
+    return vector, docs, got["embeddings"][0]
+
+
+def _similarity_search(coll_name: str, vectorstore, query: str, k: int) -> list[Document]:
+    if is_compact(coll_name):
+        return _dense_candidates(coll_name, vectorstore, query, k)[1]
+    return vectorstore.similarity_search(query, k=k)
+
+
+def retrieve(
+    coll_name: str,
+    query: str,
+    k: int | None = None,
+    search_type: str | None = None,
+) -> list[Document]:
+    """Top-*k* chunks for *query* from a collection.
+
+    Parameters
+    ----------
+    coll_name : str
+        Collection to search.
+    query : str
+        Natural-language or keyword query.
+    k : int, optional
+        Number of chunks.  Defaults to ``rag.retrieval_k``.
+    search_type : str, optional
+        ``"similarity"`` (dense vectors), ``"mmr"`` (dense, re-ranked for
+        diversity with maximal marginal relevance), ``"threshold"`` (dense,
+        only chunks with cosine similarity >= ``rag.score_threshold`` — may
+        return nothing), ``"bm25"`` (local keyword index — no embedding
+        call) or ``"hybrid"`` (dense + bm25, fused with reciprocal rank
+        fusion).  Defaults to ``rag.search_type``.
+
+    All modes except bm25 go through the result cache: a hit skips the
+    query embedding and vector search, and chunks are fetched by ID.
+    Results are invalidated automatically when the collection is re-ingested.
+    """
+    k = k or retrieval_k
+    mode = search_type or default_search_type
+    if mode not in SEARCH_TYPES:
+        raise ValueError(f"Unknown search_type '{mode}' (expected one of {', '.join(SEARCH_TYPES)})")
+
+    if mode == "bm25":
+        return _lexical_search(coll_name, query, k)
+    # Re-ranking parameters are part of the cache key.
+    cache_mode = {
+        "mmr": f"mmr:{mmr_fetch_k}:{mmr_lambda}",
+        "threshold": f"threshold:{score_threshold}",
+    }.get(mode, mode)
+
+    vectorstore = vector_session.vectorstore(coll_name)
+    if retrieval_cache is not None:
+        ids = retrieval_cache.get(coll_name, query, k, cache_mode)
+        if ids is not None:
+            docs = _fetch_by_ids(vectorstore, ids)
+            if docs is not None:
+                return docs
+
+    if mode == "hybrid":
+        fetch_k = max(k, hybrid_fetch_k)
+        dense = _similarity_search(coll_name, vectorstore, query, fetch_k)
+        lexical = _lexical_search(coll_name, query, fetch_k)
+        by_id = {d.id: d for d in lexical}
+        by_id.update({d.id: d for d in dense})
+        fused = reciprocal_rank_fusion([[d.id for d in dense], [d.id for d in lexical]])
+        docs = [by_id[doc_id] for doc_id, _score in fused[:k]]
+    elif mode == "mmr":
+        vector, candidates, embeddings = _dense_candidates(coll_name, vectorstore, query, max(k, mmr_fetch_k))
+        docs = [candidates[i] for i in mmr_select(vector, embeddings, k, mmr_lambda)]
+    elif mode == "threshold":
+        vector, candidates, embeddings = _dense_candidates(coll_name, vectorstore, query, k)
+        docs = [candidates[i] for i in threshold_select(vector, embeddings, k, score_threshold)]
+    else:
+        docs = _similarity_search(coll_name, vectorstore, query, k)
+
+    if retrieval_cache is not None and all(d.id for d in docs):
+        retrieval_cache.put(coll_name, query, k, [d.id for d in docs], cache_mode)
+    return docs
+
+
+def retrieve_many(
+    query: str,
+    coll_names: list[str] | None = None,
+    k: int | None = None,
+) -> list[tuple[str, Document, float]]:
+    """Search several collections at once and merge the results.
+
+    The query is embedded once; every collection is then searched by vector
+    concurrently and the hits are merged by distance (all collections share
+    one embedding model, so distances are comparable).
+
+    Parameters
+    ----------
+    query : str
+        Natural-language query.
+    coll_names : list[str], optional
+        Collections to search.  Defaults to every collection.
+    k : int, optional
+        Total chunks to return across all collections.
+
+    Returns
+    -------
+    list of ``(collection, document, distance)``, closest first.
+    """
+    k = k or retrieval_k
+    names = coll_names or list_collections()
+    if not names:
+        return []
+    vector = vector_session.embeddings.embed_query(query)
+
+    def search(name: str):
+        vectorstore = vector_session.vectorstore(name)
+        compact = _compact_search(name, vectorstore, vector, k)
+        if compact is not None:
+            # Unit vectors: Chroma's default squared-L2 distance is 2 - 2cos.
+            docs, _vectors, scores = compact
+            return [(name, doc, 2.0 - 2.0 * score) for doc, score in zip(docs, scores)]
+        hits = vectorstore.similarity_search_by_vector_with_relevance_scores(vector, k=k)
+        return [(name, doc, distance) for doc, distance in hits]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(names), fanout_workers))) as pool:
+        results = [hit for hits in pool.map(search, names) for hit in hits]
+    results.sort(key=lambda hit: hit[2])
+    return results[:k]
+
+
+def _file_sha256(path: str) -> str:
+    """Return the SHA-256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def chunk_id(source: str, page: int, offset: int, text: str) -> str:
+    """Deterministic ID for a chunk: same file, position and text -> same ID.
+
+    Unchanged chunks keep their ID across re-ingests of an edited PDF, so
+    only new or modified chunks need to be written.
+    """
+    key = f"{source}\x00{page}\x00{offset}\x00{text}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def _owned_chunks(vectorstore, source: str) -> dict[str, dict]:
+    """Return ``{id: metadata}`` for chunks in the collection that came from *source*.
+
+    Chunks written before deterministic IDs existed carry no ``source_file``
+    key; they are matched on the loader's ``source`` path instead so that the
+    first incremental ingest also cleans up legacy duplicates.
+    """
+    existing = vectorstore.get(include=["metadatas"])
+    owned: dict[str, dict] = {}
+    for cid, meta in zip(existing["ids"], existing["metadatas"]):
+        meta = meta or {}
+        origin = meta.get("source_file") or os.path.basename(str(meta.get("source", "")))
+        if origin == source:
+            owned[cid] = meta
+    return owned
+
+
+def setup_retriever(
+    pdf_path: str,
+    coll_name: str | None = None,
+    progress=None,
+    should_cancel=None,
+    file_hash: str | None = None,
+):
     """Ingest a PDF and return a retriever for the new collection.
 
+    Ingestion is idempotent: every chunk gets a deterministic ID, so
+    re-ingesting only adds new / changed chunks and deletes chunks that no
+    longer exist in the PDF.  An unchanged file is skipped entirely.
+
+    This call blocks for the whole parse + embed; from async code go through
+    ``ingest_worker.get_ingest_worker().ingest(...)`` instead.
+
     Parameters
     ----------
     pdf_path : str
         Absolute path to the PDF to ingest.
     coll_name : str, optional
         Target collection name. If *None*, one is derived from the filename.
+    progress : callable, optional
+        Receives the running ``PipelineStats`` as pages and batches complete.
+    should_cancel : callable, optional
+        Polled during ingestion; returning ``True`` aborts with
+        ``IngestCancelled``.  Chunks written by the aborted run are removed,
+        so the collection is left as it was.
+    file_hash : str, optional
+        SHA-256 of the PDF, if already known.  With the pages in the page
+        cache the PDF itself need not exist (used by ``reindex.py``).
 
     Returns
     -------
     A LangChain retriever for the newly created / updated collection.
     """
     coll = coll_name or collection_name_from_filename(pdf_path)
-    embeddings = OpenAIEmbeddings(model=embedding_model)
+    embeddings = _embeddings()
+    source = os.path.basename(pdf_path)
+    file_hash = file_hash or _file_sha256(pdf_path)
 
-    loader = PyPDFLoader(pdf_path)
-    pages = loader.load()
+    # Chunks are upserted with precomputed vectors, so the shared handle
+    # (query embeddings) is fine for writing too.
+    vectorstore = vector_session.vectorstore(coll)
+    sample = vectorstore.get(limit=1, include=["metadatas"])["metadatas"]
+    # Chunks written before backends were pluggable are OpenAI ones.
+    stored_id = (sample[0] or {}).get("embedding", embedding_model) if sample else embedding_id
+    if stored_id != embedding_id:
+        raise ValueError(
+            f"Collection '{coll}' holds vectors from embedding backend '{stored_id}', "
+            f"but rag.embedding_backend is now '{embedding_id}'. Vectors from different "
+            "backends can't share a collection — rebuild it with `python reindex.py "
+            f"{coll}`."
+        )
+    owned = _owned_chunks(vectorstore, source)
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ".", " ", ""],
-    )
-    chunks = splitter.split_documents(pages)
+    if owned and all(
+        m.get("file_sha256") == file_hash and m.get("chunker") == chunker_signature
+        for m in owned.values()
+    ):
+        print(f"✅ Vector store '{coll}' already up to date ({len(owned)} chunks)")
+        if lexical_indexes.get(coll) is None or coll not in collection_router.collections():
+            _rebuild_indexes(coll, vectorstore)
+    else:
+        splitter = make_splitter(
+            chunk_strategy,
+            chunk_size,
+            chunk_overlap,
+            min_chunk_size=min_chunk_size,
+            fallback_overlap=fallback_overlap,
+        )
 
-    vectorstore = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        persist_directory=persist_directory,
-        collection_name=coll,
-    )
-    print(f"✅ Vector store '{coll}' created with {len(chunks)} chunks")
+        seen: set[str] = set()
+        written: list[str] = []
 
-    retriever = vectorstore.as_retriever(
-        search_type="similarity", search_kwargs={"k": retrieval_k}
-    )
-    _retrievers[coll] = retriever
-    return retriever
+        def assign_id(chunk):
+            cid = chunk_id(source, chunk.metadata.get("page", 0), chunk.metadata.get("start_index", 0), chunk.page_content)
+            chunk.metadata.update(
+                source_file=source, file_sha256=file_hash, chunker=chunker_signature, embedding=embedding_id,
+            )
+            if cid in seen:
+                return None
+            seen.add(cid)
+            return None if cid in owned else cid
+
+        def sink(ids, chunks, vectors):
+            vectorstore._collection.upsert(
+                ids=ids,
+                embeddings=vectors,
+                documents=[c.page_content for c in chunks],
+                metadatas=[c.metadata for c in chunks],
+            )
+            written.extend(ids)
+
+        try:
+            stats = run_pipeline(
+                pdf_path,
+                splitter,
+                embeddings,
+                sink,
+                assign_id,
+                workers=_ingest_cfg.get("workers", 4),
+                pages_per_task=_ingest_cfg.get("pages_per_task", 8),
+                batch_size=_ingest_cfg.get("embed_batch_size", 64),
+                concurrency=_ingest_cfg.get("embed_concurrency", 4),
+                progress=progress,
+                should_cancel=should_cancel,
+                page_cache=page_cache,
+                file_hash=file_hash,
+            )
+        except BaseException:
+            # Roll back the partial write — a half-ingested file would
+            # otherwise look "up to date" to the file-hash fast path.
+            if written:
+                vectorstore.delete(ids=written)
+            raise
+
+        kept = [cid for cid in owned if cid in seen]
+        stale = [cid for cid in owned if cid not in seen]
+        if stale:
+            vectorstore.delete(ids=stale)
+        if retrieval_cache is not None and (stats.embedded or stale):
+            retrieval_cache.invalidate(coll)
+        if kept:
+            # Metadata-only update so the unchanged-file fast path holds next time.
+            vectorstore._collection.update(
+                ids=kept,
+                metadatas=[
+                    {**owned[cid], "file_sha256": file_hash, "chunker": chunker_signature, "embedding": embedding_id}
+                    for cid in kept
+                ],
+            )
+        _rebuild_indexes(coll, vectorstore)
+        vector_session.invalidate(coll)
+
+        print(
+            f"✅ Vector store '{coll}' synced: {stats.embedded} added, "
+            f"{len(stale)} removed, {len(kept)} unchanged "
+            f"({stats.pages} pages in {stats.wall_s:.1f}s)"
+        )
+        if isinstance(embeddings, CachedEmbeddings):
+            print(f"   Embedding cache: {embeddings.hits} hit(s), {embeddings.misses} miss(es)")
+        if embedding_backend == "openai":
+            throughput = _get_embedding_scheduler().stats()
+            print(
+                f"   Embedding throughput: {throughput['chunks_per_s']} chunks/s, "
+                f"{throughput['tokens_per_s']} tokens/s ({throughput['rate_limited']} rate-limited)"
+            )
+
+    return get_retriever(coll)
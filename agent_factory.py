@@ -4,7 +4,7 @@ Agent factory — reusable creation of the LangGraph DeepAgent.
 Used by:
 - ``final_agent.py``  (interactive / CLI)
 - ``ambient.py``      (background cron)
-- ``server.py``       (web UI backend)
+- ``agent_pool.py``   (pre-built agent shared by the web UI backend)
 """
 
 import os
@@ -18,7 +18,7 @@ from langgraph.checkpoint.memory import MemorySaver
 
 from langchain.agents.middleware import ToolCallLimitMiddleware
 
-from multi_server_mcp_client import client as mcp_client
+from mcp_session import get_mcp_sessions
 from tools import (
     retrieval_tool,
     ingest_pdf_tool,
@@ -59,6 +59,7 @@ async def create_agent(
     checkpointer=None,
     model_name: str | None = None,
     temperature: float | None = None,
+    mcp_tools: list | None = None,
 ):
     """Create and return a fully-configured DeepAgent.
 
@@ -71,6 +72,8 @@ async def create_agent(
         Override the model from config (e.g. ``"openai:gpt-4o"``).
     temperature : float, optional
         Override temperature from config.
+    mcp_tools : list, optional
+        MCP tools to use; defaults to the session manager's cached tools.
 
     Returns
     -------
@@ -86,8 +89,9 @@ async def create_agent(
     if checkpointer is None:
         checkpointer = MemorySaver()
 
-    # Fetch MCP tools (Anki)
-    mcp_tools = await mcp_client.get_tools()
+    # MCP tools (Anki) — cached schemas, calls go over a persistent session
+    if mcp_tools is None:
+        mcp_tools = await get_mcp_sessions().get_tools()
 
     # -- Load persistent memory into orchestrator prompt -------------------
     memory_text = _read_memory()
@@ -0,0 +1,213 @@
+"""
+Pre-built agent shared by every task.
+
+``create_agent()`` initialises the chat model, fetches every MCP tool,
+reads the agent memory into the system prompt and compiles the LangGraph
+graph — seconds of work that used to run for each new task.  None of it
+depends on the task: a compiled graph serves any number of conversations
+concurrently as long as each has its own ``thread_id`` and they share a
+checkpointer.
+
+``AgentPool`` keeps one compiled graph plus that shared checkpointer and
+hands it out in microseconds.  The graph is rebuilt when its inputs
+change:
+
+* the memory file (it is baked into the system prompt) — checked with a
+  ``stat`` on every ``get()``;
+* the MCP tool list / schemas — the session manager re-lists them on
+  every (re)connection; the pool compares every ``tools_check_interval_s``
+  in the background, never on the request path.
+
+Conversations survive a rebuild because their state lives in the shared
+checkpointer, not in the graph.  The checkpointer is in memory until
+``open_checkpoints()`` switches it to SQLite (the server does, so pending
+approvals and follow-ups survive a restart).  State is dropped with
+``forget()`` when nothing can follow up on it any more: at the end of an
+ambient run, and for chat tasks when task-store retention deletes the task.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from agent_factory import _cfg, create_agent
+from mcp_session import get_mcp_sessions
+from tools import _MEMORY_PATH
+
+
+def _tools_signature(tools) -> str:
+    """Hash of tool names, descriptions and argument schemas."""
+    spec = []
+    for tool in tools:
+        spec.append([tool.name, tool.description or "", getattr(tool, "args", {})])
+    blob = json.dumps(sorted(spec, key=lambda s: s[0]), sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _memory_signature() -> tuple[int, int] | None:
+    try:
+        st = os.stat(_MEMORY_PATH)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class AgentPool:
+    """Compiled agent template + shared checkpointer, rebuilt on change.
+
+    Parameters
+    ----------
+    tools_check_interval_s : float
+        How often the background loop checks for changed MCP tools (``0`` disables).
+    """
+
+    def __init__(self, tools_check_interval_s: float = 60):
+        self.tools_check_interval_s = tools_check_interval_s
+        self.checkpointer = MemorySaver()
+        self._conn = None                  # aiosqlite connection behind a SQLite checkpointer
+        self._agent = None
+        self._mcp_tools = None
+        self._tools_sig: str | None = None
+        self._memory_sig: tuple[int, int] | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.builds = 0
+        self.gets = 0
+        self.last_build_s = 0.0
+        self.last_build_reason = ""
+
+    @staticmethod
+    def config_for(thread_id: str) -> dict:
+        return {"configurable": {"thread_id": thread_id}}
+
+    async def open_checkpoints(self, path: str):
+        """Keep conversation state in the SQLite file *path* instead of memory.
+
+        Call before the first ``get()``; a graph already built with the
+        in-memory saver is rebuilt on next use.
+        """
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as exc:
+            raise ImportError(
+                "Persistent checkpoints need the langgraph-checkpoint-sqlite package: "
+                "pip install langgraph-checkpoint-sqlite"
+            ) from exc
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = await aiosqlite.connect(path)
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        async with self._lock:
+            self.checkpointer = saver
+            self._conn = conn
+            self._agent = None
+
+    async def close_checkpoints(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def has_thread(self, thread_id: str) -> bool:
+        """Whether the checkpointer still holds state for *thread_id*."""
+        return await self.checkpointer.aget_tuple(self.config_for(thread_id)) is not None
+
+    async def forget(self, thread_id: str):
+        """Drop a finished conversation's checkpoints from the shared saver."""
+        await self.checkpointer.adelete_thread(thread_id)
+
+    async def get(self):
+        """The current agent, rebuilt first if the memory file changed."""
+        self.gets += 1
+        if self._agent is not None and _memory_signature() == self._memory_sig:
+            return self._agent
+        async with self._lock:
+            memory_sig = _memory_signature()
+            if self._agent is None:
+                await self._build("first use")
+            elif memory_sig != self._memory_sig:
+                await self._build("memory changed")
+        return self._agent
+
+    async def _build(self, reason: str, mcp_tools=None):
+        """Compile a new agent; callers hold ``_lock``."""
+        t0 = time.perf_counter()
+        if mcp_tools is None:
+            mcp_tools = self._mcp_tools if self._mcp_tools is not None else await get_mcp_sessions().get_tools()
+        # Memory is read inside create_agent; take the signature first so a
+        # write racing with the build triggers another one.
+        memory_sig = _memory_signature()
+        self._agent = await create_agent(checkpointer=self.checkpointer, mcp_tools=mcp_tools)
+        self._mcp_tools = mcp_tools
+        self._tools_sig = _tools_signature(mcp_tools)
+        self._memory_sig = memory_sig
+        self.builds += 1
+        self.last_build_s = round(time.perf_counter() - t0, 3)
+        self.last_build_reason = reason
+        print(f"🧩 Agent template built in {self.last_build_s}s ({reason})")
+
+    async def check_tools(self) -> bool:
+        """Rebuild if the cached MCP tools changed.  Returns whether it did."""
+        tools = await get_mcp_sessions().get_tools()
+        if _tools_signature(tools) == self._tools_sig and self._agent is not None:
+            return False
+        async with self._lock:
+            await self._build("MCP tools changed" if self._agent is not None else "first use", mcp_tools=tools)
+        return True
+
+    # -- background ------------------------------------------------------------
+
+    async def start(self):
+        """Build the template now and start the MCP tool watcher."""
+        try:
+            async with self._lock:
+                if self._agent is None:
+                    await self._build("startup")
+        except Exception as e:
+            # Not fatal: get() builds lazily once the MCP server is reachable.
+            print(f"⚠️  Agent pre-warm failed: {e}")
+        if self.tools_check_interval_s and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._watch_tools())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _watch_tools(self):
+        while True:
+            await asyncio.sleep(self.tools_check_interval_s)
+            try:
+                await self.check_tools()
+            except Exception as e:
+                print(f"⚠️  MCP tool check failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "ready": self._agent is not None,
+            "builds": self.builds,
+            "gets": self.gets,
+            "last_build_s": self.last_build_s,
+            "last_build_reason": self.last_build_reason,
+            "mcp_tools": len(self._mcp_tools or []),
+        }
+
+
+_pool: AgentPool | None = None
+
+
+def get_agent_pool() -> AgentPool:
+    """Process-wide agent pool (created on first use)."""
+    global _pool
+    if _pool is None:
+        pool_cfg = _cfg.get("agent_pool", {})
+        _pool = AgentPool(tools_check_interval_s=pool_cfg.get("tools_check_interval_s", 60))
+    return _pool
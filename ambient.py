@@ -10,6 +10,7 @@ Usage
 """
 
 import asyncio
+import contextlib
 import glob
 import json
 import os
@@ -145,9 +146,22 @@ def _topic_from_filename(filename: str) -> str:
 # Core processing
 # ---------------------------------------------------------------------------
 
-async def _process_pdf(pdf_path: str):
-    """Ingest a single PDF and kick off flashcard + file generation."""
+def _print_ingest_progress(job: dict):
+    name = os.path.basename(job["pdf_path"])
+    if job["status"] == "running":
+        print(f"📄 {name}: {job['pages_done']}/{job['pages_total']} pages, {job['chunks_embedded']} chunks embedded")
+    elif job["status"] != "queued":
+        print(f"📄 {name}: ingestion {job['status']}")
+
+
+async def _process_pdf(pdf_path: str, scheduler=None):
+    """Ingest a single PDF and kick off flashcard + file generation.
+
+    With a ``TaskScheduler`` (when embedded in the server) the agent run
+    waits for a slot at ``ambient`` priority, behind interactive tasks.
+    """
     from agent_factory import run_agent  # lazy to avoid circular imports
+    from agent_pool import get_agent_pool
     from RAG import collection_name_from_filename
 
     filename = os.path.basename(pdf_path)
@@ -156,11 +170,16 @@ async def _process_pdf(pdf_path: str):
 
     _log_event("processing_started", {"file": filename, "topic": topic, "collection": collection})
 
-    # Step 1: Ingest into vector DB
+    # Step 1: Ingest into vector DB (on the ingest worker, off the event loop)
     try:
-        from RAG import setup_retriever
-        setup_retriever(pdf_path, collection)
-        _log_event("ingestion_complete", {"file": filename, "collection": collection})
+        from ingest_worker import get_ingest_worker
+        job = await get_ingest_worker().ingest(pdf_path, collection, on_progress=_print_ingest_progress)
+        _log_event("ingestion_complete", {
+            "file": filename,
+            "collection": collection,
+            "pages": job.pages_total,
+            "chunks_embedded": job.chunks_embedded,
+        })
     except Exception as e:
         _log_event("ingestion_failed", {"file": filename, "error": str(e)})
         _append_manifest(filename, "❌ ingestion_failed", collection, topic)
@@ -176,22 +195,26 @@ async def _process_pdf(pdf_path: str):
         f"3. Create a study guide file for this topic\n"
     )
 
+    thread_id = f"ambient-{uuid.uuid4().hex[:8]}"
+    slot = scheduler.slot(thread_id, "ambient") if scheduler else contextlib.nullcontext()
     try:
-        result, _config, _agent = await run_agent(
-            message=message,
-            thread_id=f"ambient-{uuid.uuid4().hex[:8]}",
-        )
-
-        # Handle interrupts automatically (auto-approve in ambient mode)
-        if result.get("__interrupt__"):
-            from langgraph.types import Command
-            interrupts = result["__interrupt__"][0].value
-            decisions = [{"type": "approve"} for _ in interrupts.get("action_requests", [])]
-            result = await _agent.ainvoke(
-                Command(resume={"decisions": decisions}),
-                config=_config,
+        async with slot:
+            result, _config, _agent = await run_agent(
+                message=message,
+                thread_id=thread_id,
+                agent=await get_agent_pool().get(),
             )
 
+            # Handle interrupts automatically (auto-approve in ambient mode)
+            if result.get("__interrupt__"):
+                from langgraph.types import Command
+                interrupts = result["__interrupt__"][0].value
+                decisions = [{"type": "approve"} for _ in interrupts.get("action_requests", [])]
+                result = await _agent.ainvoke(
+                    Command(resume={"decisions": decisions}),
+                    config=_config,
+                )
+
         _log_event("agent_complete", {"file": filename, "topic": topic})
         _append_manifest(filename, "✅ complete", collection, topic)
 
@@ -213,13 +236,15 @@ async def _process_pdf(pdf_path: str):
     except Exception as e:
         _log_event("agent_failed", {"file": filename, "error": str(e)})
         _append_manifest(filename, "❌ agent_failed", collection, topic)
+    finally:
+        await get_agent_pool().forget(thread_id)  # one-shot thread; nothing follows up on it
 
 
 # ---------------------------------------------------------------------------
 # Poll loop
 # ---------------------------------------------------------------------------
 
-async def _poll_once():
+async def _poll_once(scheduler=None):
     """Single poll: find new PDFs and process them."""
     known = _read_manifest()
     pdf_files = glob.glob(os.path.join(WATCH_DIR, "*.pdf"))
@@ -245,16 +270,18 @@ async def _poll_once():
         })
 
     for pdf_path in new_pdfs:
-        await _process_pdf(pdf_path)
+        await _process_pdf(pdf_path, scheduler)
 
 
-async def run_ambient_loop(interval: int | None = None):
+async def run_ambient_loop(interval: int | None = None, scheduler=None):
     """Run the ambient polling loop forever.
 
     Parameters
     ----------
     interval : int, optional
         Seconds between polls.  Defaults to config value (300s / 5 min).
+    scheduler : TaskScheduler, optional
+        Admission control shared with the server's interactive tasks.
     """
     secs = interval or POLL_INTERVAL
     _ensure_manifest()
@@ -264,7 +291,7 @@ async def run_ambient_loop(interval: int | None = None):
 
     while True:
         try:
-            await _poll_once()
+            await _poll_once(scheduler)
         except Exception as e:
             _log_event("poll_error", {"error": str(e)})
             print(f"⚠️  Poll error: {e}")
@@ -278,14 +305,15 @@ async def run_ambient_loop(interval: int | None = None):
 class Ambient:
     """Wrapper for embedding in server.py as a background task."""
 
-    def __init__(self, interval: int | None = None):
+    def __init__(self, interval: int | None = None, scheduler=None):
         self.interval = interval or POLL_INTERVAL
+        self.scheduler = scheduler
         self._task: asyncio.Task | None = None
 
     async def start(self):
         """Start the ambient loop as a background asyncio task."""
         if self._task is None or self._task.done():
-            self._task = asyncio.create_task(run_ambient_loop(self.interval))
+            self._task = asyncio.create_task(run_ambient_loop(self.interval, self.scheduler))
             return True
         return False  # already running
 
@@ -305,7 +333,7 @@ class Ambient:
 
     async def poll_now(self):
         """Trigger an immediate poll (useful from the UI)."""
-        await _poll_once()
+        await _poll_once(self.scheduler)
 
 
 if __name__ == "__main__":
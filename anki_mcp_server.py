@@ -1,22 +1,143 @@
+import asyncio
+import os
+import time
+
 from fastmcp import FastMCP
 import httpx
+from pydantic import BaseModel, Field
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 from typing import List, Dict
 
-ANKI_URL = "http://localhost:8765"
+ANKI_URL = os.environ.get("ANKI_URL", "http://localhost:8765")
+
+
+def _coalesce_window(ms: str | None) -> float | None:
+    """``ANKI_COALESCE_MS`` in seconds; empty, 0 or negative disables merging."""
+    if ms is None or not ms.strip() or float(ms) <= 0:
+        return None
+    return float(ms) / 1000
+
+
+# Calls issued within this window are sent as one AnkiConnect "multi"
+# request (None disables merging).
+COALESCE_WINDOW_S: float | None = _coalesce_window(os.environ.get("ANKI_COALESCE_MS", "2"))
+MAX_MULTI_ACTIONS = 50
 
 mcp = FastMCP("AnkiConnect MCP Server")
 
-async def anki_req(action: str, params: dict = None):
-    """Helper for AnkiConnect calls."""
+# ---------------------------------------------------------------------------
+# AnkiConnect client: one pooled keep-alive connection set, concurrent calls
+# coalesced into "multi", per-action timing.
+# ---------------------------------------------------------------------------
+
+_client: httpx.AsyncClient | None = None
+_pending: List[tuple] = []             # (action, params, future) awaiting the next flush
+_flush_task: asyncio.Task | None = None
+_action_stats: Dict[str, dict] = {}
+_request_stats = {"http_requests": 0, "multi_requests": 0}
+
+
+def _http() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=8, keepalive_expiry=60),
+        )
+    return _client
+
+
+def _payload(action: str, params: dict | None) -> dict:
     payload = {"action": action, "version": 6}
     if params:
         payload["params"] = params
-    async with httpx.AsyncClient() as client:
-        r = await client.post(ANKI_URL, json=payload, timeout=30)
-        body = r.json()
-        if body.get("error"):
-            raise RuntimeError(body["error"])
-        return body["result"]
+    return payload
+
+
+def _record(action: str, ms: float, error: bool, merged: bool):
+    s = _action_stats.setdefault(action, {"calls": 0, "errors": 0, "merged": 0, "total_ms": 0.0, "max_ms": 0.0})
+    s["calls"] += 1
+    s["errors"] += int(error)
+    s["merged"] += int(merged)
+    s["total_ms"] += ms
+    s["max_ms"] = max(s["max_ms"], ms)
+
+
+async def _send(batch: List[tuple]):
+    """POST one request for *batch* and resolve each caller's future."""
+    t0 = time.perf_counter()
+    merged = len(batch) > 1
+    _request_stats["http_requests"] += 1
+    try:
+        if merged:
+            body = (await _http().post(ANKI_URL, json=_payload(
+                "multi", {"actions": [_payload(a, p) for a, p, _ in batch]}
+            ))).json()
+            _request_stats["multi_requests"] += 1
+            if body.get("error"):
+                raise RuntimeError(body["error"])
+            # With version 6 on each action, every entry is {result, error}.
+            outcomes = [(r.get("result"), r.get("error")) if isinstance(r, dict) else (r, None) for r in body["result"]]
+        else:
+            action, params, _ = batch[0]
+            body = (await _http().post(ANKI_URL, json=_payload(action, params))).json()
+            outcomes = [(body.get("result"), body.get("error"))]
+    except Exception as e:
+        ms = (time.perf_counter() - t0) * 1000
+        for action, _, future in batch:
+            _record(action, ms, True, merged)
+            if not future.done():
+                future.set_exception(e)
+        return
+    ms = (time.perf_counter() - t0) * 1000
+    for (action, _, future), (result, error) in zip(batch, outcomes):
+        _record(action, ms, bool(error), merged)
+        if future.done():
+            continue
+        if error:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(result)
+
+
+async def _flush_after_window():
+    global _flush_task
+    await asyncio.sleep(COALESCE_WINDOW_S)
+    batch = _pending[:]
+    _pending.clear()
+    _flush_task = None
+    await asyncio.gather(*(
+        _send(batch[i:i + MAX_MULTI_ACTIONS]) for i in range(0, len(batch), MAX_MULTI_ACTIONS)
+    ))
+
+
+async def anki_req(action: str, params: dict = None):
+    """Helper for AnkiConnect calls."""
+    global _flush_task
+    future = asyncio.get_running_loop().create_future()
+    if COALESCE_WINDOW_S is None:
+        await _send([(action, params, future)])
+        return future.result()
+    _pending.append((action, params, future))
+    if _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_after_window())
+    return await future
+
+
+def anki_stats() -> dict:
+    """Per-action call counts / latency and HTTP request counts."""
+    actions = {
+        action: {**s, "avg_ms": round(s["total_ms"] / s["calls"], 2), "total_ms": round(s["total_ms"], 1),
+                 "max_ms": round(s["max_ms"], 1)}
+        for action, s in _action_stats.items()
+    }
+    return {**_request_stats, "actions": actions}
+
+
+@mcp.custom_route("/anki/stats", methods=["GET"])
+async def _stats_route(request: Request) -> JSONResponse:
+    return JSONResponse(anki_stats())
 
 @mcp.tool(description="List all available Anki deck names, including hierarchical decks in 'Parent::Child' format. Call this FIRST before creating cards to check if a deck already exists and to discover the naming convention.")
 async def list_decks() -> List[str]:
@@ -32,15 +153,23 @@ async def create_deck(name: str) -> dict:
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+async def _deck_notes(deck: str) -> List[dict]:
+    """notesInfo for every note in *deck*."""
+    # Use the correct AnkiConnect query format: deck:"Deck Name"
+    query = f'deck:"{deck}"'
+    try:
+        # One round trip on AnkiConnect versions whose notesInfo takes a query.
+        return await anki_req("notesInfo", {"query": query})
+    except RuntimeError:
+        note_ids = await anki_req("findNotes", {"query": query})
+        if not note_ids:
+            return []
+        return await anki_req("notesInfo", {"notes": note_ids})
+
 @mcp.tool(description="List all flashcards in an existing deck. Returns front, back, and noteId for each card. Use this for GAP ANALYSIS before generating new cards — compare existing cards against your planned content to avoid duplicates.")
 async def list_cards(deck_name: str) -> List[dict]:
     """Return all cards in a deck."""
-    # Use the correct AnkiConnect query format: deck:"Deck Name"
-    query = f'deck:"{deck_name}"'
-    note_ids = await anki_req("findNotes", {"query": query})
-    if not note_ids:
-        return []
-    notes = await anki_req("notesInfo", {"notes": note_ids})
+    notes = await _deck_notes(deck_name)
     results = []
     for n in notes:
         fields = n.get("fields", {})
@@ -51,7 +180,7 @@ async def list_cards(deck_name: str) -> List[dict]:
         })
     return results
 
-@mcp.tool(description="Add a single flashcard to an EXISTING deck. The deck must already exist (call create_deck first). Automatically rejects exact duplicates. Returns {success: true, note_id} on success, {success: false, skipped: true} for duplicates, or {success: false, error} on failure. Call one at a time for each card.")
+@mcp.tool(description="Add a single flashcard to an EXISTING deck. The deck must already exist (call create_deck first). Automatically rejects exact duplicates. Returns {success: true, note_id} on success, {success: false, skipped: true} for duplicates, or {success: false, error} on failure. To add more than one card, use add_cards instead.")
 async def add_card(deck: str, front: str, back: str) -> Dict:
     """Add a note to a deck; return error if deck doesn't exist or card is a duplicate."""
     params = {
@@ -72,6 +201,123 @@ async def add_card(deck: str, front: str, back: str) -> Dict:
             return {"success": False, "skipped": True, "reason": "duplicate"}
         return {"success": False, "error": error_msg}
 
+class Card(BaseModel):
+    front: str
+    back: str
+    tags: List[str] = Field(default_factory=list)
+
+
+MAX_CARDS_PER_CALL = 200
+
+
+def _basic_note(deck: str, card: Card) -> dict:
+    return {
+        "deckName": deck,
+        "modelName": "Basic",
+        "fields": {"Front": card.front, "Back": card.back},
+        "options": {"allowDuplicate": False},
+        "tags": card.tags,
+    }
+
+
+async def _can_add(notes: List[dict]) -> List[tuple]:
+    """``(can_add, reason)`` per note, with reasons when AnkiConnect gives them."""
+    try:
+        checks = await anki_req("canAddNotesWithErrorDetail", {"notes": notes})
+        return [(c.get("canAdd", False), c.get("error", "")) for c in checks]
+    except RuntimeError as e:
+        if "unsupported action" not in str(e).lower():
+            raise
+    # Older AnkiConnect: yes/no only.  A missing deck or model would then
+    # look like a duplicate, so look those up alongside the check.
+    checks, decks, models = await asyncio.gather(
+        anki_req("canAddNotes", {"notes": notes}),
+        anki_req("deckNames"),
+        anki_req("modelNames"),
+    )
+    results = []
+    for note, ok in zip(notes, checks):
+        if ok:
+            results.append((True, ""))
+        elif note["deckName"] not in decks:
+            results.append((False, f"deck was not found: {note['deckName']}"))
+        elif note["modelName"] not in models:
+            results.append((False, f"model was not found: {note['modelName']}"))
+        else:
+            results.append((False, "duplicate"))
+    return results
+
+
+@mcp.tool(description="Add MANY flashcards to an EXISTING deck in ONE call — use this whenever you have more than one card (e.g. a whole generated set) instead of calling add_card repeatedly. The deck must already exist (call create_deck first). Each card is {front, back, tags?}. Duplicates (already in Anki or repeated within the list) are skipped, not errors. Returns {added, skipped, failed, results: [{index, success, note_id} | {index, success: false, skipped: true, reason} | {index, success: false, error}]} in input order.")
+async def add_cards(deck: str, cards: List[Card]) -> Dict:
+    """Add a batch of notes with one canAddNotes + one addNotes request."""
+    if len(cards) > MAX_CARDS_PER_CALL:
+        return {"success": False, "error": f"At most {MAX_CARDS_PER_CALL} cards per call; split the list."}
+
+    results: List[dict] = [{} for _ in cards]
+    candidates: List[int] = []
+    seen_fronts = set()
+    for i, card in enumerate(cards):
+        front = card.front.strip()
+        if not front or not card.back.strip():
+            results[i] = {"index": i, "success": False, "error": "front and back must be non-empty"}
+        elif front in seen_fronts:
+            results[i] = {"index": i, "success": False, "skipped": True, "reason": "duplicate within batch"}
+        else:
+            seen_fronts.add(front)
+            candidates.append(i)
+
+    addable: List[int] = []
+    try:
+        notes = [_basic_note(deck, cards[i]) for i in candidates]
+        checks = await _can_add(notes) if notes else []
+        addable = []
+        for i, (ok, reason) in zip(candidates, checks):
+            if ok:
+                addable.append(i)
+            elif "duplicate" in reason.lower():
+                results[i] = {"index": i, "success": False, "skipped": True, "reason": reason or "duplicate"}
+            else:
+                results[i] = {"index": i, "success": False, "error": reason}
+
+        sent_ms = int(time.time() * 1000)
+        note_ids = await anki_req("addNotes", {"notes": [_basic_note(deck, cards[i]) for i in addable]}) if addable else []
+        for i, note_id in zip(addable, note_ids):
+            if note_id:
+                results[i] = {"index": i, "success": True, "note_id": note_id}
+            else:
+                results[i] = {"index": i, "success": False, "error": "AnkiConnect did not add the note"}
+    except Exception as e:
+        error = str(e)
+        # addNotes raises after adding every note it could, so look up
+        # which cards are in the deck now.  Note IDs are creation times in
+        # ms: newer than the request means this call created the note.
+        present: Dict[str, int] = {}
+        if addable:
+            try:
+                for n in await _deck_notes(deck):
+                    present[n.get("fields", {}).get("Front", {}).get("value", "")] = n.get("noteId") or 0
+            except Exception:
+                pass  # Anki unreachable: report everything as failed
+        for i in candidates:
+            if results[i]:
+                continue
+            note_id = present.get(cards[i].front) if i in addable else None
+            if note_id and note_id >= sent_ms:
+                results[i] = {"index": i, "success": True, "note_id": note_id}
+            elif note_id:
+                results[i] = {"index": i, "success": False, "skipped": True, "reason": "duplicate"}
+            else:
+                results[i] = {"index": i, "success": False, "error": error}
+
+    return {
+        "added": sum(1 for r in results if r.get("success")),
+        "skipped": sum(1 for r in results if r.get("skipped")),
+        "failed": sum(1 for r in results if not r.get("success") and not r.get("skipped")),
+        "results": results,
+    }
+
+
 if __name__ == "__main__":
     
     mcp.run(transport="http", port=8000)
@@ -0,0 +1,112 @@
+"""
+Benchmark the Anki MCP server's AnkiConnect client against a fake AnkiConnect.
+
+Runs the same tool workload three ways:
+
+* ``per-call``  — a new ``httpx.AsyncClient`` per AnkiConnect call (the
+  old ``anki_req``);
+* ``pooled``    — the shared keep-alive client, no merging;
+* ``coalesced`` — shared client + concurrent calls merged into ``multi``.
+
+Workload: ``--sequential`` rounds of ``list_decks`` + ``list_cards``, then
+``--burst`` concurrent ``add_card`` calls (parallel tool calls from one
+model turn).  Reports wall time, HTTP requests and TCP connections seen by
+the fake server, and the client's per-action timing.
+
+Usage
+-----
+    python benchmarks/bench_anki.py
+    python benchmarks/bench_anki.py --burst 100 --latency 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+
+import anki_mcp_server as anki
+from fake_ankiconnect import start_in_thread
+
+
+def _fn(tool):
+    """The coroutine behind an ``@mcp.tool`` (FastMCP wraps it)."""
+    return getattr(tool, "fn", tool)
+
+
+async def per_call_req(action: str, params: dict = None):
+    """The old anki_req: one client (and connection) per call."""
+    payload = {"action": action, "version": 6}
+    if params:
+        payload["params"] = params
+    async with httpx.AsyncClient() as client:
+        r = await client.post(anki.ANKI_URL, json=payload, timeout=30)
+        body = r.json()
+        if body.get("error"):
+            raise RuntimeError(body["error"])
+        return body["result"]
+
+
+async def workload(deck: str, sequential: int, burst: int):
+    await _fn(anki.create_deck)(deck)
+    for _ in range(sequential):
+        await _fn(anki.list_decks)()
+        await _fn(anki.list_cards)(deck)
+    await asyncio.gather(*(
+        _fn(anki.add_card)(deck, f"Question {i}", f"Answer {i}") for i in range(burst)
+    ))
+
+
+async def run_mode(mode: str, args) -> dict:
+    server, url, counters, _ = start_in_thread(latency=args.latency)
+    anki.ANKI_URL = url
+    anki._client = None
+    anki._action_stats.clear()
+    anki._request_stats.update(http_requests=0, multi_requests=0)
+    original = anki.anki_req
+    if mode == "per-call":
+        anki.anki_req = per_call_req
+    anki.COALESCE_WINDOW_S = args.window_ms / 1000 if mode == "coalesced" else None
+    try:
+        t0 = time.perf_counter()
+        await workload(f"Bench::{mode}", args.sequential, args.burst)
+        wall = time.perf_counter() - t0
+    finally:
+        anki.anki_req = original
+        if anki._client is not None:
+            await anki._client.aclose()
+        server.shutdown()
+    result = {
+        "wall_s": round(wall, 3),
+        "http_requests": counters["requests"],
+        "tcp_connections": counters["connections"],
+    }
+    if mode != "per-call":
+        result["client"] = anki.anki_stats()
+    return result
+
+
+async def main(args):
+    results = {}
+    for mode in ("per-call", "pooled", "coalesced"):
+        results[mode] = await run_mode(mode, args)
+    if not args.verbose:
+        for r in results.values():
+            r.pop("client", None)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AnkiConnect client benchmark")
+    parser.add_argument("--sequential", type=int, default=20, help="list_decks + list_cards rounds")
+    parser.add_argument("--burst", type=int, default=40, help="Concurrent add_card calls")
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake server seconds per request")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="Coalescing window")
+    parser.add_argument("--verbose", action="store_true", help="Include per-action client timing")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""
+Compare the recursive character splitter with the structure-aware chunker.
+
+For each strategy this reports chunk count, total characters that would be
+embedded, the share of those that is duplicated overlap, and how many
+labelled blocks (Theorem / Definition / Proof ...) land in a single chunk
+instead of being cut.  Nothing is embedded or written.
+
+Usage
+-----
+    python benchmarks/bench_chunking.py "agent_fs/lectures/MA22014-lecturenotes.pdf"
+    python benchmarks/bench_chunking.py agent_fs/lectures/*.pdf --chunk-size 800
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import RAG
+from chunking import _segments, make_splitter
+from ingest_pipeline import iter_pages
+
+
+def measure(strategy: str, pages, chunk_size: int) -> dict:
+    splitter = make_splitter(
+        strategy,
+        chunk_size,
+        RAG.chunk_overlap,
+        min_chunk_size=RAG.min_chunk_size,
+        fallback_overlap=RAG.fallback_overlap,
+    )
+    t0 = time.perf_counter()
+    chunks = splitter.split_documents(pages)
+    elapsed = time.perf_counter() - t0
+
+    page_chars = sum(len(p.page_content.strip()) for p in pages)
+    chunk_chars = sum(len(c.page_content) for c in chunks)
+
+    # A block is "whole" if one chunk of its page covers its full span.
+    spans: dict[int, list[tuple[int, int]]] = {}
+    for c in chunks:
+        start = c.metadata["start_index"]
+        spans.setdefault(c.metadata["page"], []).append((start, start + len(c.page_content)))
+    blocks = whole = 0
+    for page in pages:
+        text = page.page_content
+        for seg in _segments(text):
+            if seg.kind in ("text", "heading"):
+                continue
+            body = text[seg.start:seg.end].strip()
+            start = seg.start + (text[seg.start:seg.end].index(body[0]) if body else 0)
+            end = start + len(body)
+            blocks += 1
+            if any(s <= start and end <= e for s, e in spans.get(page.metadata["page"], [])):
+                whole += 1
+
+    return {
+        "chunks": len(chunks),
+        "embedded_chars": chunk_chars,
+        "duplicated_share": round(max(0, chunk_chars - page_chars) / chunk_chars, 3) if chunk_chars else 0.0,
+        "blocks": blocks,
+        "blocks_whole": whole,
+        "split_ms": round(elapsed * 1000, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunking strategy benchmark")
+    parser.add_argument("pdfs", nargs="+", help="PDFs to chunk")
+    parser.add_argument("--chunk-size", type=int, default=RAG.chunk_size)
+    args = parser.parse_args()
+
+    report = {}
+    for pdf in args.pdfs:
+        pages = sorted(iter_pages(pdf), key=lambda p: p.metadata["page"])
+        report[os.path.basename(pdf)] = {
+            strategy: measure(strategy, pages, args.chunk_size)
+            for strategy in ("recursive", "structured")
+        }
+    print(json.dumps(report, indent=2))
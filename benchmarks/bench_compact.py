@@ -0,0 +1,104 @@
+"""
+Recall / memory benchmark for the int8 compact index.
+
+Compares two searches against exact float32 cosine search:
+
+* ``int8``        — ranking from the quantised codes only;
+* ``int8+rerank`` — int8 candidates re-scored with the float vectors
+  (what ``RAG`` uses for compact collections).
+
+Reports recall@k (overlap with the exact top-k), resident bytes of the
+codes vs the float32 matrix, and median query latency.
+
+By default vectors are synthetic (clustered, 1536-dim like
+text-embedding-3-small).  ``--collection`` benchmarks a real Chroma
+collection instead, using noisy copies of stored chunks as queries so no
+embedding calls are needed.
+
+Usage
+-----
+    python benchmarks/bench_compact.py
+    python benchmarks/bench_compact.py --n 50000 --k 10 --rerank-k 100
+    python benchmarks/bench_compact.py --collection ma22014_lecturenotes
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from compact_index import CompactIndex
+
+
+def synthetic(n: int, dim: int, clusters: int, rng) -> np.ndarray:
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    return centres[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def from_collection(name: str) -> np.ndarray:
+    import RAG
+    got = RAG.vector_session.vectorstore(name).get(include=["embeddings"])
+    return np.asarray(got["embeddings"], dtype=np.float32)
+
+
+def run(vectors: np.ndarray, queries: np.ndarray, k: int, rerank_k: int) -> dict:
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    codes, lo, scale = CompactIndex.quantise(vectors)
+    index = CompactIndex([str(i) for i in range(len(vectors))], codes, lo, scale, vectors)
+
+    results = {}
+    for label, rk in (("int8", 0), ("int8+rerank", rerank_k)):
+        recalls, latencies = [], []
+        for q in queries:
+            qn = q / np.linalg.norm(q)
+            exact = set(np.argsort(-(vectors @ qn))[:k].tolist())
+            t0 = time.perf_counter()
+            got = index.search(q, k, rerank_k=rk)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            recalls.append(len(exact & {row for row, _ in got}) / k)
+        results[label] = {
+            f"recall@{k}": round(statistics.mean(recalls), 4),
+            "median_ms": round(statistics.median(latencies), 3),
+        }
+    results["memory"] = {
+        "float32_bytes": int(vectors.astype(np.float32).nbytes),
+        "int8_bytes": index.nbytes,
+        "ratio": round(vectors.astype(np.float32).nbytes / index.nbytes, 2),
+    }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact index benchmark")
+    parser.add_argument("--collection", help="Benchmark a real Chroma collection")
+    parser.add_argument("--n", type=int, default=20000, help="Synthetic vectors")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.collection:
+        vectors = from_collection(args.collection)
+        if len(vectors) == 0:
+            sys.exit(f"Collection '{args.collection}' is empty.")
+    else:
+        vectors = synthetic(args.n, args.dim, args.clusters, rng)
+    picks = rng.integers(0, len(vectors), args.queries)
+    queries = vectors[picks] + 0.3 * rng.standard_normal((args.queries, vectors.shape[1])).astype(np.float32)
+
+    print(json.dumps({
+        "vectors": int(len(vectors)),
+        "dim": int(vectors.shape[1]),
+        **run(vectors, queries, args.k, args.rerank_k),
+    }, indent=2))
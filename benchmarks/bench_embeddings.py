@@ -0,0 +1,70 @@
+"""
+Benchmark the embedding scheduler against the local fake embeddings server.
+
+Runs the same synthetic chunk set at several concurrency levels and prints
+chunks/sec, tokens/sec and rate-limit counts.  No network or API key needed.
+
+Usage
+-----
+    python benchmarks/bench_embeddings.py
+    python benchmarks/bench_embeddings.py --chunks 4000 --tpm 1000000 --latency 0.1
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_openai import OpenAIEmbeddings
+
+from embedding_scheduler import EmbeddingScheduler
+from fake_embedding_server import start_in_thread
+
+
+def _chunks(n: int, size: int = 1000) -> list[str]:
+    base = "Let A be an n x n matrix over a field F. The eigenvalues of A are the roots of its characteristic polynomial. "
+    return [(f"[{i}] " + base * (size // len(base) + 1))[:size] for i in range(n)]
+
+
+def run(concurrency: int, base_url: str, texts: list[str], batch_tokens: int) -> dict:
+    client = OpenAIEmbeddings(
+        model="text-embedding-3-small",
+        base_url=base_url,
+        api_key="fake",
+        max_retries=0,
+        check_embedding_ctx_length=False,
+    )
+    scheduler = EmbeddingScheduler(
+        client.embed_documents,
+        max_batch_tokens=batch_tokens,
+        concurrency=concurrency,
+        base_delay=0.2,
+    )
+    vectors = scheduler.embed(texts)
+    assert len(vectors) == len(texts)
+    stats = scheduler.stats()
+    scheduler.shutdown()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding scheduler benchmark")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server seconds per request")
+    parser.add_argument("--tpm", type=int, default=None, help="Fake server tokens-per-minute limit")
+    parser.add_argument("--batch-tokens", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    server, url, counters = start_in_thread(latency=args.latency, tokens_per_minute=args.tpm)
+    texts = _chunks(args.chunks)
+    results = {}
+    for c in args.concurrency:
+        results[f"concurrency={c}"] = run(c, url, texts, args.batch_tokens)
+    server.shutdown()
+
+    print(json.dumps(results, indent=2))
+    print(f"\n🧪 Fake server saw {counters['requests']} request(s), {counters['rate_limited']} rate-limited")
@@ -0,0 +1,105 @@
+"""
+Benchmark the streaming ingestion pipeline against the serial PyPDFLoader path.
+
+Reports pages/sec for each stage (extract, split, embed) and end-to-end.
+Nothing is written to Chroma.  By default embeddings are faked so the
+numbers isolate PDF parsing and splitting; pass ``--backend`` to include
+real embedding work (``hashed`` and ``local`` run offline on the CPU).
+
+Usage
+-----
+    python benchmarks/bench_ingest.py "agent_fs/lectures/MA22014-lecturenotes.pdf"
+    python benchmarks/bench_ingest.py some.pdf --workers 8 --backend hashed
+    python benchmarks/bench_ingest.py some.pdf --backend openai
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from ingest_pipeline import run_pipeline
+
+
+class _NullEmbeddings(Embeddings):
+    """Zero vectors — measures the pipeline without network cost."""
+
+    def embed_documents(self, texts):
+        return [[0.0] * 8 for _ in texts]
+
+    def embed_query(self, text):
+        return [0.0] * 8
+
+
+def _splitter():
+    import RAG
+    return RecursiveCharacterTextSplitter(
+        chunk_size=RAG.chunk_size,
+        chunk_overlap=RAG.chunk_overlap,
+        separators=["\n\n", "\n", ".", " ", ""],
+        add_start_index=True,
+    )
+
+
+def bench_serial(pdf_path: str) -> dict:
+    from langchain_community.document_loaders import PyPDFLoader
+
+    t0 = time.perf_counter()
+    pages = PyPDFLoader(pdf_path).load()
+    t1 = time.perf_counter()
+    chunks = _splitter().split_documents(pages)
+    t2 = time.perf_counter()
+    return {
+        "pages": len(pages),
+        "chunks": len(chunks),
+        "extract_pages_per_s": round(len(pages) / (t1 - t0), 2),
+        "split_pages_per_s": round(len(pages) / (t2 - t1), 2),
+        "wall_s": round(t2 - t0, 3),
+    }
+
+
+def bench_pipeline(pdf_path: str, workers: int, embeddings) -> dict:
+    stats = run_pipeline(
+        pdf_path,
+        _splitter(),
+        embeddings,
+        sink=lambda ids, chunks, vectors: None,
+        assign_id=lambda chunk: str(id(chunk)),
+        workers=workers,
+    )
+    return {
+        "pages": stats.pages,
+        "chunks": stats.chunks,
+        **stats.rates(),
+        "wall_s": round(stats.wall_s, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestion pipeline benchmark")
+    parser.add_argument("pdf", help="PDF to ingest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--backend", choices=["null", "openai", "local", "hashed"], default="null",
+                        help="Embedding backend (null = zero vectors, no embedding cost)")
+    parser.add_argument("--openai", action="store_true", help="Shorthand for --backend openai")
+    args = parser.parse_args()
+    backend = "openai" if args.openai else args.backend
+
+    if backend == "null":
+        embeddings = _NullEmbeddings()
+    else:
+        import RAG
+        from embedding_backends import make_embeddings
+        embeddings = make_embeddings(backend, RAG.embedding_model, RAG._rag_cfg.get(f"{backend}_embeddings", {}))
+
+    serial = bench_serial(args.pdf)
+    parallel = bench_pipeline(args.pdf, args.workers, embeddings)
+    print(json.dumps({"serial": serial, "pipeline": parallel}, indent=2))
+    if backend == "null":
+        print(f"\n⏱  Speed-up (extract + split wall time): {serial['wall_s'] / parallel['wall_s']:.2f}x")
@@ -0,0 +1,75 @@
+"""
+Retrieval quality + latency benchmark across search modes.
+
+Each query in ``retrieval_queries.json`` lists terms a relevant chunk must
+contain.  For every mode (similarity, mmr, threshold, bm25, hybrid) this
+reports hit@k (any of the top-k chunks contains an expected term), MRR,
+the mean number of distinct pages among the top-k (higher = less
+redundant) and median latency.  Queries against collections that don't exist are skipped.
+
+The result cache is bypassed so timings reflect the search itself.
+
+Usage
+-----
+    python benchmarks/bench_retrieval.py
+    python benchmarks/bench_retrieval.py --k 3 --modes bm25 hybrid
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import RAG
+
+_QUERIES = os.path.join(os.path.dirname(__file__), "retrieval_queries.json")
+
+
+def _first_hit(docs, expect: list[str]) -> int | None:
+    for rank, doc in enumerate(docs, start=1):
+        text = doc.page_content.lower()
+        if any(term in text for term in expect):
+            return rank
+    return None
+
+
+def run(mode: str, queries: list[dict], k: int) -> dict:
+    hits, rr, latencies, pages = 0, [], [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        docs = RAG.retrieve(q["collection"], q["query"], k=k, search_type=mode)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        rank = _first_hit(docs, q["expect"])
+        hits += rank is not None
+        rr.append(1.0 / rank if rank else 0.0)
+        pages.append(len({(d.metadata.get("source_file"), d.metadata.get("page")) for d in docs}))
+    return {
+        "queries": len(queries),
+        f"hit@{k}": round(hits / len(queries), 3),
+        "mrr": round(sum(rr) / len(rr), 3),
+        "distinct_pages": round(statistics.mean(pages), 2),
+        "median_ms": round(statistics.median(latencies), 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrieval benchmark")
+    parser.add_argument("--k", type=int, default=RAG.retrieval_k)
+    parser.add_argument("--modes", nargs="+", default=["similarity", "mmr", "threshold", "bm25", "hybrid"])
+    parser.add_argument("--queries", default=_QUERIES)
+    args = parser.parse_args()
+
+    RAG.retrieval_cache = None  # measure the search, not the cache
+    with open(args.queries) as f:
+        queries = json.load(f)
+    available = set(RAG.list_collections())
+    queries = [q for q in queries if q["collection"] in available]
+    if not queries:
+        sys.exit("No benchmark queries target an existing collection — ingest a PDF first.")
+
+    results = {mode: run(mode, queries, args.k) for mode in args.modes}
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,105 @@
+"""
+Benchmark agent-run admission control against a simulated rate-limited LLM.
+
+Each simulated run makes ``--calls`` model calls of ``--tokens`` tokens.
+The "LLM" refills a token budget at ``--tps`` tokens/second; a call that
+finds the budget empty gets a 429 and backs off exponentially, like the
+real client.  A burst of ``--burst`` runs is submitted at once, either
+all concurrently (the old behaviour) or through ``TaskScheduler`` with
+several worker counts.
+
+Reports runs/sec, p50/p95 run latency (submit -> finished), time to the
+first finished run and 429s.
+
+Usage
+-----
+    python benchmarks/bench_scheduler.py
+    python benchmarks/bench_scheduler.py --burst 60 --workers 2 4 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from task_scheduler import TaskScheduler
+
+
+class FakeLLM:
+    """Token-bucket rate limit + fixed per-call latency."""
+
+    def __init__(self, tokens_per_s: float, latency_s: float):
+        self.rate = tokens_per_s
+        self.latency = latency_s
+        self.budget = tokens_per_s          # one second of burst
+        self.updated = time.monotonic()
+        self.rate_limited = 0
+
+    async def call(self, tokens: int):
+        backoff = 0.05
+        while True:
+            now = time.monotonic()
+            self.budget = min(self.rate, self.budget + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.budget >= tokens:
+                self.budget -= tokens
+                await asyncio.sleep(self.latency)
+                return
+            self.rate_limited += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 2.0)
+
+
+async def run_burst(workers: int | None, args) -> dict:
+    llm = FakeLLM(args.tps, args.latency)
+    scheduler = TaskScheduler(workers=workers, max_queue=args.burst) if workers else None
+    finished: list[float] = []
+    done = asyncio.Event()
+    t0 = time.monotonic()
+
+    async def agent_run():
+        for _ in range(args.calls):
+            await llm.call(args.tokens)
+        finished.append(time.monotonic() - t0)
+        if len(finished) == args.burst:
+            done.set()
+
+    for i in range(args.burst):
+        if scheduler:
+            scheduler.submit(f"run-{i}", agent_run)
+        else:
+            asyncio.create_task(agent_run())
+    await done.wait()
+
+    total = time.monotonic() - t0
+    finished.sort()
+    return {
+        "runs_per_s": round(args.burst / total, 2),
+        "p50_s": round(statistics.median(finished), 2),
+        "p95_s": round(finished[int(0.95 * (len(finished) - 1))], 2),
+        "first_done_s": round(finished[0], 2),
+        "rate_limited": llm.rate_limited,
+    }
+
+
+async def main(args):
+    results = {"unbounded": await run_burst(None, args)}
+    for w in args.workers:
+        results[f"workers={w}"] = await run_burst(w, args)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent run scheduler benchmark")
+    parser.add_argument("--burst", type=int, default=40, help="Runs submitted at once")
+    parser.add_argument("--calls", type=int, default=5, help="Model calls per run")
+    parser.add_argument("--tokens", type=int, default=2000, help="Tokens per model call")
+    parser.add_argument("--tps", type=float, default=40000, help="Simulated tokens/second limit")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per model call")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    asyncio.run(main(parser.parse_args()))
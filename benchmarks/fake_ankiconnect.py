@@ -0,0 +1,192 @@
+"""
+Local stand-in for AnkiConnect (``http://localhost:8765``).
+
+Keeps decks and Basic notes in memory and implements the actions the
+Anki MCP server uses — ``deckNames``, ``modelNames``, ``createDeck``,
+``findNotes``, ``notesInfo`` (by IDs or query), ``addNote``, ``addNotes``,
+``canAddNotes``, ``canAddNotesWithErrorDetail`` and ``multi`` — with a
+configurable per-request latency.  It records HTTP requests, TCP
+connections and per-action counts so a benchmark can see what the client
+actually sent.
+
+Usage
+-----
+    python benchmarks/fake_ankiconnect.py --port 8765 --latency 0.01
+
+Point ``ANKI_URL`` at it, or call ``start_in_thread()`` from a benchmark.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeAnki:
+    """In-memory collection: decks + Basic notes."""
+
+    def __init__(self, add_notes_raises: bool = False):
+        # Current AnkiConnect adds what it can in addNotes, then raises
+        # listing the failures; older versions return None per failure.
+        self.add_notes_raises = add_notes_raises
+        self.lock = threading.Lock()
+        self.decks = {"Default"}
+        self.notes: dict[int, dict] = {}
+        self.next_id = 1_700_000_000_000
+
+    def _check(self, note: dict) -> str:
+        if note.get("deckName") not in self.decks:
+            return f"deck was not found: {note.get('deckName')}"
+        front = note.get("fields", {}).get("Front", "")
+        if not front.strip():
+            return "cannot create note because it is empty"
+        if any(n["deck"] == note["deckName"] and n["front"] == front for n in self.notes.values()):
+            return "cannot create note because it is a duplicate"
+        return ""
+
+    def _add(self, note: dict) -> int:
+        error = self._check(note)
+        if error:
+            raise ValueError(error)
+        # Like Anki, note IDs are creation times in ms.
+        self.next_id = max(self.next_id + 1, int(time.time() * 1000))
+        self.notes[self.next_id] = {
+            "deck": note["deckName"],
+            "front": note["fields"].get("Front", ""),
+            "back": note["fields"].get("Back", ""),
+        }
+        return self.next_id
+
+    def _find(self, query: str) -> list[int]:
+        deck = query.split("deck:", 1)[-1].strip().strip('"') if "deck:" in query else None
+        return [nid for nid, n in self.notes.items() if deck is None or n["deck"] == deck]
+
+    def _info(self, ids: list[int]) -> list[dict]:
+        return [
+            {"noteId": nid, "modelName": "Basic", "tags": [],
+             "fields": {"Front": {"value": self.notes[nid]["front"], "order": 0},
+                        "Back": {"value": self.notes[nid]["back"], "order": 1}}}
+            for nid in ids if nid in self.notes
+        ]
+
+    def run(self, action: str, params: dict):
+        with self.lock:
+            if action == "deckNames":
+                return sorted(self.decks)
+            if action == "modelNames":
+                return ["Basic"]
+            if action == "createDeck":
+                self.decks.add(params["deck"])
+                return 1
+            if action == "findNotes":
+                return self._find(params.get("query", ""))
+            if action == "notesInfo":
+                ids = params["notes"] if "notes" in params else self._find(params.get("query", ""))
+                return self._info(ids)
+            if action == "addNote":
+                return self._add(params["note"])
+            if action == "addNotes":
+                out, errors = [], []
+                for note in params["notes"]:
+                    try:
+                        out.append(self._add(note))
+                        errors.append(None)
+                    except ValueError as e:
+                        out.append(None)
+                        errors.append(str(e))
+                if self.add_notes_raises and any(errors):
+                    raise ValueError(str(errors))
+                return out
+            if action == "canAddNotes":
+                return [not self._check(n) for n in params["notes"]]
+            if action == "canAddNotesWithErrorDetail":
+                return [{"canAdd": True} if not (e := self._check(n)) else {"canAdd": False, "error": e}
+                        for n in params["notes"]]
+        raise ValueError("unsupported action")
+
+
+def make_handler(anki: FakeAnki, latency: float, counters: Counter):
+    lock = threading.Lock()
+
+    def dispatch(request: dict):
+        with lock:
+            counters[f"action:{request.get('action')}"] += 1
+        try:
+            return anki.run(request.get("action"), request.get("params") or {}), None
+        except (ValueError, KeyError) as e:
+            return None, str(e)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"          # keep-alive, like AnkiConnect
+        disable_nagle_algorithm = True
+        wbufsize = 64 * 1024                   # headers + body in one segment
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            with lock:
+                counters["connections"] += 1
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            with lock:
+                counters["requests"] += 1
+            time.sleep(latency)
+            if body.get("action") == "multi":
+                results = []
+                for sub in body.get("params", {}).get("actions", []):
+                    result, error = dispatch(sub)
+                    results.append({"result": result, "error": error})
+                response = {"result": results, "error": None}
+            else:
+                result, error = dispatch(body)
+                response = {"result": result, "error": error}
+            payload = json.dumps(response).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            self.wfile.flush()
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256                   # bursts of concurrent clients
+
+
+def start_in_thread(port: int = 0, latency: float = 0.005, add_notes_raises: bool = False):
+    """Start the fake server on a daemon thread.
+
+    Returns
+    -------
+    (server, url, counters, anki)
+        ``counters`` tracks ``requests``, ``connections`` and
+        ``action:<name>``; ``anki`` is the in-memory collection.
+    """
+    anki = FakeAnki(add_notes_raises)
+    counters: Counter = Counter()
+    server = _Server(("127.0.0.1", port), make_handler(anki, latency, counters))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", counters, anki
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake AnkiConnect server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds per request")
+    args = parser.parse_args()
+
+    server, url, counters, _ = start_in_thread(args.port, args.latency)
+    print(f"🧪 Fake AnkiConnect at {url}  (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(json.dumps(dict(counters), indent=2))
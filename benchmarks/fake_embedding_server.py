@@ -0,0 +1,150 @@
+"""
+Local stand-in for the OpenAI ``/v1/embeddings`` endpoint.
+
+Returns deterministic hash-seeded vectors with configurable per-request
+latency, and enforces a tokens-per-minute budget by answering HTTP 429
+(with ``Retry-After``) — enough to exercise the embedding scheduler's
+batching and backoff without network access or API spend.
+
+Usage
+-----
+    python benchmarks/fake_embedding_server.py --port 8765 --latency 0.05 --tpm 600000
+
+Point ``OpenAIEmbeddings(base_url="http://127.0.0.1:8765/v1", api_key="fake")``
+at it, or call ``start_in_thread()`` from a benchmark.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _TokenBucket:
+    """Tokens-per-minute limiter, refilled continuously."""
+
+    def __init__(self, tokens_per_minute: int | None):
+        self.rate = (tokens_per_minute or 0) / 60.0
+        self.capacity = tokens_per_minute or 0
+        self.level = float(self.capacity)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, n: int) -> float:
+        """Consume *n* tokens; return 0, or seconds to wait if over budget."""
+        if not self.capacity:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+            self.stamp = now
+            if n <= self.level:
+                self.level -= n
+                return 0.0
+            return (n - self.level) / self.rate
+
+
+def fake_vector(item, dim: int) -> list[float]:
+    seed = hashlib.sha256(json.dumps(item).encode("utf-8")).digest()
+    rng = random.Random(seed)
+    return [rng.uniform(-1.0, 1.0) for _ in range(dim)]
+
+
+def make_handler(dim: int, latency: float, bucket: _TokenBucket, counters: dict):
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code: int, body: dict, headers: dict | None = None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/embeddings"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            inputs = body.get("input", [])
+            if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+                inputs = [inputs]
+            tokens = sum(len(x) if isinstance(x, list) else max(1, len(x) // 4) for x in inputs)
+
+            wait = bucket.take(tokens)
+            with lock:
+                counters["requests"] += 1
+                if wait:
+                    counters["rate_limited"] += 1
+            if wait:
+                self._send(
+                    429,
+                    {"error": {"message": "Rate limit reached (fake)", "type": "rate_limit_exceeded"}},
+                    {"Retry-After": f"{wait:.2f}"},
+                )
+                return
+
+            time.sleep(latency)
+            with lock:
+                counters["inputs"] += len(inputs)
+            as_b64 = body.get("encoding_format") == "base64"
+            data = []
+            for i, item in enumerate(inputs):
+                vec = fake_vector(item, dim)
+                emb = base64.b64encode(struct.pack(f"<{dim}f", *vec)).decode() if as_b64 else vec
+                data.append({"object": "embedding", "index": i, "embedding": emb})
+            self._send(200, {
+                "object": "list",
+                "data": data,
+                "model": body.get("model", "fake"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            })
+
+    return Handler
+
+
+def start_in_thread(
+    port: int = 0,
+    dim: int = 1536,
+    latency: float = 0.05,
+    tokens_per_minute: int | None = None,
+):
+    """Start the fake server on a daemon thread.
+
+    Returns
+    -------
+    (server, base_url, counters)
+        ``counters`` tracks ``requests``, ``inputs`` and ``rate_limited``.
+    """
+    counters = {"requests": 0, "inputs": 0, "rate_limited": 0}
+    handler = make_handler(dim, latency, _TokenBucket(tokens_per_minute), counters)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1", counters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI embeddings server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request")
+    parser.add_argument("--tpm", type=int, default=None, help="Tokens-per-minute limit (429 beyond)")
+    args = parser.parse_args()
+
+    server, url, _ = start_in_thread(args.port, args.dim, args.latency, args.tpm)
+    print(f"🧪 Fake embeddings server at {url}  (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,222 @@
+"""
+Structure-aware chunking for mathematical lecture notes.
+
+``RecursiveCharacterTextSplitter`` cuts on character counts, so a theorem
+and its proof routinely end up split mid-statement, and the 200-character
+overlap that papers over those cuts duplicates a fifth of all embedded
+text.  ``MathStructureSplitter`` instead segments each page at headings
+("2.3 Eigenvalues", "Chapter 4") and labelled blocks ("Theorem 3.9
+(Cayley-Hamilton).", "Definition.", "Proof.") and packs whole segments
+into chunks:
+
+* segments are packed greedily up to ``chunk_size``;
+* a heading starts a new chunk unless the current one is tiny;
+* a result starts a new chunk if that keeps it together with its proof.
+
+Only a chunk holding a segment longer than ``chunk_size`` is cut further
+(with a small overlap); everything else is embedded exactly once.
+Chunks carry ``section``, ``block_type`` and ``block_label`` metadata.
+
+The splitter is opt-in (``rag.chunking.strategy: structured``).  On the
+bundled lecture notes it embeds ~12% fewer characters and keeps more
+blocks whole than the recursive splitter, but still produces 6-12% more
+chunks (``benchmarks/bench_chunking.py``).
+
+Pages are split independently (they arrive from the extraction pool out
+of order), so chunks never span a page boundary and ``section`` is only
+known for headings on the same page.
+"""
+
+import re
+from dataclasses import dataclass
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+_BLOCK_WORDS = (
+    "Theorem", "Lemma", "Proposition", "Corollary", "Definition", "Proof",
+    "Example", "Examples", "Remark", "Exercise", "Claim", "Conjecture", "Algorithm",
+)
+
+# "Theorem 3.9 (Cayley-Hamilton). Let ..." / "Proof. ..." / "Definition 2:" /
+# "Proof of Theorem 3.9." — label, optional number, optional note, then
+# a full stop / colon or end of line.  A wrapped sentence that merely
+# starts with "Theorem 3.9 tells us" does not match.
+_BLOCK_RE = re.compile(
+    r"^\s*(?P<word>" + "|".join(_BLOCK_WORDS) + r")"
+    r"(?:\s+(?P<num>\d+(?:\.\d+)*))?"
+    r"(?:\s+of\s+[^.:\n]{1,60})?"
+    r"\s*(?:\([^)\n]{0,80}\))?"
+    r"\s*(?:[.:](?!\d)|$)"
+)
+
+# "2.3 Eigenvalues and eigenvectors", "Chapter 4", "Section 2: Bases".
+_HEADING_RE = re.compile(
+    r"^\s*(?:"
+    r"(?:Chapter|Section|Lecture|Part)\s+[0-9IVX]+\b[^\n]{0,80}"
+    r"|\d+(?:\.\d+){0,2}\.?\s+[A-Z][^\n.;=]{2,70}"
+    r")\s*$"
+)
+
+_PROOF_END = ("□", "∎", "■", "QED", "Q.E.D.")
+
+_PROVABLE = {"theorem", "lemma", "proposition", "corollary", "claim"}
+
+
+@dataclass
+class _Segment:
+    kind: str            # "heading", "text", or a lower-cased block word
+    start: int           # character offsets into the page text
+    end: int
+    label: str = ""
+
+
+def _segments(text: str) -> list[_Segment]:
+    """Cut a page into heading / labelled-block / text segments."""
+    segments: list[_Segment] = []
+    offset = 0
+    after_proof_end = False
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        kind, label = None, ""
+        heading = _HEADING_RE.match(line) if len(stripped) <= 90 else None
+        block = _BLOCK_RE.match(line)
+        if block:
+            word = block.group("word")
+            kind = "example" if word == "Examples" else word.lower()
+            label = f"{word} {block.group('num')}" if block.group("num") else word
+        elif heading:
+            kind, label = "heading", stripped
+        elif after_proof_end and stripped:
+            kind = "text"
+
+        if kind is not None or not segments:
+            if segments:
+                segments[-1].end = offset
+            segments.append(_Segment(kind or "text", offset, offset + len(line), label))
+        if stripped:
+            after_proof_end = stripped.endswith(_PROOF_END)
+        offset += len(line)
+    if segments:
+        segments[-1].end = len(text)
+    return segments
+
+
+class MathStructureSplitter:
+    """Split page ``Document``s into structurally whole chunks.
+
+    Drop-in for ``RecursiveCharacterTextSplitter.split_documents``: chunks
+    inherit the page metadata and get ``start_index`` (offset in the page).
+
+    Parameters
+    ----------
+    chunk_size : int
+        Target maximum chunk length in characters.
+    min_chunk_size : int
+        Chunks shorter than this (e.g. a running page header) absorb a
+        following heading instead of standing alone.
+    fallback_overlap : int
+        Overlap used only when a single segment exceeds ``chunk_size`` and
+        must be cut.
+    """
+
+    def __init__(self, chunk_size: int = 1000, min_chunk_size: int = 200, fallback_overlap: int = 100):
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self._fallback = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=fallback_overlap,
+            separators=["\n\n", "\n", ". ", " ", ""],
+        )
+
+    # -- packing --------------------------------------------------------------
+
+    def _groups(self, segments: list[_Segment]) -> list[list[_Segment]]:
+        """Greedily pack consecutive segments into chunk-sized groups.
+
+        A group is only closed early at a heading, or before a result whose
+        proof would otherwise land in the next group.
+        """
+        groups: list[list[_Segment]] = []
+        current: list[_Segment] = []
+        size = 0
+        for i, seg in enumerate(segments):
+            length = seg.end - seg.start
+            if not current:
+                joins = True
+            elif seg.kind == "heading":
+                joins = size < self.min_chunk_size
+            else:
+                # A segment too long for any chunk is cut anyway; start it here.
+                joins = size + length <= self.chunk_size or length > self.chunk_size
+                nxt = segments[i + 1] if i + 1 < len(segments) else None
+                if joins and seg.kind in _PROVABLE and nxt is not None and nxt.kind == "proof":
+                    with_proof = length + nxt.end - nxt.start
+                    joins = size + with_proof <= self.chunk_size or with_proof > self.chunk_size
+            if joins:
+                current.append(seg)
+                size += length
+            else:
+                groups.append(current)
+                current, size = [seg], length
+        if current:
+            groups.append(current)
+        return groups
+
+    # -- splitting ------------------------------------------------------------
+
+    def _split_page(self, text: str) -> list[tuple[int, str, _Segment | None, str]]:
+        """``(start_index, chunk_text, first_block, section)`` for one page."""
+        out = []
+        section = ""
+        for group in self._groups(_segments(text)):
+            for seg in group:
+                if seg.kind == "heading":
+                    section = seg.label
+            block = next((s for s in group if s.kind not in ("text", "heading")), None)
+            start, end = group[0].start, group[-1].end
+            raw = text[start:end]
+            if len(raw) <= self.chunk_size:
+                pieces = [(start, raw)]
+            else:
+                pieces, cursor = [], 0
+                for piece in self._fallback.split_text(raw):
+                    found = raw.find(piece, cursor)
+                    pos = found if found >= 0 else cursor
+                    pieces.append((start + pos, piece))
+                    cursor = pos + 1
+            for pos, piece in pieces:
+                stripped = piece.strip()
+                if stripped:
+                    out.append((pos + piece.index(stripped[0]), stripped, block, section))
+        return out
+
+    def split_documents(self, documents: list[Document]) -> list[Document]:
+        chunks: list[Document] = []
+        for doc in documents:
+            for start, body, block, section in self._split_page(doc.page_content):
+                metadata = {**doc.metadata, "start_index": start, "block_type": block.kind if block else "text"}
+                if block and block.label:
+                    metadata["block_label"] = block.label
+                if section:
+                    metadata["section"] = section
+                chunks.append(Document(page_content=body, metadata=metadata))
+        return chunks
+
+
+def make_splitter(strategy: str, chunk_size: int, chunk_overlap: int, min_chunk_size: int = 200, fallback_overlap: int = 100):
+    """Build the splitter named by ``rag.chunking.strategy``.
+
+    ``"structured"`` is ``MathStructureSplitter``; ``"recursive"`` is the
+    original fixed-size character splitter.
+    """
+    if strategy == "structured":
+        return MathStructureSplitter(chunk_size, min_chunk_size, fallback_overlap)
+    if strategy == "recursive":
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=["\n\n", "\n", ".", " ", ""],
+            add_start_index=True,
+        )
+    raise ValueError(f"Unknown chunking strategy '{strategy}' (expected structured or recursive)")
@@ -0,0 +1,168 @@
+"""
+Collection routing index.
+
+For every collection, ingestion stores a compact summary: the normalised
+centroid of its chunk embeddings plus its most frequent keywords.  Given a
+query, ``CollectionRouter.rank`` scores every collection against those
+summaries with one small matrix-vector product — no HNSW index is touched —
+so ``retrieval_tool(collection="auto")`` can pick the right collection
+without the agent spending a turn on ``list_collections_tool``.
+
+Summaries are stored one JSON file per collection so the server and the
+standalone ambient daemon never race on a shared file.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections import Counter
+
+import numpy as np
+
+from lexical_index import tokenize
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have if in into is it its let of on or
+that the then there these this to was we where which with
+""".split())
+
+
+def _keywords(texts: list[str], limit: int) -> dict[str, float]:
+    """Top *limit* content words, weighted by share of all word occurrences."""
+    counts = Counter(
+        tok for text in texts for tok in tokenize(text)
+        if len(tok) > 2 and tok not in _STOPWORDS and not tok[0].isdigit()
+    )
+    total = sum(counts.values()) or 1
+    return {tok: n / total for tok, n in counts.most_common(limit)}
+
+
+class CollectionRouter:
+    """Ranks collections for a query from persisted centroid + keyword summaries.
+
+    Parameters
+    ----------
+    directory : str
+        Where per-collection summary files live.
+    keyword_weight : float
+        Weight of the keyword-overlap score relative to centroid cosine.
+    """
+
+    def __init__(self, directory: str, keyword_weight: float = 0.1):
+        self.directory = directory
+        self.keyword_weight = keyword_weight
+        self._lock = threading.Lock()
+        self._mtimes: dict[str, float] = {}
+        self._summaries: dict[str, dict] = {}
+        self._names: list[str] = []
+        self._matrix: np.ndarray | None = None
+
+    def _path(self, collection: str) -> str:
+        return os.path.join(self.directory, f"{collection}.json")
+
+    # -- writing --------------------------------------------------------------
+
+    def update(self, collection: str, embeddings, texts: list[str], top_keywords: int = 40):
+        """Recompute and persist the summary for *collection*."""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if len(vectors) == 0:
+            self.drop(collection)
+            return
+        centroid = vectors.mean(axis=0)
+        norm = float(np.linalg.norm(centroid)) or 1.0
+        summary = {
+            "count": int(len(vectors)),
+            "centroid": (centroid / norm).tolist(),
+            "keywords": _keywords(texts, top_keywords),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{collection}.", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(summary, f)
+            os.replace(tmp, self._path(collection))
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def drop(self, collection: str):
+        try:
+            os.unlink(self._path(collection))
+        except OSError:
+            pass
+
+    # -- reading --------------------------------------------------------------
+
+    def _refresh(self):
+        """Reload summaries whose files changed since the last call."""
+        try:
+            entries = {
+                e.name[:-5]: e.stat().st_mtime
+                for e in os.scandir(self.directory)
+                if e.name.endswith(".json")
+            }
+        except FileNotFoundError:
+            entries = {}
+        with self._lock:
+            if entries == self._mtimes:
+                return
+            for name, mtime in entries.items():
+                if self._mtimes.get(name) != mtime:
+                    with open(self._path(name), "r") as f:
+                        self._summaries[name] = json.load(f)
+            for name in set(self._summaries) - set(entries):
+                del self._summaries[name]
+            self._mtimes = entries
+            self._names = sorted(self._summaries)
+            self._matrix = (
+                np.asarray([self._summaries[n]["centroid"] for n in self._names], dtype=np.float32)
+                if self._names else None
+            )
+
+    def collections(self) -> list[str]:
+        self._refresh()
+        return list(self._names)
+
+    def dimension(self, collection: str) -> int | None:
+        """Embedding dimension of *collection*'s centroid, if it has a summary."""
+        self._refresh()
+        with self._lock:
+            summary = self._summaries.get(collection)
+        return len(summary["centroid"]) if summary else None
+
+    def rank(self, query_vector=None, query_text: str = "", limit: int | None = None) -> list[tuple[str, float]]:
+        """Score every summarised collection for a query, best first.
+
+        Parameters
+        ----------
+        query_vector : sequence of float, optional
+            Query embedding (same model as the collections).
+        query_text : str
+            Raw query, used for keyword overlap.
+        limit : int, optional
+            Return at most this many collections.
+        """
+        self._refresh()
+        with self._lock:
+            names, matrix, summaries = self._names, self._matrix, self._summaries
+        if not names:
+            return []
+
+        scores = np.zeros(len(names), dtype=np.float32)
+        if query_vector is not None and matrix is not None:
+            q = np.array(query_vector, dtype=np.float32)
+            q /= float(np.linalg.norm(q)) or 1.0
+            scores += matrix @ q
+
+        terms = {t for t in tokenize(query_text) if t not in _STOPWORDS}
+        if terms and self.keyword_weight:
+            for i, name in enumerate(names):
+                keywords = summaries[name]["keywords"]
+                hit = sum(1 for t in terms if t in keywords)
+                scores[i] += self.keyword_weight * hit / len(terms)
+
+        order = np.argsort(-scores)
+        if limit:
+            order = order[:limit]
+        return [(names[i], float(scores[i])) for i in order]
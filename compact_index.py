@@ -0,0 +1,250 @@
+"""
+Compact int8 vector index with float re-ranking.
+
+A Chroma collection keeps every float32 vector of its HNSW graph resident
+once it is queried — 6 KB per 1536-dim chunk before graph links.  For
+collections listed under ``rag.compact.collections``, dense search is
+answered from this index instead:
+
+* vectors are L2-normalised and scalar-quantised to int8 with a per-
+  dimension ``lo`` / ``scale`` (``x ~ lo + scale * (code + 128)``), so the
+  resident codes are a quarter of the float32 size;
+* a query is scored against all codes in fixed-size blocks (only one
+  block is ever widened to float32), and the top ``rerank_k`` candidates
+  are re-scored exactly against the float32 vectors, which stay on disk
+  in a memory-mapped ``.npy`` and are paged in only for those rows.
+
+Chroma's HNSW index for such a collection is then never loaded; Chroma is
+only asked for chunk text / metadata by ID.  Recall against exact search
+is measured by ``benchmarks/bench_compact.py``.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Rows widened to float32 at a time while scoring codes.
+_BLOCK_ROWS = 4096
+
+# Files of an index written before builds were versioned.
+_FLAT_LAYOUT = ("meta.json", "quant.npy", "codes.npy", "vectors.npy")
+
+
+class CompactIndex:
+    """Int8 codes in RAM + memory-mapped float32 vectors for re-ranking.
+
+    Parameters
+    ----------
+    ids : list[str]
+        Chunk IDs, parallel to the rows.
+    codes : (n, dim) int8 array
+    lo, scale : (dim,) float32 arrays
+        Per-dimension quantisation parameters.
+    vectors : (n, dim) float32 array or memmap
+        Normalised full-precision vectors.
+    """
+
+    def __init__(self, ids: list[str], codes: np.ndarray, lo: np.ndarray, scale: np.ndarray, vectors: np.ndarray):
+        self.ids = ids
+        self.codes = codes
+        self.lo = lo
+        self.scale = scale
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Resident size (codes + quantisation parameters)."""
+        return int(self.codes.nbytes + self.lo.nbytes + self.scale.nbytes)
+
+    @staticmethod
+    def quantise(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(codes, lo, scale)`` for already-normalised *vectors*."""
+        lo = vectors.min(axis=0)
+        scale = (vectors.max(axis=0) - lo) / 255.0
+        scale[scale == 0] = 1.0
+        codes = np.clip(np.rint((vectors - lo) / scale) - 128, -128, 127).astype(np.int8)
+        return codes, lo.astype(np.float32), scale.astype(np.float32)
+
+    def approx_scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate cosine similarity of *query* (normalised) to every row."""
+        weighted = query * self.scale
+        base = float(query @ self.lo) + 128.0 * float(weighted.sum())
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), _BLOCK_ROWS):
+            block = self.codes[start:start + _BLOCK_ROWS].astype(np.float32)
+            scores[start:start + len(block)] = block @ weighted + base
+        return scores
+
+    def search(self, query_vector, k: int, rerank_k: int = 50) -> list[tuple[int, float]]:
+        """Top-*k* ``(row, cosine similarity)``, best first.
+
+        ``rerank_k`` candidates are taken from the int8 scores and
+        re-scored exactly; ``rerank_k=0`` returns the approximate ranking.
+        """
+        n = len(self.ids)
+        if n == 0 or k <= 0:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (float(np.linalg.norm(query)) or 1.0)
+        approx = self.approx_scores(query)
+
+        pool = min(n, max(k, rerank_k))
+        candidates = np.argpartition(-approx, pool - 1)[:pool] if pool < n else np.arange(n)
+        if rerank_k:
+            rows = np.sort(candidates)               # sequential reads from the memmap
+            exact = np.asarray(self.vectors[rows], dtype=np.float32) @ query
+            order = np.argsort(-exact)[:k]
+            return [(int(rows[i]), float(exact[i])) for i in order]
+        order = candidates[np.argsort(-approx[candidates])][:k]
+        return [(int(i), float(approx[i])) for i in order]
+
+
+class CompactIndexStore:
+    """Loads, caches and rebuilds per-collection compact indexes in *directory*.
+
+    Each build is written to a fresh version directory under
+    ``<directory>/<collection>/`` and published by atomically replacing the
+    ``CURRENT`` pointer file, so a reader in this or another process (the
+    ambient watcher) never sees a half-replaced index.  The previous
+    version is kept until the next build, for readers that resolved the
+    pointer just before the switch.
+    """
+
+    _POINTER = "CURRENT"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._loaded: dict[str, tuple[str, CompactIndex]] = {}  # name -> (version, index)
+
+    def path(self, collection: str) -> str:
+        return os.path.join(self.directory, collection)
+
+    def _version(self, collection: str) -> str | None:
+        try:
+            with open(os.path.join(self.path(collection), self._POINTER), "r") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _load(self, collection: str, version: str) -> CompactIndex:
+        base = os.path.join(self.path(collection), version)
+        with open(os.path.join(base, "meta.json"), "r") as f:
+            ids = json.load(f)["ids"]
+        quant = np.load(os.path.join(base, "quant.npy"))
+        return CompactIndex(
+            ids,
+            np.load(os.path.join(base, "codes.npy")),
+            quant[0],
+            quant[1],
+            np.load(os.path.join(base, "vectors.npy"), mmap_mode="r"),
+        )
+
+    def get(self, collection: str) -> CompactIndex | None:
+        """The collection's index, reloaded if it was rebuilt on disk.
+
+        ``None`` if there is no index, or it was dropped or replaced twice
+        while being read (the caller treats that as a stale index).
+        """
+        for _attempt in range(2):
+            version = self._version(collection)
+            if version is None:
+                return None
+            with self._lock:
+                cached = self._loaded.get(collection)
+                if cached and cached[0] == version:
+                    return cached[1]
+            try:
+                index = self._load(collection, version)
+            except OSError:
+                continue                 # superseded mid-read: re-resolve the pointer
+            with self._lock:
+                self._loaded[collection] = (version, index)
+            return index
+        return None
+
+    def dimension(self, collection: str) -> int | None:
+        """Vector dimension of the stored index, read from the ``.npy`` header only."""
+        version = self._version(collection)
+        if version is None:
+            return None
+        try:
+            vectors = np.load(os.path.join(self.path(collection), version, "vectors.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        return int(vectors.shape[1]) if vectors.ndim == 2 else None
+
+    def build(self, collection: str, ids: list[str], embeddings) -> CompactIndex | None:
+        """Quantise and persist the index for *collection* as a new version."""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if len(vectors) == 0:
+            self.drop(collection)
+            return None
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        codes, lo, scale = CompactIndex.quantise(vectors)
+
+        base = self.path(collection)
+        os.makedirs(base, exist_ok=True)
+        version_dir = tempfile.mkdtemp(prefix=f"v{time.time_ns()}-", dir=base)
+        version = os.path.basename(version_dir)
+        try:
+            np.save(os.path.join(version_dir, "codes.npy"), codes)
+            np.save(os.path.join(version_dir, "quant.npy"), np.stack([lo, scale]))
+            np.save(os.path.join(version_dir, "vectors.npy"), vectors)
+            with open(os.path.join(version_dir, "meta.json"), "w") as f:
+                json.dump({"ids": list(ids)}, f)
+            fd, tmp = tempfile.mkstemp(prefix=f".{self._POINTER}.", dir=base)
+            with os.fdopen(fd, "w") as f:
+                f.write(version)
+            previous = self._version(collection)
+            os.replace(tmp, os.path.join(base, self._POINTER))
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+        with self._lock:
+            self._loaded.pop(collection, None)
+        self._prune(collection, previous)
+        return self.get(collection)
+
+    @staticmethod
+    def _built_at(version: str) -> int | None:
+        stamp = version[1:].split("-", 1)[0]
+        return int(stamp) if version.startswith("v") and stamp.isdigit() else None
+
+    def _prune(self, collection: str, previous: str | None):
+        """Remove versions older than *previous*, and the pre-versioning flat files.
+
+        Newer directories may be another process's build in progress.
+        """
+        base = self.path(collection)
+        bound = self._built_at(previous) if previous else None
+        for entry in os.scandir(base):
+            if entry.is_dir():
+                built_at = self._built_at(entry.name)
+                if bound is not None and built_at is not None and built_at < bound:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            elif entry.name in _FLAT_LAYOUT:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def release(self, collection: str):
+        """Forget the in-memory copy; the files stay and are reloaded on demand."""
+        with self._lock:
+            self._loaded.pop(collection, None)
+
+    def drop(self, collection: str):
+        with self._lock:
+            self._loaded.pop(collection, None)
+        shutil.rmtree(self.path(collection), ignore_errors=True)
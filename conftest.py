@@ -0,0 +1,37 @@
+"""Shared pytest fixtures: RAG wired to throwaway stores and offline embeddings."""
+import sys
+
+import pytest
+
+sys.path.insert(0, ".")
+
+EMBEDDING_DIM = 64
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    """The RAG module with every store under *tmp_path* and the hashed backend.
+
+    Nothing touches the real Chroma directory, caches or the OpenAI API.
+    """
+    import RAG
+    from collection_router import CollectionRouter
+    from compact_index import CompactIndexStore
+    from embedding_backends import HashedNgramEmbeddings, backend_key
+    from lexical_index import LexicalIndexStore
+    from page_cache import PageCache
+    from retrieval_cache import RetrievalCache
+    from vector_session import VectorSession
+
+    embeddings = HashedNgramEmbeddings(dim=EMBEDDING_DIM)
+    monkeypatch.setattr(RAG, "embedding_backend", "hashed")
+    monkeypatch.setattr(RAG, "embedding_id", backend_key("hashed", "", {"dim": EMBEDDING_DIM}))
+    monkeypatch.setattr(RAG, "_base_client", embeddings)
+    monkeypatch.setattr(RAG, "embedding_cache", None)
+    monkeypatch.setattr(RAG, "vector_session", VectorSession(str(tmp_path / "chroma"), lambda: embeddings))
+    monkeypatch.setattr(RAG, "lexical_indexes", LexicalIndexStore(str(tmp_path / "bm25")))
+    monkeypatch.setattr(RAG, "compact_indexes", CompactIndexStore(str(tmp_path / "compact")))
+    monkeypatch.setattr(RAG, "collection_router", CollectionRouter(str(tmp_path / "router")))
+    monkeypatch.setattr(RAG, "page_cache", PageCache(str(tmp_path / "pages.sqlite")))
+    monkeypatch.setattr(RAG, "retrieval_cache", RetrievalCache(str(tmp_path / "retrieval.sqlite")))
+    return RAG
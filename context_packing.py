@@ -0,0 +1,187 @@
+"""
+Token-budgeted packing of retrieved chunks.
+
+``retrieval_tool`` output is fed into every later model call in a thread,
+so every duplicated or low-value character is paid for repeatedly.
+``pack_context`` turns a ranked list of retrieved chunks into a smaller
+list of passages:
+
+* chunks from the same page whose spans overlap (or sit within
+  ``merge_gap`` characters of each other) are merged into one passage,
+  so overlapping text appears once;
+* chunks whose text is contained in another retrieved chunk are dropped;
+* passages are emitted best-rank first until ``max_tokens`` is spent —
+  the passage that crosses the budget loses its lowest-ranked chunks
+  first (a lone chunk is cut at a line or sentence boundary), everything
+  after it is dropped.
+
+Spans come from the ``start_index`` metadata that both chunkers record.
+"""
+
+from dataclasses import dataclass, field
+
+from langchain_core.documents import Document
+
+from embedding_scheduler import estimate_tokens
+
+# A trimmed passage shorter than this is not worth its header.
+_MIN_TRIM_TOKENS = 40
+
+
+@dataclass
+class Passage:
+    """One contiguous piece of a page, assembled from one or more chunks."""
+
+    text: str
+    rank: int                        # best (lowest) rank of any member chunk
+    collection: str | None = None
+    page: int | None = None
+    start: int | None = None
+    end: int | None = None
+    members: int = 1
+    metadata: dict = field(default_factory=dict)
+    trimmed: bool = False
+    parts: list[tuple[int, int, str]] = field(default_factory=list)  # (rank, start, text)
+
+
+def _page_key(collection: str | None, doc: Document):
+    meta = doc.metadata
+    source = meta.get("source_file") or meta.get("source")
+    if source is None or meta.get("page") is None or meta.get("start_index") is None:
+        return None
+    return (collection, source, meta["page"])
+
+
+def _merge(into: Passage, other: Passage):
+    """Append *other* (which starts at or after *into*) to *into*."""
+    if other.end <= into.end:
+        pass                                            # fully contained
+    elif other.start <= into.end:
+        into.text += other.text[into.end - other.start:]  # overlapping tail
+        into.end = other.end
+    else:
+        into.text += "\n" + other.text                  # small gap
+        into.end = other.end
+    into.rank = min(into.rank, other.rank)
+    into.members += other.members
+    into.parts += other.parts
+
+
+def _assemble(parts: list[tuple[int, int, str]]) -> str:
+    """Rebuild the page text covered by *parts*, overlaps written once."""
+    ordered = sorted(parts, key=lambda part: part[1])
+    _, start, text = ordered[0]
+    passage = Passage(text=text, rank=0, start=start, end=start + len(text))
+    for _, start, text in ordered[1:]:
+        _merge(passage, Passage(text=text, rank=0, start=start, end=start + len(text)))
+    return passage.text
+
+
+def _trim(text: str, max_tokens: int) -> str:
+    """Cut *text* to about *max_tokens*, preferring a line / sentence end."""
+    limit = max_tokens * 4
+    if len(text) <= limit:
+        return text
+    head = text[:limit]
+    for sep in ("\n", ". "):
+        cut = head.rfind(sep)
+        if cut > limit // 2:
+            return head[:cut + 1].rstrip()
+    return head.rstrip() + "…"
+
+
+def _trim_passage(passage: Passage, max_tokens: int) -> str:
+    """Cut *passage* to about *max_tokens*, dropping its worst-ranked chunks first.
+
+    A merged passage keeps member chunks in rank order while they fit, so
+    the chunk that earned the passage its place survives even when it sits
+    at the end of the page span. Only a single chunk is cut mid-text.
+    """
+    if len(passage.parts) < 2:
+        return _trim(passage.text, max_tokens)
+    kept: list[tuple[int, int, str]] = []
+    for part in sorted(passage.parts):
+        if estimate_tokens(_assemble(kept + [part])) <= max_tokens:
+            kept.append(part)
+    if not kept:
+        return _trim(min(passage.parts)[2], max_tokens)
+    return _assemble(kept)
+
+
+def pack_context(
+    hits: list[tuple[str | None, Document]],
+    max_tokens: int,
+    merge_gap: int = 200,
+) -> list[Passage]:
+    """Merge, dedupe and budget-trim ranked chunks.
+
+    Parameters
+    ----------
+    hits : list of ``(collection, document)``
+        Retrieved chunks, best first.
+    max_tokens : int
+        Token budget for the passage texts.
+    merge_gap : int
+        Chunks on the same page at most this many characters apart are
+        joined into one passage.
+
+    Returns
+    -------
+    list[Passage]
+        Passages in best-rank order.
+    """
+    passages: list[Passage] = []
+    by_page: dict[tuple, list[Passage]] = {}
+    for rank, (collection, doc) in enumerate(hits):
+        meta = doc.metadata or {}
+        passage = Passage(
+            text=doc.page_content,
+            rank=rank,
+            collection=collection,
+            page=meta.get("page"),
+            metadata=meta,
+        )
+        key = _page_key(collection, doc)
+        if key is None:
+            passages.append(passage)
+            continue
+        passage.start = meta["start_index"]
+        passage.end = passage.start + len(doc.page_content)
+        passage.parts = [(rank, passage.start, doc.page_content)]
+        by_page.setdefault(key, []).append(passage)
+
+    for group in by_page.values():
+        group.sort(key=lambda p: p.start)
+        current = group[0]
+        for nxt in group[1:]:
+            if nxt.start <= current.end + merge_gap:
+                _merge(current, nxt)
+            else:
+                passages.append(current)
+                current = nxt
+        passages.append(current)
+
+    # Drop passages whose text already appears inside a better one
+    # (e.g. the same chunk returned from two overlapping collections).
+    passages.sort(key=lambda p: p.rank)
+    unique: list[Passage] = []
+    for p in passages:
+        body = p.text.strip()
+        if any(body in kept.text for kept in unique):
+            continue
+        unique.append(p)
+
+    packed: list[Passage] = []
+    remaining = max_tokens
+    for p in unique:
+        cost = estimate_tokens(p.text)
+        if cost <= remaining:
+            packed.append(p)
+            remaining -= cost
+            continue
+        if remaining >= _MIN_TRIM_TOKENS:
+            p.text = _trim_passage(p, remaining)
+            p.trimmed = True
+            packed.append(p)
+        break
+    return packed
@@ -0,0 +1,160 @@
+"""
+Pluggable embedding backends.
+
+``rag.embedding_backend`` picks what turns text into vectors:
+
+``openai``
+    ``OpenAIEmbeddings`` with ``rag.embedding_model`` (the default).
+``local``
+    A sentence-transformers model run on the CPU.  No network round trip;
+    needs the optional ``sentence-transformers`` package.
+``hashed``
+    Signed feature hashing of word and character n-grams into a fixed
+    number of dimensions.  Deterministic, dependency-free apart from NumPy
+    and fast — meant for offline runs, tests and benchmarks rather than
+    retrieval quality.
+
+Every backend is a LangChain ``Embeddings``, so caching, the collection
+router and Chroma work unchanged.  ``backend_key`` identifies a backend +
+model; it is part of embedding-cache keys and is stored on every chunk so
+vectors from different backends are never mixed.
+"""
+
+import re
+import zlib
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+BACKENDS = ("openai", "local", "hashed")
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class HashedNgramEmbeddings(Embeddings):
+    """Feature-hashed bag of word unigrams/bigrams and character n-grams.
+
+    Parameters
+    ----------
+    dim : int
+        Output dimensionality.
+    char_ngrams : tuple[int, int]
+        Inclusive range of character n-gram lengths (within words).
+    """
+
+    def __init__(self, dim: int = 512, char_ngrams: tuple[int, int] = (3, 5)):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+
+    def _features(self, text: str) -> list[str]:
+        words = _WORD_RE.findall(text.lower())
+        features = list(words)
+        features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        lo, hi = self.char_ngrams
+        for word in words:
+            padded = f"<{word}>"
+            for n in range(lo, hi + 1):
+                features += [padded[i:i + n] for i in range(len(padded) - n + 1)]
+        return features
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        rows: list[int] = []
+        cols: list[int] = []
+        signs: list[float] = []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class LocalEmbeddings(Embeddings):
+    """sentence-transformers model on the CPU, batched and L2-normalised.
+
+    Parameters
+    ----------
+    model : str
+        Hugging Face model name or local path.
+    batch_size : int
+        Texts per forward pass.
+    device : str
+        Torch device; ``"cpu"`` unless you know better.
+    """
+
+    def __init__(self, model: str = "sentence-transformers/all-MiniLM-L6-v2", batch_size: int = 64, device: str = "cpu"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as exc:
+            raise ImportError(
+                "rag.embedding_backend 'local' needs the sentence-transformers package: "
+                "pip install sentence-transformers"
+            ) from exc
+        self.model_name = model
+        self.batch_size = batch_size
+        self._model = SentenceTransformer(model, device=device)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        vectors = self._model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def backend_key(backend: str, model: str, options: dict | None = None) -> str:
+    """Stable identifier for a backend + model (cache keys, chunk metadata)."""
+    options = options or {}
+    if backend == "openai":
+        return model
+    if backend == "local":
+        return f"local:{options.get('model', 'sentence-transformers/all-MiniLM-L6-v2')}"
+    if backend == "hashed":
+        return f"hashed:{options.get('dim', 512)}"
+    raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+
+
+def make_embeddings(backend: str, model: str, options: dict | None = None, **openai_kwargs) -> Embeddings:
+    """Build the ``Embeddings`` for *backend*.
+
+    Parameters
+    ----------
+    backend : str
+        ``openai``, ``local`` or ``hashed``.
+    model : str
+        OpenAI model name (``openai`` backend only).
+    options : dict, optional
+        Backend settings from ``config.yaml`` (``model`` / ``batch_size`` /
+        ``device`` for local, ``dim`` for hashed).
+    **openai_kwargs
+        Extra ``OpenAIEmbeddings`` arguments (e.g. ``max_retries``).
+    """
+    options = options or {}
+    if backend == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(model=model, **openai_kwargs)
+    if backend == "local":
+        return LocalEmbeddings(
+            model=options.get("model", "sentence-transformers/all-MiniLM-L6-v2"),
+            batch_size=options.get("batch_size", 64),
+            device=options.get("device", "cpu"),
+        )
+    if backend == "hashed":
+        return HashedNgramEmbeddings(dim=options.get("dim", 512))
+    raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {', '.join(BACKENDS)})")
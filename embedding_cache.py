@@ -0,0 +1,232 @@
+"""
+Content-addressed embedding cache.
+
+Embedding vectors are persisted in a small SQLite file keyed by
+``sha256(embedding_model, chunk text)``.  Re-ingesting a lightly edited PDF
+(or retrying after an ambient failure) only pays the embedding API for
+chunks whose text actually changed — everything else is a local lookup.
+
+The cache is size-bounded: once the stored vectors exceed ``max_size_mb``
+the least-recently-used entries are evicted.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from langchain_core.embeddings import Embeddings
+
+# SQLite's default host-parameter limit is 999 — stay well below it.
+_SQL_BATCH = 500
+
+
+def content_key(model: str, text: str) -> str:
+    """Return the cache key for *text* embedded with *model*."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> list[float]:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+# ---------------------------------------------------------------------------
+# On-disk store
+# ---------------------------------------------------------------------------
+
+class EmbeddingCache:
+    """Persistent, LRU-evicting map of content key -> embedding vector.
+
+    Parameters
+    ----------
+    path : str
+        SQLite file to store vectors in (created if missing).
+    max_size_mb : float
+        Upper bound on the total size of stored vectors.  Least-recently
+        used entries are evicted once it is exceeded.
+    """
+
+    def __init__(self, path: str, max_size_mb: float = 512):
+        self.path = path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used "
+                "ON embeddings(last_used)"
+            )
+            self._conn.commit()
+            self._approx_bytes = self._size_bytes_locked()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """Look up *keys*; return only the ones present in the cache."""
+        unique = list(dict.fromkeys(keys))
+        found: dict[str, list[float]] = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(unique), _SQL_BATCH):
+                batch = unique[i:i + _SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = _unpack(blob)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({marks})",
+                        [now, *batch],
+                    )
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, items: dict[str, list[float]]):
+        """Store vectors, then evict LRU entries if over the size budget."""
+        if not items:
+            return
+        now = time.time()
+        rows = [(k, _pack(v), now) for k, v in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                rows,
+            )
+            # Running upper bound (replacements over-count); only pay for an
+            # exact SUM() scan once it crosses the budget.
+            self._approx_bytes += sum(len(r[1]) for r in rows)
+            if self._approx_bytes > self.max_bytes:
+                self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self):
+        total = self._size_bytes_locked()
+        self._approx_bytes = total
+        if total <= self.max_bytes:
+            return
+        doomed: list[str] = []
+        rows = self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used ASC"
+        )
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append(key)
+            total -= size
+        self._approx_bytes = total
+        for i in range(0, len(doomed), _SQL_BATCH):
+            batch = doomed[i:i + _SQL_BATCH]
+            self._conn.execute(
+                f"DELETE FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+        self.evictions += len(doomed)
+
+    def _size_bytes_locked(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and current size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            size = self._size_bytes_locked()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+# ---------------------------------------------------------------------------
+# LangChain adapter
+# ---------------------------------------------------------------------------
+
+class CachedEmbeddings(Embeddings):
+    """Wrap an ``Embeddings`` object so every embedding goes through the cache.
+
+    Only chunks missing from the cache are sent to *underlying*; identical
+    texts within one call are embedded once.  Query embeddings share the
+    same store, so a repeated query ("definition of eigenvalue") never
+    costs a second API call.
+
+    Parameters
+    ----------
+    underlying : Embeddings
+        The real embedding client (e.g. ``OpenAIEmbeddings``).
+    cache : EmbeddingCache
+        Shared on-disk cache.
+    model : str
+        Embedding model name — part of the cache key so switching models
+        never serves stale vectors.
+    """
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache, model: str):
+        self.underlying = underlying
+        self.cache = cache
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [content_key(self.model, t) for t in texts]
+        found = self.cache.get_many(keys)
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(fresh)
+            found.update(fresh)
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        return [found[k] for k in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = content_key(self.model, text)
+        found = self.cache.get_many([key])
+        if key in found:
+            self.hits += 1
+            return found[key]
+        vector = self.underlying.embed_query(text)
+        self.cache.put_many({key: vector})
+        self.misses += 1
+        return vector
@@ -0,0 +1,227 @@
+"""
+Embedding request scheduler.
+
+Packs texts into token-budgeted batches, keeps a bounded number of
+embedding requests in flight, and backs off when the provider returns a
+rate-limit error.  The batch token budget adapts: it is halved on every
+rate-limit and grows back slowly after successful requests (AIMD).
+
+``ScheduledEmbeddings`` exposes the scheduler as a LangChain ``Embeddings``
+so it can sit underneath ``CachedEmbeddings`` in ``RAG``.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from langchain_core.embeddings import Embeddings
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/maths prose)."""
+    return max(1, len(text) // 4)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True for HTTP 429 / provider rate-limit exceptions."""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    name = type(exc).__name__.lower()
+    text = str(exc).lower()
+    return "ratelimit" in name or "rate limit" in text or "429" in text
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def pack_batches(texts: list[str], max_tokens: int, max_items: int) -> list[list[int]]:
+    """Group text indices into batches under *max_tokens* and *max_items*.
+
+    Order is preserved.  A single text larger than the budget gets a batch
+    of its own rather than being dropped.
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    used = 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if current and (used + cost > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingScheduler:
+    """Concurrent, rate-limit-aware batching for an ``embed_fn``.
+
+    Parameters
+    ----------
+    embed_fn : callable
+        ``embed_fn(texts) -> vectors`` — performs one embedding request.
+    max_batch_tokens : int
+        Upper bound on estimated tokens per request.
+    max_batch_items : int
+        Upper bound on texts per request.
+    concurrency : int
+        Requests in flight at once, shared by every caller of this scheduler.
+    max_retries : int
+        Rate-limit retries per batch before the error is raised.
+    base_delay : float
+        First backoff delay in seconds; doubles per retry (with jitter).
+    min_batch_tokens : int
+        Floor for the adaptive token budget.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[list[str]], list[list[float]]],
+        max_batch_tokens: int = 8000,
+        max_batch_items: int = 256,
+        concurrency: int = 4,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        min_batch_tokens: int = 500,
+    ):
+        self.embed_fn = embed_fn
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_items = max_batch_items
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.min_batch_tokens = min(min_batch_tokens, max_batch_tokens)
+        self.batch_tokens = max_batch_tokens
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="embed")
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "chunks": 0, "tokens": 0, "rate_limited": 0, "busy_s": 0.0}
+        self._started: float | None = None
+        self._resume_at = 0.0
+
+    # -- adaptive budget ----------------------------------------------------
+
+    def _on_success(self):
+        with self._lock:
+            self.batch_tokens = min(self.max_batch_tokens, self.batch_tokens + self.max_batch_tokens // 8)
+
+    def _on_rate_limit(self):
+        with self._lock:
+            self._stats["rate_limited"] += 1
+            self.batch_tokens = max(self.min_batch_tokens, self.batch_tokens // 2)
+
+    # -- execution ------------------------------------------------------------
+
+    def _wait_for_cooldown(self):
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _run_batch(self, texts: list[str]) -> list[list[float]]:
+        attempt = 0
+        while True:
+            self._wait_for_cooldown()
+            t0 = time.perf_counter()
+            try:
+                vectors = self.embed_fn(texts)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                self._on_rate_limit()
+                delay = _retry_after(e) or self.base_delay * (2 ** attempt)
+                delay *= random.uniform(1.0, 1.2)
+                # Pause every worker, not just this one — the quota is shared.
+                with self._lock:
+                    self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                attempt += 1
+                continue
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self._stats["requests"] += 1
+                self._stats["chunks"] += len(texts)
+                self._stats["tokens"] += sum(estimate_tokens(t) for t in texts)
+                self._stats["busy_s"] += elapsed
+            self._on_success()
+            return vectors
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed *texts*, returning vectors in input order."""
+        if not texts:
+            return []
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+            budget = self.batch_tokens
+        batches = pack_batches(texts, budget, self.max_batch_items)
+        futures = [self._pool.submit(self._run_batch, [texts[i] for i in b]) for b in batches]
+
+        out: list[list[float] | None] = [None] * len(texts)
+        for batch, fut in zip(batches, futures):
+            for i, vec in zip(batch, fut.result()):
+                out[i] = vec
+        return out
+
+    def embed_now(self, texts: list[str]) -> list[list[float]]:
+        """Embed *texts* as one request on the calling thread.
+
+        For latency-sensitive callers (queries): no queueing behind ingest
+        batches, but the same rate-limit retries and shared cooldown.
+        """
+        if not texts:
+            return []
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+        return self._run_batch(texts)
+
+    def stats(self) -> dict:
+        """Throughput counters since the first request."""
+        with self._lock:
+            s = dict(self._stats)
+            wall = (time.perf_counter() - self._started) if self._started else 0.0
+            s["batch_tokens"] = self.batch_tokens
+        s["wall_s"] = round(wall, 3)
+        s["chunks_per_s"] = round(s["chunks"] / wall, 2) if wall else 0.0
+        s["tokens_per_s"] = round(s["tokens"] / wall, 2) if wall else 0.0
+        return s
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class ScheduledEmbeddings(Embeddings):
+    """LangChain adapter: embeddings go through an ``EmbeddingScheduler``.
+
+    Documents are batched on the scheduler's pool; a query is sent at once
+    with ``embed_now``.
+
+    Parameters
+    ----------
+    underlying : Embeddings
+        The real client.  For ``OpenAIEmbeddings`` pass ``max_retries=0`` so
+        rate-limit backoff is handled here, not inside the SDK.
+    scheduler : EmbeddingScheduler, optional
+        Shared scheduler; one is built around *underlying* if omitted.
+    """
+
+    def __init__(self, underlying: Embeddings, scheduler: EmbeddingScheduler | None = None):
+        self.underlying = underlying
+        self.scheduler = scheduler or EmbeddingScheduler(underlying.embed_documents)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.scheduler.embed(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.scheduler.embed_now([text])[0]
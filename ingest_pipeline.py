@@ -0,0 +1,292 @@
+"""
+Streaming PDF ingestion pipeline.
+
+Pages are extracted in a process pool, split into chunks as soon as each
+page range completes, and chunks are embedded in concurrent batches on a
+thread pool — so extraction, splitting and embedding overlap instead of
+running back-to-back.
+
+``RAG.setup_retriever`` drives this module; it supplies the splitter,
+embeddings, chunk-ID assignment and the write sink.  With a ``page_cache``
+(see ``page_cache.py``) a PDF whose bytes were parsed before skips
+extraction altogether.
+"""
+
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from langchain_core.documents import Document
+
+
+# ---------------------------------------------------------------------------
+# Stats
+# ---------------------------------------------------------------------------
+
+class IngestCancelled(Exception):
+    """Raised inside the pipeline when the caller asked it to stop."""
+
+
+@dataclass
+class PipelineStats:
+    """Per-stage counters and busy time (seconds) for one pipeline run."""
+
+    total_pages: int = 0
+    pages: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    extract_s: float = 0.0
+    split_s: float = 0.0
+    embed_s: float = 0.0
+    write_s: float = 0.0
+    wall_s: float = 0.0
+
+    def rates(self) -> dict:
+        """Pages/sec for each stage, based on that stage's busy time."""
+        def per_sec(n, secs):
+            return round(n / secs, 2) if secs > 0 else None
+        return {
+            "extract_pages_per_s": per_sec(self.pages, self.extract_s),
+            "split_pages_per_s": per_sec(self.pages, self.split_s),
+            "embed_chunks_per_s": per_sec(self.embedded, self.embed_s),
+            "end_to_end_pages_per_s": per_sec(self.pages, self.wall_s),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Page extraction (runs in worker processes)
+# ---------------------------------------------------------------------------
+
+# Ingestion runs on a worker thread of a server that also has the event
+# loop, HTTP pools and other threads running.  A forked child inherits
+# their locks in whatever state they were in and can deadlock on them, so
+# extraction workers are started fresh instead.
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+def _extract_pages(reader, start: int, stop: int) -> tuple[list[tuple[int, str]], float]:
+    """Extract text for pages ``[start, stop)`` from an open ``PdfReader``."""
+    t0 = time.perf_counter()
+    pages = [(i, reader.pages[i].extract_text() or "") for i in range(start, stop)]
+    return pages, time.perf_counter() - t0
+
+
+# Opening a PdfReader parses the xref table and page tree (~0.2s for a
+# 140-page set of notes), so each worker process opens the PDF once.
+_worker_reader = None
+
+
+def _init_worker(pdf_path: str):
+    global _worker_reader
+    from pypdf import PdfReader
+    _worker_reader = PdfReader(pdf_path)
+
+
+def _extract_page_range(start: int, stop: int) -> tuple[list[tuple[int, str]], float]:
+    """Worker-side ``_extract_pages`` on the reader from ``_init_worker``.  Top-level so it pickles."""
+    return _extract_pages(_worker_reader, start, stop)
+
+
+def iter_pages(
+    pdf_path: str,
+    workers: int = 4,
+    pages_per_task: int = 8,
+    stats: PipelineStats | None = None,
+    page_cache=None,
+    file_hash: str | None = None,
+) -> Iterator[Document]:
+    """Yield one ``Document`` per page, in completion order.
+
+    Metadata matches ``PyPDFLoader`` (``source``, ``page``) so chunk IDs and
+    retrieval output are unchanged by switching loaders.
+
+    If *page_cache* and *file_hash* are given, cached pages are served
+    without opening the PDF; otherwise the pages are stored once the whole
+    document has been extracted (an abandoned run stores nothing).
+    """
+    cached = page_cache.get(file_hash) if page_cache is not None and file_hash else None
+    if cached is not None:
+        if stats is not None:
+            stats.total_pages = len(cached)
+            stats.pages += len(cached)
+        for page, text in cached:
+            yield Document(
+                page_content=text,
+                metadata={"source": pdf_path, "page": page, "total_pages": len(cached)},
+            )
+        return
+
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    total = len(reader.pages)
+    if stats is not None:
+        stats.total_pages = total
+    workers = max(1, min(workers, os.cpu_count() or 1))
+    extracted: list[tuple[int, str]] = []
+
+    def to_docs(result):
+        pages, elapsed = result
+        if stats is not None:
+            stats.extract_s += elapsed
+            stats.pages += len(pages)
+        extracted.extend(pages)
+        for page, text in pages:
+            yield Document(
+                page_content=text,
+                metadata={"source": pdf_path, "page": page, "total_pages": total},
+            )
+
+    # A process pool costs more to start than it saves on short documents.
+    if workers <= 1 or total <= pages_per_task:
+        for start in range(0, total, pages_per_task):
+            yield from to_docs(_extract_pages(reader, start, min(start + pages_per_task, total)))
+    else:
+        # One contiguous range per worker, each read through that worker's own reader.
+        step = math.ceil(total / workers)
+        ranges = [(s, min(s + step, total)) for s in range(0, total, step)]
+        pool = ProcessPoolExecutor(
+            max_workers=len(ranges), mp_context=_MP_CONTEXT, initializer=_init_worker, initargs=(pdf_path,)
+        )
+        try:
+            futures = [pool.submit(_extract_page_range, s, e) for s, e in ranges]
+            for fut in as_completed(futures):
+                yield from to_docs(fut.result())
+        finally:
+            # Runs on early exit too (e.g. cancellation): drop unstarted ranges.
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    if page_cache is not None and file_hash:
+        page_cache.put(file_hash, sorted(extracted))
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def run_pipeline(
+    pdf_path: str,
+    splitter,
+    embeddings,
+    sink: Callable[[list[str], list[Document], list[list[float]]], None],
+    assign_id: Callable[[Document], str | None],
+    workers: int = 4,
+    pages_per_task: int = 8,
+    batch_size: int = 64,
+    concurrency: int = 4,
+    progress: Callable[[PipelineStats], None] | None = None,
+    should_cancel: Callable[[], bool] | None = None,
+    page_cache=None,
+    file_hash: str | None = None,
+) -> PipelineStats:
+    """Extract, split, embed and write a PDF with overlapping stages.
+
+    Parameters
+    ----------
+    pdf_path : str
+        PDF to ingest.
+    splitter : TextSplitter
+        Splits each page ``Document`` into chunks.
+    embeddings : Embeddings
+        Used for ``embed_documents`` on each batch (called from worker threads).
+    sink : callable
+        ``sink(ids, chunks, vectors)`` — persists one embedded batch.  Calls
+        are serialised, so it need not be thread-safe.
+    assign_id : callable
+        Returns the chunk's ID, or ``None`` to skip it (already stored or a
+        duplicate).
+    workers : int
+        Processes used for page extraction (capped at the CPU count); each
+        opens the PDF once and extracts one contiguous range of pages.
+    pages_per_task : int
+        Pages extracted between hand-offs to the splitter when extraction
+        runs in-process; documents this short never start a pool.
+    batch_size : int
+        Chunks per embedding request.
+    concurrency : int
+        Embedding requests in flight at once.
+    progress : callable, optional
+        Called with the running ``PipelineStats`` after every page and batch.
+    should_cancel : callable, optional
+        Polled between pages and batches; returning ``True`` raises
+        ``IngestCancelled``.  Batches already written are left to the caller.
+    page_cache : PageCache, optional
+        Serves / stores extracted pages by *file_hash* (see ``iter_pages``).
+    file_hash : str, optional
+        SHA-256 of the PDF bytes.
+
+    Returns
+    -------
+    PipelineStats
+    """
+    stats = PipelineStats()
+    t_start = time.perf_counter()
+
+    def embed(ids: list[str], docs: list[Document]):
+        t0 = time.perf_counter()
+        vectors = embeddings.embed_documents([d.page_content for d in docs])
+        return ids, docs, vectors, time.perf_counter() - t0
+
+    def drain(done):
+        for fut in done:
+            ids, docs, vectors, elapsed = fut.result()
+            stats.embed_s += elapsed
+            stats.embedded += len(ids)
+            t0 = time.perf_counter()
+            sink(ids, docs, vectors)
+            stats.write_s += time.perf_counter() - t0
+            if progress:
+                progress(stats)
+
+    def check_cancel():
+        if should_cancel and should_cancel():
+            raise IngestCancelled(pdf_path)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        in_flight: set = set()
+        batch_ids: list[str] = []
+        batch_docs: list[Document] = []
+
+        def submit():
+            nonlocal batch_ids, batch_docs
+            in_flight.add(pool.submit(embed, batch_ids, batch_docs))
+            batch_ids, batch_docs = [], []
+            # Back-pressure: never queue more than 2x concurrency batches.
+            while len(in_flight) >= 2 * concurrency:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                in_flight.difference_update(done)
+                drain(done)
+
+        for page in iter_pages(pdf_path, workers, pages_per_task, stats, page_cache, file_hash):
+            check_cancel()
+            t0 = time.perf_counter()
+            chunks = splitter.split_documents([page])
+            stats.split_s += time.perf_counter() - t0
+            stats.chunks += len(chunks)
+
+            for chunk in chunks:
+                cid = assign_id(chunk)
+                if cid is None:
+                    continue
+                batch_ids.append(cid)
+                batch_docs.append(chunk)
+                if len(batch_ids) >= batch_size:
+                    submit()
+
+            # Harvest finished batches without blocking extraction.
+            done = {f for f in in_flight if f.done()}
+            in_flight.difference_update(done)
+            drain(done)
+            if progress:
+                progress(stats)
+
+        if batch_ids:
+            submit()
+        check_cancel()
+        drain(as_completed(in_flight))
+
+    stats.wall_s = time.perf_counter() - t_start
+    return stats
@@ -0,0 +1,207 @@
+"""
+Background ingestion worker.
+
+``RAG.setup_retriever`` blocks for the whole parse + embed of a PDF.
+Calling it from ``async def`` code (the ambient loop, or an agent tool
+running under FastAPI) freezes the event loop — and every WebSocket on it —
+until ingestion finishes.
+
+This module runs ingestion on a dedicated thread pool behind an async
+facade, reports progress events back on the event loop, and supports
+cooperative cancellation (the pipeline stops between pages/batches and
+rolls back its partial write).
+
+Usage
+-----
+    from ingest_worker import get_ingest_worker
+    job = await get_ingest_worker().ingest(pdf_path, collection)
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable
+
+from ingest_pipeline import IngestCancelled
+
+_PROGRESS_INTERVAL_S = 0.5
+
+# Progress callback for ingests started in the current context that don't
+# pass ``on_progress`` — e.g. the server sets it per agent run so an
+# ``ingest_pdf_tool`` call reports to that task's WebSocket.
+progress_sink: contextvars.ContextVar[Callable[[dict], None] | None] = contextvars.ContextVar(
+    "ingest_progress_sink", default=None
+)
+
+
+class IngestJob:
+    """One PDF ingestion, tracked from queue to completion."""
+
+    def __init__(self, pdf_path: str, collection: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.pdf_path = pdf_path
+        self.collection = collection
+        self.status = "queued"  # queued | running | completed | failed | cancelled
+        self.error = ""
+        self.pages_done = 0
+        self.pages_total = 0
+        self.chunks_embedded = 0
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.finished_at = ""
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Ask the running pipeline to stop at its next checkpoint."""
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "pdf_path": self.pdf_path,
+            "collection": self.collection,
+            "status": self.status,
+            "error": self.error,
+            "pages_done": self.pages_done,
+            "pages_total": self.pages_total,
+            "chunks_embedded": self.chunks_embedded,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class IngestWorker:
+    """Dedicated thread pool for PDF ingestion with an async interface.
+
+    Parameters
+    ----------
+    max_workers : int
+        PDFs ingested concurrently.  Extra jobs queue.
+    history : int
+        Finished jobs kept for ``jobs()`` / status endpoints.
+    """
+
+    def __init__(self, max_workers: int = 1, history: int = 50):
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ingest")
+        self._history = history
+        self._jobs: OrderedDict[str, IngestJob] = OrderedDict()
+
+    def _remember(self, job: IngestJob):
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._history:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.status in ("queued", "running"):
+                break
+            self._jobs.popitem(last=False)
+
+    async def ingest(
+        self,
+        pdf_path: str,
+        collection: str | None = None,
+        on_progress: Callable[[dict], None] | None = None,
+    ) -> IngestJob:
+        """Ingest *pdf_path* without blocking the event loop.
+
+        Parameters
+        ----------
+        pdf_path : str
+            PDF to ingest.
+        collection : str, optional
+            Target collection; derived from the filename if omitted.
+        on_progress : callable, optional
+            Called on the event loop with ``job.to_dict()`` as ingestion
+            advances (throttled), and once more when it finishes.  Defaults
+            to the context's ``progress_sink``.
+
+        Returns
+        -------
+        IngestJob
+            The completed job.  Failures re-raise the ingestion error;
+            cancelling the awaiting task cancels the ingestion.
+        """
+        from RAG import collection_name_from_filename, setup_retriever
+
+        on_progress = on_progress or progress_sink.get()
+        job = IngestJob(pdf_path, collection or collection_name_from_filename(pdf_path))
+        self._remember(job)
+        loop = asyncio.get_running_loop()
+        last_emit = 0.0
+
+        def notify():
+            if on_progress:
+                loop.call_soon_threadsafe(on_progress, job.to_dict())
+
+        def on_stats(stats):
+            nonlocal last_emit
+            job.pages_done = stats.pages
+            job.pages_total = stats.total_pages
+            job.chunks_embedded = stats.embedded
+            now = time.monotonic()
+            if now - last_emit >= _PROGRESS_INTERVAL_S:
+                last_emit = now
+                notify()
+
+        def work():
+            if job.cancel_requested:
+                raise IngestCancelled(pdf_path)
+            job.status = "running"
+            notify()
+            setup_retriever(
+                pdf_path,
+                job.collection,
+                progress=on_stats,
+                should_cancel=lambda: job.cancel_requested,
+            )
+
+        try:
+            await loop.run_in_executor(self._pool, work)
+        except asyncio.CancelledError:
+            job.cancel()
+            job.status = "cancelled"
+            raise
+        except IngestCancelled:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            raise
+        else:
+            job.status = "completed"
+            return job
+        finally:
+            job.finished_at = datetime.now(timezone.utc).isoformat()
+            if on_progress:
+                on_progress(job.to_dict())
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation of a queued or running job."""
+        job = self._jobs.get(job_id)
+        if not job or job.status not in ("queued", "running"):
+            return False
+        job.cancel()
+        return True
+
+    def jobs(self) -> list[dict]:
+        """Known jobs, newest first."""
+        return [j.to_dict() for j in reversed(self._jobs.values())]
+
+
+_worker: IngestWorker | None = None
+
+
+def get_ingest_worker() -> IngestWorker:
+    """Process-wide ingestion worker (created on first use)."""
+    global _worker
+    if _worker is None:
+        from RAG import ingest_max_jobs
+        _worker = IngestWorker(max_workers=ingest_max_jobs)
+    return _worker
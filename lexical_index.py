@@ -0,0 +1,172 @@
+"""
+BM25 lexical index per Chroma collection.
+
+Dense embeddings are weak on exact mathematical terminology ("Cayley-Hamilton",
+"Theorem 3.9") and every vector query costs an embedding round-trip.  This
+module keeps a small in-memory inverted index per collection — built at
+ingest time and persisted as JSON — so keyword queries are answered locally,
+and vector + keyword rankings can be fused with reciprocal rank fusion.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+
+# Keep dotted numbers ("3.9", "2.2.1") as one token so theorem / section
+# references match exactly; hyphenated names split into their parts.
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse several ranked ID lists: ``score(d) = sum 1 / (k + rank)``."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of chunks.
+
+    Parameters
+    ----------
+    ids, texts, metadatas : list
+        Parallel lists describing the chunks.
+    k1, b : float
+        Standard BM25 term-frequency saturation and length normalisation.
+    """
+
+    def __init__(self, ids: list[str], texts: list[str], metadatas: list[dict], k1: float = 1.5, b: float = 0.75):
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.k1 = k1
+        self.b = b
+
+        self.doc_len: list[int] = []
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        for i, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((i, tf))
+        self._finalise()
+
+    def _finalise(self):
+        n = len(self.ids)
+        self.avgdl = (sum(self.doc_len) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in self.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int = 5) -> list[tuple[int, float]]:
+        """Top-*k* ``(doc_index, score)`` pairs; empty if no term matches."""
+        scores: dict[int, float] = {}
+        avgdl = self.avgdl or 1.0
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf[term]
+            for i, tf in plist:
+                norm = tf + self.k1 * (1 - self.b + self.b * self.doc_len[i] / avgdl)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return heapq.nlargest(k, scores.items(), key=lambda kv: kv[1])
+
+    # -- persistence ----------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "ids": self.ids,
+            "texts": self.texts,
+            "metadatas": self.metadatas,
+            "doc_len": self.doc_len,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BM25Index":
+        index = cls.__new__(cls)
+        index.k1 = data["k1"]
+        index.b = data["b"]
+        index.ids = data["ids"]
+        index.texts = data["texts"]
+        index.metadatas = data["metadatas"]
+        index.doc_len = data["doc_len"]
+        index.postings = {t: [tuple(p) for p in plist] for t, plist in data["postings"].items()}
+        index._finalise()
+        return index
+
+
+class LexicalIndexStore:
+    """Loads, caches and rebuilds the per-collection BM25 indexes in *directory*."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._loaded: dict[str, tuple[float, BM25Index]] = {}  # name -> (mtime, index)
+
+    def path(self, collection: str) -> str:
+        return os.path.join(self.directory, f"{collection}.json")
+
+    def get(self, collection: str) -> BM25Index | None:
+        """The collection's index, reloaded if the file changed on disk."""
+        path = self.path(collection)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._loaded.get(collection)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        with open(path, "r") as f:
+            index = BM25Index.from_dict(json.load(f))
+        with self._lock:
+            self._loaded[collection] = (mtime, index)
+        return index
+
+    def build(self, collection: str, ids: list[str], texts: list[str], metadatas: list[dict]) -> BM25Index:
+        """Build and atomically persist the index for *collection*."""
+        index = BM25Index(ids, texts, [m or {} for m in metadatas])
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{collection}.", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(index.to_dict(), f)
+            os.replace(tmp, self.path(collection))
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        with self._lock:
+            self._loaded[collection] = (os.path.getmtime(self.path(collection)), index)
+        return index
+
+    def release(self, collection: str):
+        """Forget the in-memory copy; the file stays and is reloaded on demand."""
+        with self._lock:
+            self._loaded.pop(collection, None)
+
+    def drop(self, collection: str):
+        with self._lock:
+            self._loaded.pop(collection, None)
+        try:
+            os.unlink(self.path(collection))
+        except OSError:
+            pass
@@ -0,0 +1,332 @@
+"""
+Long-lived MCP sessions with cached tool schemas.
+
+``MultiServerMCPClient.get_tools()`` opens a streamable-HTTP session,
+runs the MCP handshake and lists tools on every call, and the tools it
+returns open yet another session per invocation.  Here each configured
+MCP server instead gets one session, held open by a background task:
+
+* tool schemas are listed once per connection and cached; the cache (and
+  ``version``) only changes when the server restarts with a different
+  name / version or tool list, so the agent pool only rebuilds then;
+* tools returned by ``get_tools()`` call through the current session, so
+  every call reuses the warm connection — across reconnects too;
+* a dropped session (failed call or health ping) is re-established with
+  exponential backoff; calls made meanwhile wait up to
+  ``connect_timeout_s`` for it;
+* ``health()`` reports connection state, reconnects, ping and per-tool
+  call latency.
+
+A failed call is not retried automatically — an Anki write may already
+have happened — the agent sees the error and decides.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import statistics
+import time
+from collections import deque
+
+import anyio
+import httpx
+import yaml
+from langchain_core.tools import StructuredTool, ToolException
+
+from multi_server_mcp_client import client as mcp_client
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+
+def _load_config() -> dict:
+    cfg_path = os.path.join(os.path.dirname(__file__), "config.yaml")
+    if os.path.exists(cfg_path):
+        with open(cfg_path, "r") as f:
+            return yaml.safe_load(f)
+    return {}
+
+_session_cfg = _load_config().get("mcp_session", {})
+
+# Errors that mean the transport is gone (as opposed to a tool failing).
+_CONNECTION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    httpx.TransportError,
+    ConnectionError,
+)
+
+
+def _result_text(result) -> str:
+    parts = []
+    for block in result.content or []:
+        text = getattr(block, "text", None)
+        parts.append(text if text is not None else json.dumps(block.model_dump(), default=str))
+    return "\n".join(parts)
+
+
+class _ServerSession:
+    """One persistent session to one MCP server, reconnected on failure."""
+
+    def __init__(self, name: str, manager: "MCPSessionManager"):
+        self.name = name
+        self.manager = manager
+        self.session = None
+        self.server_info: dict = {}
+        self.tool_schemas: list = []
+        self.signature = ""
+        self._ready = asyncio.Event()
+        self._broken = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        self.connects = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = ""
+        self.connected_since = 0.0
+        self.ping_ms: float | None = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"mcp-session-{self.name}")
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.session = None
+        self._ready.clear()
+
+    async def wait_ready(self, timeout: float):
+        self.start()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise ToolException(
+                f"MCP server '{self.name}' unavailable"
+                + (f": {self.last_error}" if self.last_error else "")
+            ) from None
+        return self.session
+
+    def mark_broken(self, error: Exception):
+        self.last_error = f"{type(error).__name__}: {error}"
+        self._broken.set()
+
+    async def _list_tools(self, session) -> list:
+        tools, cursor = [], None
+        while True:
+            page = await session.list_tools(cursor=cursor) if cursor else await session.list_tools()
+            tools += page.tools
+            cursor = getattr(page, "nextCursor", None)
+            if not cursor:
+                return tools
+
+    async def _run(self):
+        backoff = self.manager.reconnect_base_s
+        while True:
+            try:
+                async with mcp_client.session(self.name, auto_initialize=False) as session:
+                    init = await session.initialize()
+                    info = init.serverInfo
+                    schemas = await self._list_tools(session)
+                    self._adopt(
+                        {"name": info.name, "version": info.version, "protocol": init.protocolVersion},
+                        schemas,
+                    )
+                    self.session = session
+                    self.connects += 1
+                    self.consecutive_failures = 0
+                    self.connected_since = time.time()
+                    backoff = self.manager.reconnect_base_s
+                    self._broken.clear()
+                    self._ready.set()
+                    await self._watch(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+            finally:
+                self._ready.clear()
+                self.session = None
+            self.failures += 1
+            self.consecutive_failures += 1
+            print(f"⚠️  MCP '{self.name}' disconnected ({self.last_error}); reconnecting in {backoff:.1f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.manager.reconnect_max_s)
+
+    async def _watch(self, session):
+        """Ping periodically; return when the session is broken."""
+        while True:
+            try:
+                await asyncio.wait_for(self._broken.wait(), self.manager.health_interval_s)
+                return
+            except asyncio.TimeoutError:
+                pass
+            t0 = time.perf_counter()
+            try:
+                await asyncio.wait_for(session.send_ping(), self.manager.connect_timeout_s)
+            except Exception as e:
+                self.last_error = f"ping failed: {type(e).__name__}: {e}"
+                return
+            self.ping_ms = round((time.perf_counter() - t0) * 1000, 1)
+
+    def _adopt(self, server_info: dict, schemas: list):
+        """Keep the cached schemas unless the server or its tools changed."""
+        spec = json.dumps(
+            [server_info["name"], server_info["version"],
+             sorted(([t.name, t.description or "", t.inputSchema] for t in schemas), key=lambda s: s[0])],
+            sort_keys=True,
+            default=str,
+        )
+        signature = hashlib.sha256(spec.encode("utf-8")).hexdigest()
+        if signature != self.signature:
+            if self.signature:
+                print(f"🔄 MCP '{self.name}' tools changed ({server_info['name']} {server_info['version']})")
+            self.server_info = server_info
+            self.tool_schemas = schemas
+            self.signature = signature
+            self.manager._invalidate()
+
+
+class MCPSessionManager:
+    """Persistent sessions to every server configured on *client*.
+
+    Parameters
+    ----------
+    connect_timeout_s : float
+        How long a call / ``get_tools`` waits for a (re)connection.
+    call_timeout_s : float
+        Upper bound on one tool call.
+    health_interval_s : float
+        Seconds between keep-alive pings.
+    reconnect_base_s, reconnect_max_s : float
+        Exponential backoff between reconnection attempts.
+    """
+
+    def __init__(
+        self,
+        connect_timeout_s: float = 10,
+        call_timeout_s: float = 60,
+        health_interval_s: float = 30,
+        reconnect_base_s: float = 0.5,
+        reconnect_max_s: float = 30,
+    ):
+        self.connect_timeout_s = connect_timeout_s
+        self.call_timeout_s = call_timeout_s
+        self.health_interval_s = health_interval_s
+        self.reconnect_base_s = reconnect_base_s
+        self.reconnect_max_s = reconnect_max_s
+        self.version = 0
+        self._servers = {name: _ServerSession(name, self) for name in mcp_client.connections}
+        self._tools: list[StructuredTool] | None = None
+        self._latency: dict[str, deque] = {}
+        self._calls: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+
+    def _invalidate(self):
+        self._tools = None
+        self.version += 1
+
+    async def start(self):
+        for server in self._servers.values():
+            server.start()
+
+    async def stop(self):
+        for server in self._servers.values():
+            await server.stop()
+
+    async def get_tools(self) -> list[StructuredTool]:
+        """LangChain tools for every server, from the cached schemas."""
+        for server in self._servers.values():
+            if not server.signature:
+                await server.wait_ready(self.connect_timeout_s)
+        if self._tools is None:
+            self._tools = [
+                self._make_tool(server.name, schema)
+                for server in self._servers.values()
+                for schema in server.tool_schemas
+            ]
+        return self._tools
+
+    def _make_tool(self, server: str, schema) -> StructuredTool:
+        async def _call(**arguments):
+            return await self.call_tool(server, schema.name, arguments)
+
+        return StructuredTool(
+            name=schema.name,
+            description=schema.description or "",
+            args_schema=schema.inputSchema,
+            coroutine=_call,
+            metadata={"mcp_server": server},
+        )
+
+    async def call_tool(self, server: str, name: str, arguments: dict) -> str:
+        """Call *name* on *server* over its persistent session."""
+        srv = self._servers[server]
+        session = await srv.wait_ready(self.connect_timeout_s)
+        t0 = time.perf_counter()
+        self._calls[name] = self._calls.get(name, 0) + 1
+        try:
+            result = await asyncio.wait_for(session.call_tool(name, arguments), self.call_timeout_s)
+        except _CONNECTION_ERRORS as e:
+            self._errors[name] = self._errors.get(name, 0) + 1
+            srv.mark_broken(e)
+            raise ToolException(f"Connection to MCP server '{server}' lost during {name}; it is reconnecting") from e
+        except asyncio.TimeoutError as e:
+            self._errors[name] = self._errors.get(name, 0) + 1
+            raise ToolException(f"{name} timed out after {self.call_timeout_s}s") from e
+        finally:
+            self._latency.setdefault(name, deque(maxlen=200)).append((time.perf_counter() - t0) * 1000)
+        text = _result_text(result)
+        if result.isError:
+            self._errors[name] = self._errors.get(name, 0) + 1
+            raise ToolException(text)
+        return text
+
+    def health(self) -> dict:
+        servers = {}
+        for name, srv in self._servers.items():
+            servers[name] = {
+                "connected": srv._ready.is_set(),
+                "server": srv.server_info,
+                "tools": len(srv.tool_schemas),
+                "connects": srv.connects,
+                "failures": srv.failures,
+                "consecutive_failures": srv.consecutive_failures,
+                "last_error": srv.last_error,
+                "connected_for_s": round(time.time() - srv.connected_since, 1) if srv._ready.is_set() else 0,
+                "ping_ms": srv.ping_ms,
+            }
+        calls = {}
+        for name, samples in self._latency.items():
+            ordered = sorted(samples)
+            calls[name] = {
+                "calls": self._calls.get(name, 0),
+                "errors": self._errors.get(name, 0),
+                "p50_ms": round(statistics.median(ordered), 1),
+                "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 1),
+            }
+        return {"tools_version": self.version, "servers": servers, "calls": calls}
+
+
+_manager: MCPSessionManager | None = None
+
+
+def get_mcp_sessions() -> MCPSessionManager:
+    """Process-wide MCP session manager (created on first use)."""
+    global _manager
+    if _manager is None:
+        _manager = MCPSessionManager(
+            connect_timeout_s=_session_cfg.get("connect_timeout_s", 10),
+            call_timeout_s=_session_cfg.get("call_timeout_s", 60),
+            health_interval_s=_session_cfg.get("health_interval_s", 30),
+            reconnect_base_s=_session_cfg.get("reconnect_base_s", 0.5),
+            reconnect_max_s=_session_cfg.get("reconnect_max_s", 30),
+        )
+    return _manager
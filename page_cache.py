@@ -0,0 +1,167 @@
+"""
+Extracted-page cache keyed by PDF content hash.
+
+PDF parsing is the slowest CPU stage of ingestion.  Its output only
+depends on the file's bytes, so the extracted text of every page is kept
+in a small SQLite file keyed by ``sha256(pdf bytes)``.  Re-chunking with
+new settings, rebuilding a collection or re-ingesting an unchanged PDF
+under another name then skips parsing entirely.
+
+Page text is zlib-compressed; whole documents are LRU-evicted once the
+stored size exceeds ``max_size_mb``.
+
+Pre-warm the cache for every lecture PDF::
+
+    python page_cache.py                    # paths.lectures from config.yaml
+    python page_cache.py path/to/pdfs --workers 8
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class PageCache:
+    """Persistent map of PDF hash -> ``[(page number, text), ...]``.
+
+    Parameters
+    ----------
+    path : str
+        SQLite file (created if missing).
+    max_size_mb : float
+        Upper bound on compressed text stored; least-recently-used
+        documents are evicted beyond it.
+    """
+
+    def __init__(self, path: str, max_size_mb: float = 256):
+        self.path = path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " file_sha256 TEXT PRIMARY KEY,"
+                " total_pages INTEGER NOT NULL,"
+                " size_bytes INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " file_sha256 TEXT NOT NULL,"
+                " page INTEGER NOT NULL,"
+                " text BLOB NOT NULL,"
+                " PRIMARY KEY (file_sha256, page))"
+            )
+            self._conn.commit()
+
+    def get(self, file_hash: str) -> list[tuple[int, str]] | None:
+        """All pages of the PDF with this hash, in page order, or ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total_pages FROM documents WHERE file_sha256 = ?", (file_hash,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            rows = self._conn.execute(
+                "SELECT page, text FROM pages WHERE file_sha256 = ? ORDER BY page", (file_hash,)
+            ).fetchall()
+            self._conn.execute(
+                "UPDATE documents SET last_used = ? WHERE file_sha256 = ?", (time.time(), file_hash)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return [(page, zlib.decompress(blob).decode("utf-8")) for page, blob in rows]
+
+    def __contains__(self, file_hash: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM documents WHERE file_sha256 = ?", (file_hash,)
+            ).fetchone() is not None
+
+    def put(self, file_hash: str, pages: list[tuple[int, str]]):
+        """Store every page of one PDF, then evict LRU documents if over budget."""
+        rows = [(file_hash, page, zlib.compress(text.encode("utf-8"), 6)) for page, text in pages]
+        size = sum(len(r[2]) for r in rows)
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE file_sha256 = ?", (file_hash,))
+            self._conn.executemany("INSERT INTO pages (file_sha256, page, text) VALUES (?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (file_sha256, total_pages, size_bytes, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (file_hash, len(rows), size, time.time()),
+            )
+            self._evict_locked(keep=file_hash)
+            self._conn.commit()
+
+    def _evict_locked(self, keep: str):
+        total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for file_hash, size in self._conn.execute(
+            "SELECT file_sha256, size_bytes FROM documents ORDER BY last_used ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            if file_hash == keep:
+                continue
+            self._conn.execute("DELETE FROM pages WHERE file_sha256 = ?", (file_hash,))
+            self._conn.execute("DELETE FROM documents WHERE file_sha256 = ?", (file_hash,))
+            total -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            docs, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM documents"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "documents": docs,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+
+    import RAG
+    from ingest_pipeline import iter_pages
+
+    parser = argparse.ArgumentParser(description="Pre-warm the extracted-page cache")
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default=RAG._cfg.get("paths", {}).get("lectures", "./agent_fs/lectures"),
+        help="Folder of PDFs (default: paths.lectures)",
+    )
+    parser.add_argument("--workers", type=int, default=RAG._ingest_cfg.get("workers", 4))
+    args = parser.parse_args()
+
+    if RAG.page_cache is None:
+        raise SystemExit("rag.page_cache is disabled in config.yaml")
+
+    pdfs = sorted(glob.glob(os.path.join(args.directory, "**", "*.pdf"), recursive=True))
+    for pdf in pdfs:
+        file_hash = RAG._file_sha256(pdf)
+        name = os.path.relpath(pdf, args.directory)
+        if file_hash in RAG.page_cache:
+            print(f"✅ {name}: already cached")
+            continue
+        t0 = time.perf_counter()
+        pages = list(iter_pages(pdf, args.workers, page_cache=RAG.page_cache, file_hash=file_hash))
+        print(f"📄 {name}: {len(pages)} pages extracted in {time.perf_counter() - t0:.1f}s")
+    stats = RAG.page_cache.stats()
+    print(f"\nPage cache: {stats['documents']} document(s), {stats['size_bytes'] / 1e6:.1f} MB")
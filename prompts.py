@@ -74,6 +74,8 @@ Before giving your final response to the user:
   different approach — don't repeat the exact same call.
 - If retrieval returns thin results, do not loop forever — ask the user to
   clarify scope, provide a better collection, or approve a new direction.
+- Add a generated set of flashcards with a single ``add_cards`` call (a list
+  of cards) rather than one ``add_card`` call per card.
 - After generating flashcards, verify the count matches expectations.
 - If file writing is rejected, ask why and adjust.
 
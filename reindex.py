@@ -0,0 +1,245 @@
+"""
+Bulk re-index of Chroma collections.
+
+After changing the embedding backend / model or the chunking settings,
+every collection has to be rebuilt.  This rebuilds each collection from
+the page cache (falling back to the PDF when its pages aren't cached)
+into a shadow collection, then swaps the shadow in under the original
+name.  No agent or LLM is involved, and the old collection keeps serving
+queries until the swap.
+
+Collections are rebuilt concurrently; embedding requests from all of
+them share the process-wide embedding scheduler.
+
+    python reindex.py                   # every collection
+    python reindex.py linear_algebra_notes ma22014_lecturenotes --workers 2
+
+A running server should be asked to re-index through
+``POST /rag/reindex`` instead, so its open collection handles are
+refreshed after the swap.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import RAG
+
+_SHADOW_SUFFIX, _OLD_SUFFIX = RAG.REINDEX_SUFFIXES
+
+_state_lock = threading.Lock()
+_running = False
+_last_report: dict = {}
+_executor: ThreadPoolExecutor | None = None
+
+
+def _with_suffix(coll: str, suffix: str) -> str:
+    # Chroma names are capped at 63 characters.
+    return coll[:63 - len(suffix)] + suffix
+
+
+def _sources(coll: str) -> dict[str, tuple[str, str | None]]:
+    """``{source_file: (pdf path, file_sha256)}`` for the chunks in *coll*."""
+    got = RAG.vector_session.vectorstore(coll).get(include=["metadatas"])
+    sources: dict[str, tuple[str, str | None]] = {}
+    for meta in got["metadatas"]:
+        meta = meta or {}
+        path = str(meta.get("source", ""))
+        name = meta.get("source_file") or os.path.basename(path)
+        if name and name not in sources:
+            sources[name] = (path, meta.get("file_sha256"))
+    return sources
+
+
+def _recover(coll: str):
+    """Undo a swap that died between its renames.
+
+    If the process stopped after moving *coll* aside but before the shadow
+    took its name, the live data is only in the ``__old`` collection: move
+    it back (replacing an empty *coll* created by a lookup meanwhile).  An
+    ``__old`` next to a populated *coll* is the leftover of a finished swap.
+    """
+    client = RAG.vector_session.client
+    old = _with_suffix(coll, _OLD_SUFFIX)
+    names = RAG.vector_session.list_collections()
+    if old not in names:
+        return
+    with RAG.vector_session.closed(coll):
+        if coll in names and client.get_collection(coll).count():
+            client.delete_collection(old)
+            return
+        if coll in names:
+            client.delete_collection(coll)
+        client.get_collection(old).modify(name=coll)
+    print(f"♻️  Restored '{coll}' from an interrupted re-index")
+
+
+def _swap(coll: str, shadow: str):
+    """Replace *coll* with *shadow*: rename old aside, rename shadow, drop old.
+
+    Lookups of *coll* are held for the two renames.  If the shadow can't
+    take the name, the old collection is renamed back before the error is
+    raised, so *coll* never ends up missing.
+    """
+    client = RAG.vector_session.client
+    old = _with_suffix(coll, _OLD_SUFFIX)
+    with RAG.vector_session.closed(coll):
+        client.get_collection(coll).modify(name=old)
+        try:
+            client.get_collection(shadow).modify(name=coll)
+        except Exception:
+            client.get_collection(old).modify(name=coll)
+            raise
+    client.delete_collection(old)
+
+    RAG.vector_session.invalidate(shadow)
+    for store in (RAG.lexical_indexes, RAG.compact_indexes, RAG.collection_router):
+        store.drop(shadow)
+    RAG._rebuild_indexes(coll, RAG.vector_session.vectorstore(coll))
+    if RAG.retrieval_cache is not None:
+        RAG.retrieval_cache.invalidate(coll)
+
+
+def reindex_collection(coll: str) -> dict:
+    """Rebuild one collection via a shadow copy; return a timing report."""
+    t0 = time.perf_counter()
+    shadow = _with_suffix(coll, _SHADOW_SUFFIX)
+    report = {"sources": 0, "chunks": 0, "from_cache": 0}
+    try:
+        _recover(coll)
+        if shadow in RAG.vector_session.list_collections():
+            RAG.vector_session.client.delete_collection(shadow)  # left by a crashed run
+        RAG.vector_session.invalidate(shadow)
+
+        sources = _sources(coll)
+        if not sources:
+            report["status"] = "skipped: empty collection"
+            report["seconds"] = round(time.perf_counter() - t0, 2)
+            return report
+
+        for name, (path, file_hash) in sources.items():
+            if not file_hash:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"{name}: no file hash recorded and {path} is missing")
+                file_hash = RAG._file_sha256(path)
+            cached = RAG.page_cache is not None and file_hash in RAG.page_cache
+            if not cached and not os.path.exists(path):
+                raise FileNotFoundError(f"{name}: pages not cached and {path} is missing")
+            RAG.setup_retriever(path, coll_name=shadow, file_hash=file_hash)
+            report["sources"] += 1
+            report["from_cache"] += int(cached)
+
+        report["chunks"] = RAG.vector_session.vectorstore(shadow)._collection.count()
+        _swap(coll, shadow)
+        report["status"] = "ok"
+    except Exception as e:
+        # _swap puts the original back if it fails, so only the shadow is left.
+        try:
+            if shadow in RAG.vector_session.list_collections():
+                RAG.vector_session.client.delete_collection(shadow)
+        finally:
+            RAG.vector_session.invalidate(shadow)
+        report["status"] = f"error: {e}"
+    report["seconds"] = round(time.perf_counter() - t0, 2)
+    return report
+
+
+def _claim():
+    global _running
+    with _state_lock:
+        if _running:
+            raise RuntimeError("A re-index is already running")
+        _running = True
+
+
+def _release():
+    global _running
+    with _state_lock:
+        _running = False
+
+
+def _reindex_claimed(collections: list[str] | None, workers: int) -> dict:
+    """Body of ``reindex_all``; the caller has claimed the run."""
+    global _last_report
+    try:
+        if not collections:
+            # A collection whose swap died mid-way only exists as "__old".
+            for name in RAG.vector_session.list_collections():
+                if name.endswith(_OLD_SUFFIX) and len(name) < 63:
+                    _recover(name[:-len(_OLD_SUFFIX)])
+        names = collections or RAG.list_collections()
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names) or 1))) as pool:
+            reports = dict(zip(names, pool.map(reindex_collection, names)))
+        _last_report = {
+            "collections": reports,
+            "seconds": round(time.perf_counter() - t0, 2),
+            "finished_at": time.time(),
+        }
+        return _last_report
+    finally:
+        _release()
+
+
+def reindex_all(collections: list[str] | None = None, workers: int = 2) -> dict:
+    """Rebuild *collections* (default: all) concurrently.
+
+    Returns ``{collection: report}``; also kept for ``last_report()``.
+    Raises ``RuntimeError`` if a re-index is already running in this process.
+    """
+    _claim()
+    return _reindex_claimed(collections, workers)
+
+
+def start(collections: list[str] | None = None, workers: int = 2) -> Future:
+    """Run ``reindex_all`` on a background thread.
+
+    The run is claimed before this returns, so concurrent callers can't
+    both start one (``RuntimeError`` for the loser).  A run that dies is
+    logged and recorded as ``{"error": ...}`` in ``last_report()``.
+    """
+    global _executor
+    _claim()
+    try:
+        with _state_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reindex")
+        future = _executor.submit(_reindex_claimed, collections, workers)
+    except BaseException:
+        _release()
+        raise
+    future.add_done_callback(_record_failure)
+    return future
+
+
+def _record_failure(future: Future):
+    global _last_report
+    if future.cancelled() or future.exception() is None:
+        return
+    error = future.exception()
+    print(f"⚠️  Re-index failed: {type(error).__name__}: {error}")
+    _last_report = {"error": f"{type(error).__name__}: {error}", "finished_at": time.time()}
+
+
+def is_running() -> bool:
+    with _state_lock:
+        return _running
+
+
+def last_report() -> dict:
+    return _last_report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Rebuild Chroma collections from cached pages")
+    parser.add_argument("collections", nargs="*", help="Collections to rebuild (default: all)")
+    parser.add_argument("--workers", type=int, default=2, help="Collections rebuilt concurrently")
+    args = parser.parse_args()
+
+    result = reindex_all(args.collections or None, args.workers)
+    print(json.dumps(result["collections"], indent=2))
+    print(f"\n⏱  Re-indexed {len(result['collections'])} collection(s) in {result['seconds']}s")
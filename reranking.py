@@ -0,0 +1,73 @@
+"""
+Vectorised re-ranking of dense retrieval candidates.
+
+Plain top-k similarity often returns several near-identical chunks from
+the same page.  Given the query vector and the embeddings of a fetched
+candidate set, these helpers pick the final *k* with NumPy:
+
+* ``mmr_select`` — maximal marginal relevance: each pick maximises
+  ``lambda * sim(query, d) - (1 - lambda) * max sim(d, already picked)``.
+  The running "max similarity to the picked set" is one vector updated
+  per pick, so selection costs ``O(k * n * dim)``.
+* ``threshold_select`` — the top-k whose cosine similarity to the query
+  clears a threshold (possibly none).
+
+Cosine similarity is computed here rather than taken from Chroma's
+distances, so the result doesn't depend on the collection's distance
+space.
+"""
+
+import numpy as np
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_scores(query_vector, embeddings) -> tuple[np.ndarray, np.ndarray]:
+    """``(normalised candidate matrix, cosine similarity to the query)``."""
+    candidates = _normalise(np.asarray(embeddings, dtype=np.float32))
+    query = _normalise(np.asarray(query_vector, dtype=np.float32))
+    return candidates, candidates @ query
+
+
+def mmr_select(query_vector, embeddings, k: int, lambda_mult: float = 0.5) -> list[int]:
+    """Indices of *k* candidates chosen by maximal marginal relevance.
+
+    Parameters
+    ----------
+    query_vector : sequence of float
+    embeddings : (n, dim) array-like
+        Candidate embeddings, any order.
+    k : int
+        Number to select.
+    lambda_mult : float
+        1.0 is pure relevance, 0.0 pure diversity.
+    """
+    if len(embeddings) == 0 or k <= 0:
+        return []
+    candidates, relevance = cosine_scores(query_vector, embeddings)
+    first = int(np.argmax(relevance))
+    selected = [first]
+    max_sim = candidates @ candidates[first]
+    taken = np.zeros(len(candidates), dtype=bool)
+    taken[first] = True
+    while len(selected) < min(k, len(candidates)):
+        score = lambda_mult * relevance - (1.0 - lambda_mult) * max_sim
+        score[taken] = -np.inf
+        pick = int(np.argmax(score))
+        selected.append(pick)
+        taken[pick] = True
+        np.maximum(max_sim, candidates @ candidates[pick], out=max_sim)
+    return selected
+
+
+def threshold_select(query_vector, embeddings, k: int, threshold: float) -> list[int]:
+    """Indices of the top-*k* candidates with cosine similarity >= *threshold*."""
+    if len(embeddings) == 0 or k <= 0:
+        return []
+    _candidates, relevance = cosine_scores(query_vector, embeddings)
+    order = np.argsort(-relevance)[:k]
+    return [int(i) for i in order if relevance[i] >= threshold]
@@ -0,0 +1,143 @@
+"""
+Retrieval result cache.
+
+Maps ``(collection, collection version, query, k)`` to the ranked chunk IDs
+a search returned, so a repeated query is answered with one SQLite lookup
+plus a fetch-by-ID instead of an embedding call and an HNSW search.
+
+Every collection has a version number that ``RAG.setup_retriever`` bumps
+whenever ingestion changes it.  Versions live in the same SQLite file, so
+a re-ingest by the standalone ambient daemon invalidates the server's
+cached results too.  Entries also expire after ``ttl_seconds`` and are
+LRU-evicted beyond ``max_entries``.
+
+Query *embeddings* are cached separately, in ``embedding_cache``.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def _result_key(collection: str, version: int, query: str, k: int, mode: str) -> str:
+    raw = f"{collection}\x00{version}\x00{k}\x00{mode}\x00{query.strip()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class RetrievalCache:
+    """Persistent TTL + LRU cache of ranked chunk IDs per query.
+
+    Parameters
+    ----------
+    path : str
+        SQLite file (created if missing).
+    ttl_seconds : float
+        Entries older than this are treated as misses.
+    max_entries : int
+        Least-recently-used entries beyond this are evicted.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_entries: int = 5000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS collection_versions ("
+                " collection TEXT PRIMARY KEY,"
+                " version INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " collection TEXT NOT NULL,"
+                " ids TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_collection ON results(collection)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used)")
+            self._conn.commit()
+
+    # -- collection versions ------------------------------------------------
+
+    def version(self, collection: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM collection_versions WHERE collection = ?", (collection,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def invalidate(self, collection: str) -> int:
+        """Bump *collection*'s version and drop its cached results."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO collection_versions (collection, version) VALUES (?, 1) "
+                "ON CONFLICT(collection) DO UPDATE SET version = version + 1",
+                (collection,),
+            )
+            self._conn.execute("DELETE FROM results WHERE collection = ?", (collection,))
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT version FROM collection_versions WHERE collection = ?", (collection,)
+            ).fetchone()[0]
+
+    # -- results --------------------------------------------------------------
+
+    def get(self, collection: str, query: str, k: int, mode: str = "similarity") -> list[str] | None:
+        """Return cached chunk IDs, or ``None`` on a miss / expired entry."""
+        key = _result_key(collection, self.version(collection), query, k, mode)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ids, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, collection: str, query: str, k: int, ids: list[str], mode: str = "similarity"):
+        key = _result_key(collection, self.version(collection), query, k, mode)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, collection, ids, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, collection, json.dumps(ids), now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM results WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -3,17 +3,28 @@ FastAPI backend — REST + WebSocket interface for the revision agent.
 
 Endpoints
 ---------
-POST   /tasks                Submit a new agent task
-GET    /tasks                List all tasks
+POST   /tasks                Submit a new agent task (429 when the run queue is full)
+GET    /tasks                List tasks, newest first (?status=&limit=&offset=)
+GET    /tasks/scheduler      Running / queued agent runs
+GET    /tasks/store          Task store size + write-behind counters
+GET    /tasks/agent-pool     Shared pre-built agent: builds + last rebuild reason
+GET    /mcp/health           MCP session state, reconnects, ping + per-tool latency
 GET    /tasks/{id}           Get task detail + status
 POST   /tasks/{id}/interrupt Respond to human-in-the-loop prompt
-WS     /ws/{task_id}         Real-time streaming of agent activity
+WS     /ws/{task_id}         Real-time agent activity: status, queued, token,
+                             tool_start, tool_end, todos, ingest, interrupt
 
 GET    /ambient/status       Ambient cron status
 POST   /ambient/poll         Trigger immediate poll
 GET    /ambient/log          Recent ambient activity log
 GET    /ambient/manifest     Processed-PDF manifest
 
+GET    /ingest/jobs          Background PDF ingestion jobs + progress
+POST   /ingest/jobs/{id}/cancel  Cancel a queued/running ingestion
+GET    /rag/collections      Resident collection handles + memory estimate
+POST   /rag/reindex          Rebuild collections from cached pages (shadow + swap)
+GET    /rag/reindex          Re-index status + last per-collection timing report
+
 GET    /outputs              List files/folders in agent_fs/
 GET    /outputs/{path:path}  Serve a specific file or list a subfolder
 
@@ -21,6 +32,7 @@ GET    /                     Web UI (HTMX)
 """
 
 import asyncio
+import functools
 import hashlib
 import json
 import os
@@ -39,6 +51,9 @@ from pydantic import BaseModel, Field
 from langchain.chat_models import init_chat_model
 
 from ambient import Ambient, read_log, MANIFEST_PATH, WATCH_DIR, _read_manifest
+from ingest_worker import progress_sink as ingest_progress_sink
+from task_scheduler import TaskScheduler
+from task_store import TaskStore
 
 # ---------------------------------------------------------------------------
 # Config
@@ -79,7 +94,7 @@ templates = Jinja2Templates(directory=os.path.join(_base, "ui", "templates"))
 app.mount("/static", StaticFiles(directory=os.path.join(_base, "ui", "static")), name="static")
 
 # ---------------------------------------------------------------------------
-# In-memory task store (swap for SQLite later)
+# Task store (SQLite, see task_store.py)
 # ---------------------------------------------------------------------------
 
 class Task(BaseModel):
@@ -97,8 +112,37 @@ class Task(BaseModel):
     output_files: list[str] = Field(default_factory=list)
     source: str = "user"               # user | ambient
 
-_tasks: dict[str, Task] = {}
-_task_agents: dict[str, tuple] = {}   # task_id -> (agent, config) — reused for follow-ups
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _forget_evicted(tasks: list[Task]):
+    """Drop conversations of tasks removed by retention from the shared checkpointer.
+
+    Retention usually runs on the task store's writer thread; the
+    checkpointer belongs to the event loop, so the delete is handed over.
+    """
+    from agent_pool import get_agent_pool
+    pool = get_agent_pool()
+    for task in tasks:
+        if not task.thread_id:
+            continue
+        if _loop is not None and _loop.is_running():
+            asyncio.run_coroutine_threadsafe(pool.forget(task.thread_id), _loop)
+        else:
+            asyncio.run(pool.forget(task.thread_id))
+
+
+_task_store_cfg = _server_cfg.get("task_store", {})
+_tasks: TaskStore[Task] = TaskStore(
+    _task_store_cfg.get("path", "./.cache/tasks.sqlite"),
+    Task,
+    flush_interval_s=_task_store_cfg.get("flush_interval_s", 1.0),
+    retention_days=_task_store_cfg.get("retention_days", 30),
+    max_tasks=_task_store_cfg.get("max_tasks", 5000),
+    compact_interval_s=_task_store_cfg.get("compact_interval_s", 3600),
+    on_evict=_forget_evicted,
+)
+# Live handles for tasks running in this process — not persisted.
 _interrupt_events: dict[str, asyncio.Event] = {}
 _interrupt_decisions: dict[str, list] = {}
 _ws_connections: dict[str, list[WebSocket]] = {}  # task_id -> list of WS
@@ -263,60 +307,178 @@ async def _broadcast(task_id: str, event: str, data: dict | str):
 
 
 # ---------------------------------------------------------------------------
-# Agent execution (background)
+# Run scheduler (bounded concurrency, see task_scheduler.py)
 # ---------------------------------------------------------------------------
 
-async def _run_task(task_id: str):
-    """Execute the agent task in the background, streaming progress over WS."""
-    from agent_factory import create_agent
+def _broadcast_queue_positions(positions: dict[str, int]):
+    for key, position in positions.items():
+        if key in _ws_connections:
+            asyncio.create_task(_broadcast(key, "queued", {
+                "position": position,
+                "queue_length": len(positions),
+            }))
 
-    task = _tasks[task_id]
-    task.status = "running"
-    task.thread_id = f"task-{task_id}"
-    task.conversation_turns.append({
-        "role": "user",
-        "text": task.message,
-        "at": datetime.now(timezone.utc).isoformat(),
-    })
-    await _broadcast(task_id, "status", {"status": "running"})
 
-    try:
-        # Reuse existing agent if this is a follow-up message
-        cached = _task_agents.get(task_id)
-        if cached:
-            agent, config = cached
-        else:
-            agent = await create_agent()
-            config = {"configurable": {"thread_id": task.thread_id}}
-            _task_agents[task_id] = (agent, config)
+_scheduler_cfg = _server_cfg.get("scheduler", {})
+_scheduler = TaskScheduler(
+    workers=_scheduler_cfg.get("workers", 3),
+    max_queue=_scheduler_cfg.get("max_queue", 20),
+    on_queue_change=_broadcast_queue_positions,
+)
+_QUEUE_RETRY_AFTER_S = int(_scheduler_cfg.get("retry_after_s", 30))
+
+
+def _queue_full_error() -> HTTPException:
+    return HTTPException(
+        429,
+        "Too many agent runs queued — try again shortly",
+        headers={"Retry-After": str(_QUEUE_RETRY_AFTER_S)},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Agent event streaming
+# ---------------------------------------------------------------------------
 
-        result = await agent.ainvoke(
-            {"messages": [{"role": "user", "content": task.message}]},
-            config=config,
+# Tokens are coalesced so a fast model doesn't mean one WS frame per token.
+_TOKEN_FLUSH_S = 0.05
+_TOKEN_FLUSH_CHARS = 200
+
+
+def _token_text(content: Any) -> str:
+    """Text of a streamed message chunk (unstripped — spacing matters)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            str(item.get("text", "")) for item in content
+            if isinstance(item, dict) and item.get("type") in ("text", "text_delta")
         )
+    return ""
 
-        # Handle interrupt
-        if result.get("__interrupt__"):
-            task.status = "awaiting_approval"
-            interrupts = result["__interrupt__"][0].value
-            task.interrupt_payload = interrupts
 
-            await _broadcast(task_id, "interrupt", {
-                "action_requests": interrupts.get("action_requests", []),
-                "review_configs": interrupts.get("review_configs", []),
+def _jsonable(value: Any, limit: int = 500) -> Any:
+    """Best-effort JSON-safe, size-capped view of tool input / output."""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return _truncate(value, limit) if isinstance(value, str) else value
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v, limit) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v, limit) for v in value[:50]]
+    content = getattr(value, "content", None)
+    if content is not None:
+        return _truncate(_extract_text_content(content) or str(content), limit)
+    return _truncate(str(value), limit)
+
+
+def _forward_ingest_progress(task_id: str, job: dict):
+    asyncio.create_task(_broadcast(task_id, "ingest", job))
+
+
+async def _stream_agent(task_id: str, agent, agent_input, config: dict) -> dict:
+    """Run the agent with ``astream_events`` and push progress to the task's WS.
+
+    Events sent: ``token`` (model text, coalesced), ``tool_start`` /
+    ``tool_end``, ``todos`` (whenever the agent rewrites its plan) and
+    ``ingest`` (job progress while a tool ingests a PDF).
+
+    Returns the same shape as ``ainvoke``: ``{"messages": [...]}`` plus
+    ``"__interrupt__"`` when the run paused for approval.
+    """
+    loop = asyncio.get_running_loop()
+    buffer: list[str] = []
+    buffered = 0
+    last_flush = loop.time()
+    tool_started: dict[str, float] = {}
+    # Each run is its own asyncio task, so this only reaches this run's tools.
+    ingest_progress_sink.set(functools.partial(_forward_ingest_progress, task_id))
+
+    async def flush():
+        nonlocal buffered, last_flush
+        if buffer:
+            await _broadcast(task_id, "token", {"text": "".join(buffer)})
+            buffer.clear()
+            buffered = 0
+        last_flush = loop.time()
+
+    async for event in agent.astream_events(agent_input, config=config, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            text = _token_text(getattr(event["data"].get("chunk"), "content", ""))
+            if text:
+                buffer.append(text)
+                buffered += len(text)
+                if buffered >= _TOKEN_FLUSH_CHARS or loop.time() - last_flush >= _TOKEN_FLUSH_S:
+                    await flush()
+        elif kind == "on_chat_model_end":
+            await flush()
+        elif kind == "on_tool_start":
+            await flush()
+            tool_input = event["data"].get("input") or {}
+            tool_started[event["run_id"]] = loop.time()
+            await _broadcast(task_id, "tool_start", {
+                "id": event["run_id"],
+                "name": event["name"],
+                "input": _jsonable(tool_input),
             })
+            if event["name"] == "write_todos" and isinstance(tool_input, dict):
+                await _broadcast(task_id, "todos", {"todos": _jsonable(tool_input.get("todos", []))})
+        elif kind == "on_tool_end":
+            started = tool_started.pop(event["run_id"], None)
+            await _broadcast(task_id, "tool_end", {
+                "id": event["run_id"],
+                "name": event["name"],
+                "output": _jsonable(event["data"].get("output")),
+                "duration_ms": round((loop.time() - started) * 1000) if started else None,
+            })
+    await flush()
 
-            # Wait for the UI to respond
-            evt = asyncio.Event()
-            _interrupt_events[task_id] = evt
-            await evt.wait()
+    state = await agent.aget_state(config)
+    result = {"messages": state.values.get("messages", [])}
+    interrupts = list(getattr(state, "interrupts", ()) or ())
+    if not interrupts:
+        interrupts = [i for t in state.tasks for i in getattr(t, "interrupts", ())]
+    if interrupts:
+        result["__interrupt__"] = interrupts
+    return result
 
-            decisions = _interrupt_decisions.pop(task_id, [])
-            from langgraph.types import Command
-            result = await agent.ainvoke(
-                Command(resume={"decisions": decisions}),
-                config=config,
-            )
+
+# ---------------------------------------------------------------------------
+# Agent execution (background)
+# ---------------------------------------------------------------------------
+
+async def _await_approval(task: Task, interrupts: dict) -> list[dict]:
+    """Park the run until the UI answers its interrupt; return the decisions."""
+    task.status = "awaiting_approval"
+    task.interrupt_payload = interrupts
+    _tasks.save(task)
+    await _broadcast(task.id, "interrupt", {
+        "action_requests": interrupts.get("action_requests", []),
+        "review_configs": interrupts.get("review_configs", []),
+    })
+
+    # Wait for the UI to respond
+    evt = asyncio.Event()
+    _interrupt_events[task.id] = evt
+    async with _scheduler.paused(task.id):
+        await evt.wait()
+    return _interrupt_decisions.pop(task.id, [])
+
+
+async def _drive_run(task: Task, agent_input):
+    """Stream *agent_input* on the task's thread to completion, pausing for approvals."""
+    from agent_pool import get_agent_pool
+    from langgraph.types import Command
+
+    try:
+        pool = get_agent_pool()
+        agent = await pool.get()
+        config = pool.config_for(task.thread_id)
+
+        result = await _stream_agent(task.id, agent, agent_input, config)
+        while result.get("__interrupt__"):
+            decisions = await _await_approval(task, result["__interrupt__"][0].value)
+            result = await _stream_agent(task.id, agent, Command(resume={"decisions": decisions}), config)
 
         # Extract summary from last AI message
         messages = result.get("messages", [])
@@ -333,8 +495,9 @@ async def _run_task(task_id: str):
         task.result_summary = summary
         task.interrupt_payload = None
         await _refresh_task_conversation_summary(task)
+        _tasks.save(task)
 
-        await _broadcast(task_id, "status", {
+        await _broadcast(task.id, "status", {
             "status": "completed",
             "summary": summary,
             "conversation_summary": task.conversation_summary,
@@ -344,14 +507,34 @@ async def _run_task(task_id: str):
         task.status = "failed"
         task.result_summary = f"Error: {e}"
         task.completed_at = datetime.now(timezone.utc).isoformat()
-        await _broadcast(task_id, "status", {"status": "failed", "error": str(e)})
+        _tasks.save(task)
+        await _broadcast(task.id, "status", {"status": "failed", "error": str(e)})
+
+
+async def _start_turn(task: Task, message: str):
+    task.status = "running"
+    task.conversation_turns.append({
+        "role": "user",
+        "text": message,
+        "at": datetime.now(timezone.utc).isoformat(),
+    })
+    _tasks.save(task)
+    await _broadcast(task.id, "status", {"status": "running"})
+
+
+async def _run_task(task_id: str):
+    """Execute the agent task in the background, streaming progress over WS."""
+    task = _tasks.get(task_id)
+    task.thread_id = f"task-{task_id}"
+    await _start_turn(task, task.message)
+    await _drive_run(task, {"messages": [{"role": "user", "content": task.message}]})
 
 
 # ---------------------------------------------------------------------------
 # Ambient integration
 # ---------------------------------------------------------------------------
 
-_ambient = Ambient()
+_ambient = Ambient(scheduler=_scheduler)
 
 
 def _launchd_daemon_running() -> bool:
@@ -368,6 +551,51 @@ def _launchd_daemon_running() -> bool:
         return False
 
 
+@app.on_event("startup")
+async def _start_task_store():
+    """Open the agent checkpoints, fail tasks orphaned by the last shutdown,
+    apply retention, start the writer.
+
+    With checkpoints on disk, tasks awaiting approval are kept: the
+    approval resumes them from their checkpoint.
+    """
+    global _loop
+    from agent_pool import get_agent_pool
+
+    _loop = asyncio.get_running_loop()
+    checkpoints = _task_store_cfg.get("checkpoints_path", "./.cache/checkpoints.sqlite")
+    if checkpoints:
+        await get_agent_pool().open_checkpoints(checkpoints)
+    orphaned = _tasks.recover(keep=("awaiting_approval",) if checkpoints else ())
+    if orphaned:
+        print(f"ℹ️  Marked {orphaned} unfinished task(s) from the previous run as failed")
+    _tasks.compact()
+    _tasks.start()
+
+
+@app.on_event("shutdown")
+async def _stop_task_store():
+    _tasks.close()
+
+
+@app.on_event("startup")
+async def _start_agent_pool():
+    """Open MCP sessions, then pre-build the shared agent — in the background so boot isn't blocked on MCP."""
+    from agent_pool import get_agent_pool
+    from mcp_session import get_mcp_sessions
+    await get_mcp_sessions().start()
+    asyncio.create_task(get_agent_pool().start())
+
+
+@app.on_event("shutdown")
+async def _stop_agent_pool():
+    from agent_pool import get_agent_pool
+    from mcp_session import get_mcp_sessions
+    await get_agent_pool().stop()
+    await get_agent_pool().close_checkpoints()
+    await get_mcp_sessions().stop()
+
+
 @app.on_event("startup")
 async def _startup():
     """Start the ambient cron on server boot — unless the launchd daemon is already handling it."""
@@ -389,40 +617,56 @@ class TaskCreate(BaseModel):
 
 @app.post("/tasks")
 async def create_task(body: TaskCreate):
+    if _scheduler.full:
+        raise _queue_full_error()
     task_id = uuid.uuid4().hex[:12]
     task = Task(
         id=task_id,
         message=body.message,
         created_at=datetime.now(timezone.utc).isoformat(),
     )
-    _tasks[task_id] = task
-    asyncio.create_task(_run_task(task_id))
-    return {"task_id": task_id, "status": "pending"}
+    _tasks.add(task)
+    position = _scheduler.submit(task_id, lambda: _run_task(task_id), "interactive")
+    return {"task_id": task_id, "status": "pending", "queue_position": position}
 
 
 @app.get("/tasks")
-async def list_tasks():
-    return [t.model_dump() for t in sorted(_tasks.values(), key=lambda t: t.created_at, reverse=True)]
+async def list_tasks(status: Optional[str] = None, limit: int = 100, offset: int = 0):
+    """Tasks newest first, optionally filtered by status (paged)."""
+    tasks = await asyncio.to_thread(_tasks.list, status, max(1, min(limit, 1000)), max(0, offset))
+    return [t.model_dump() for t in tasks]
 
 
 @app.get("/tasks/pending")
 async def list_pending_approvals():
-    """Return tasks that are awaiting human approval."""
-    pending = [
-        t.model_dump()
-        for t in _tasks.values()
-        if t.status == "awaiting_approval"
-    ]
-    # Sort newest first
-    pending.sort(key=lambda t: t["created_at"], reverse=True)
-    return pending
+    """Return tasks that are awaiting human approval, newest first."""
+    tasks = await asyncio.to_thread(_tasks.list, "awaiting_approval")
+    return [t.model_dump() for t in tasks]
 
 
 @app.get("/tasks/pending/count")
 async def pending_approval_count():
     """Return the count of tasks awaiting approval (for sidebar badge)."""
-    count = sum(1 for t in _tasks.values() if t.status == "awaiting_approval")
-    return {"count": count}
+    return {"count": await asyncio.to_thread(_tasks.count, "awaiting_approval")}
+
+
+@app.get("/tasks/scheduler")
+async def scheduler_stats():
+    """Running / queued agent runs and admission counters."""
+    return {**_scheduler.stats(), "queue": _scheduler.positions()}
+
+
+@app.get("/tasks/agent-pool")
+async def agent_pool_stats():
+    """Shared agent template: builds, last build time and reason."""
+    from agent_pool import get_agent_pool
+    return get_agent_pool().stats()
+
+
+@app.get("/tasks/store")
+async def task_store_stats():
+    """Task store size and write-behind counters."""
+    return await asyncio.to_thread(_tasks.stats)
 
 
 @app.get("/tasks/{task_id}")
@@ -438,16 +682,33 @@ class InterruptResponse(BaseModel):
 
 @app.post("/tasks/{task_id}/interrupt")
 async def resolve_interrupt(task_id: str, body: InterruptResponse):
+    from agent_pool import get_agent_pool
+
     task = _tasks.get(task_id)
     if not task or task.status != "awaiting_approval":
         raise HTTPException(400, "No pending interrupt for this task")
 
-    _interrupt_decisions[task_id] = body.decisions
     evt = _interrupt_events.pop(task_id, None)
-    if evt:
-        evt.set()
+    if evt is None:
+        # Asked for by a previous server process: resume from the checkpoint.
+        if not await get_agent_pool().has_thread(task.thread_id):
+            task.status = "failed"
+            task.result_summary = "Error: the agent state for this approval was lost"
+            task.completed_at = datetime.now(timezone.utc).isoformat()
+            task.interrupt_payload = None
+            _tasks.save(task)
+            raise HTTPException(409, "The agent state for this approval was lost — start a new chat")
+        if _scheduler.full:
+            raise _queue_full_error()
+        task.status = "pending"
+        _tasks.save(task)
+        position = _scheduler.submit(task_id, lambda: _resume_approved(task_id, body.decisions), "interactive")
+        return {"status": "resumed", "queue_position": position}
 
+    _interrupt_decisions[task_id] = body.decisions
+    evt.set()
     task.status = "running"
+    _tasks.save(task)
     return {"status": "resumed"}
 
 
@@ -461,93 +722,48 @@ class FollowUpMessage(BaseModel):
 @app.post("/tasks/{task_id}/message")
 async def send_follow_up(task_id: str, body: FollowUpMessage):
     """Send a follow-up message in the same conversation thread."""
+    from agent_pool import get_agent_pool
+
     task = _tasks.get(task_id)
     if not task:
         raise HTTPException(404, "Task not found")
     if task.status not in ("completed", "failed"):
         raise HTTPException(400, "Task is still running — wait for it to finish")
+    if task.thread_id and not await get_agent_pool().has_thread(task.thread_id):
+        raise HTTPException(
+            409, "This conversation's agent state is no longer available — start a new chat to continue"
+        )
+    if _scheduler.full:
+        raise _queue_full_error()
 
     # Reset status for the follow-up
-    task.status = "running"
+    task.status = "pending"
     task.message = body.message  # update to latest message for display
     task.result_summary = ""
     task.completed_at = ""
+    _tasks.save(task)
 
-    asyncio.create_task(_run_follow_up(task_id, body.message))
-    return {"task_id": task_id, "status": "running"}
+    position = _scheduler.submit(task_id, lambda: _run_follow_up(task_id, body.message), "interactive")
+    return {"task_id": task_id, "status": "pending", "queue_position": position}
 
 
 async def _run_follow_up(task_id: str, message: str):
-    """Run a follow-up message using the cached agent and thread."""
-    from agent_factory import create_agent
-
-    task = _tasks[task_id]
-    task.conversation_turns.append({
-        "role": "user",
-        "text": message,
-        "at": datetime.now(timezone.utc).isoformat(),
-    })
-    await _broadcast(task_id, "status", {"status": "running"})
-
-    try:
-        cached = _task_agents.get(task_id)
-        if cached:
-            agent, config = cached
-        else:
-            # Re-create agent if lost (server restart edge case)
-            agent = await create_agent()
-            config = {"configurable": {"thread_id": task.thread_id}}
-            _task_agents[task_id] = (agent, config)
-
-        result = await agent.ainvoke(
-            {"messages": [{"role": "user", "content": message}]},
-            config=config,
-        )
-
-        # Handle interrupt (same logic as _run_task)
-        if result.get("__interrupt__"):
-            task.status = "awaiting_approval"
-            interrupts = result["__interrupt__"][0].value
-            task.interrupt_payload = interrupts
-            await _broadcast(task_id, "interrupt", {
-                "action_requests": interrupts.get("action_requests", []),
-                "review_configs": interrupts.get("review_configs", []),
-            })
-            evt = asyncio.Event()
-            _interrupt_events[task_id] = evt
-            await evt.wait()
-            decisions = _interrupt_decisions.pop(task_id, [])
-            from langgraph.types import Command
-            result = await agent.ainvoke(
-                Command(resume={"decisions": decisions}),
-                config=config,
-            )
+    """Run a follow-up message on the task's thread (state is in the pool's checkpointer)."""
+    task = _tasks.get(task_id)
+    await _start_turn(task, message)
+    await _drive_run(task, {"messages": [{"role": "user", "content": message}]})
 
-        messages = result.get("messages", [])
-        summary = _last_assistant_text(messages)
-        if summary:
-            task.conversation_turns.append({
-                "role": "assistant",
-                "text": summary,
-                "at": datetime.now(timezone.utc).isoformat(),
-            })
 
-        task.status = "completed"
-        task.completed_at = datetime.now(timezone.utc).isoformat()
-        task.result_summary = summary
-        task.interrupt_payload = None
-        await _refresh_task_conversation_summary(task)
-        await _broadcast(task_id, "status", {
-            "status": "completed",
-            "summary": summary,
-            "conversation_summary": task.conversation_summary,
-        })
+async def _resume_approved(task_id: str, decisions: list[dict]):
+    """Resume a run whose approval outlived the process that asked for it."""
+    from langgraph.types import Command
 
-    except Exception as e:
-        task.status = "failed"
-        task.result_summary = f"Error: {e}"
-        task.completed_at = datetime.now(timezone.utc).isoformat()
-        await _broadcast(task_id, "status", {"status": "failed", "error": str(e)})
+    task = _tasks.get(task_id)
+    task.status = "running"
+    task.interrupt_payload = None
+    _tasks.save(task)
+    await _broadcast(task_id, "status", {"status": "running"})
+    await _drive_run(task, Command(resume={"decisions": decisions}))
 
 
 # ---------------------------------------------------------------------------
@@ -566,6 +782,12 @@ async def ws_stream(websocket: WebSocket, task_id: str):
             "event": "status",
             "data": {"status": task.status, "summary": task.result_summary},
         }))
+        position = _scheduler.position(task_id)
+        if position:
+            await websocket.send_text(json.dumps({
+                "event": "queued",
+                "data": {"position": position, "queue_length": _scheduler.stats()["queued"]},
+            }))
 
     try:
         while True:
@@ -577,6 +799,16 @@ async def ws_stream(websocket: WebSocket, task_id: str):
             conns.remove(websocket)
 
 
+# ---------------------------------------------------------------------------
+# REST: MCP
+# ---------------------------------------------------------------------------
+
+@app.get("/mcp/health")
+async def mcp_health():
+    from mcp_session import get_mcp_sessions
+    return get_mcp_sessions().health()
+
+
 # ---------------------------------------------------------------------------
 # REST: Ambient
 # ---------------------------------------------------------------------------
@@ -607,6 +839,53 @@ async def ambient_manifest():
     return {"processed": list(_read_manifest())}
 
 
+# ---------------------------------------------------------------------------
+# REST: Ingestion jobs
+# ---------------------------------------------------------------------------
+
+@app.get("/ingest/jobs")
+async def ingest_jobs():
+    from ingest_worker import get_ingest_worker
+    return get_ingest_worker().jobs()
+
+
+@app.post("/ingest/jobs/{job_id}/cancel")
+async def cancel_ingest_job(job_id: str):
+    from ingest_worker import get_ingest_worker
+    if not get_ingest_worker().cancel(job_id):
+        raise HTTPException(404, "No queued or running ingestion job with that id")
+    return {"status": "cancelling"}
+
+
+@app.get("/rag/collections")
+async def rag_collections():
+    from RAG import vector_session
+    return vector_session.stats()
+
+
+class ReindexRequest(BaseModel):
+    collections: list[str] | None = None
+    workers: int = 2
+
+
+@app.post("/rag/reindex")
+async def rag_reindex(body: ReindexRequest):
+    import reindex
+    # Runs on a worker thread; queries keep hitting the old collections
+    # until each one is swapped.
+    try:
+        reindex.start(body.collections, body.workers)
+    except RuntimeError as e:
+        raise HTTPException(409, str(e))
+    return {"status": "started"}
+
+
+@app.get("/rag/reindex")
+async def rag_reindex_status():
+    import reindex
+    return {"running": reindex.is_running(), "last": reindex.last_report()}
+
+
 # ---------------------------------------------------------------------------
 # REST: Outputs
 # ---------------------------------------------------------------------------
@@ -0,0 +1,187 @@
+"""
+Bounded scheduler for agent runs.
+
+Every agent run holds a model client and an MCP session and spends most
+of its time waiting on the same LLM rate limit, so running more of them
+at once doesn't finish any sooner — it slows all of them down together.
+Runs are therefore admitted through a fixed number of slots:
+
+* at most ``workers`` runs execute at once; the rest wait in a priority
+  queue — ``interactive`` (chat) before ``ambient`` (background PDF
+  processing), first-come-first-served within a class;
+* a run paused on a human approval gives its slot back and re-enters at
+  the head of the queue (``resume``) once the human answers;
+* ``submit`` refuses new work with ``QueueFull`` once ``max_queue`` runs
+  are waiting, so the API can answer 429 instead of piling up;
+* ``on_queue_change`` is called with every waiting run's 1-based
+  position whenever the queue moves, for progress reporting.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+
+PRIORITIES = {"resume": 0, "interactive": 1, "ambient": 2}
+
+
+class QueueFull(Exception):
+    """Raised by ``TaskScheduler.submit`` when the wait queue is at capacity."""
+
+
+class TaskScheduler:
+    """Priority admission control for concurrent agent runs.
+
+    Parameters
+    ----------
+    workers : int
+        Runs allowed to execute at once.
+    max_queue : int
+        Runs allowed to wait for a slot before ``submit`` rejects more.
+    on_queue_change : callable, optional
+        ``on_queue_change(positions)`` with ``{key: position}`` for every
+        waiting run, called whenever the queue changes.
+    """
+
+    def __init__(self, workers: int = 3, max_queue: int = 20, on_queue_change: Callable[[dict[str, int]], None] | None = None):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.on_queue_change = on_queue_change
+        self._active: set[str] = set()
+        self._waiting: list[list] = []         # heap of [priority, seq, key, future]
+        self._seq = itertools.count()
+        self._runs: dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+
+    # -- queue state -----------------------------------------------------------
+
+    @property
+    def full(self) -> bool:
+        return len(self._waiting) >= self.max_queue and len(self._active) >= self.workers
+
+    def positions(self) -> dict[str, int]:
+        return {entry[2]: i + 1 for i, entry in enumerate(sorted(self._waiting))}
+
+    def position(self, key: str) -> int | None:
+        """1-based queue position of *key*, ``None`` if it isn't waiting."""
+        return self.positions().get(key)
+
+    def _notify(self):
+        if self.on_queue_change:
+            self.on_queue_change(self.positions())
+
+    # -- slots -----------------------------------------------------------------
+
+    def _enqueue(self, key: str, priority: str) -> list | None:
+        """Take a free slot for *key* (``None``) or join the queue (the entry)."""
+        if len(self._active) < self.workers and not self._waiting:
+            self._active.add(key)
+            return None
+        entry = [PRIORITIES[priority], next(self._seq), key, asyncio.get_running_loop().create_future()]
+        heapq.heappush(self._waiting, entry)
+        self._notify()
+        return entry
+
+    async def _wait(self, entry: list | None):
+        if entry is None:
+            return
+        try:
+            await entry[3]
+        except asyncio.CancelledError:
+            if entry in self._waiting:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._notify()
+            elif entry[3].done():
+                self._release(entry[2])  # the slot was handed over just before cancelling
+            raise
+
+    def _release(self, key: str):
+        """Free *key*'s slot for the next waiter; no-op if it holds none.
+
+        A run cancelled while re-queued after ``paused`` (or cancelled just
+        after its slot was handed over, which ``_wait`` already returns)
+        reaches ``_hold``'s cleanup without a slot — releasing anyway would
+        admit one run too many.
+        """
+        if key not in self._active:
+            return
+        self._active.remove(key)
+        while self._waiting:
+            _, _, next_key, future = heapq.heappop(self._waiting)
+            if not future.done():
+                self._active.add(next_key)
+                future.set_result(None)
+                break
+        self._notify()
+
+    @asynccontextmanager
+    async def _hold(self, key: str, entry: list | None):
+        t0 = time.monotonic()
+        await self._wait(entry)
+        self.started += 1
+        self._wait_total += time.monotonic() - t0
+        try:
+            yield
+        finally:
+            self.completed += 1
+            self._release(key)
+
+    def slot(self, key: str, priority: str = "interactive"):
+        """Async context manager holding one execution slot for its block."""
+        return self._hold(key, self._enqueue(key, priority))
+
+    @asynccontextmanager
+    async def paused(self, key: str):
+        """Give the slot back while *key* waits on something external.
+
+        Used around human-approval waits; on exit the run queues again at
+        ``resume`` priority, ahead of anything not yet started.
+        """
+        self._release(key)
+        yield
+        # Not reached if the block raised: a failing or cancelled run
+        # shouldn't queue for a slot only to give it straight back.
+        await self._wait(self._enqueue(key, "resume"))
+
+    # -- submission ------------------------------------------------------------
+
+    def submit(self, key: str, run: Callable[[], Awaitable], priority: str = "interactive") -> int:
+        """Schedule ``run()`` under a slot; return its queue position (0 = started).
+
+        Raises ``QueueFull`` when ``max_queue`` runs are already waiting.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}' (expected one of {', '.join(PRIORITIES)})")
+        if self.full:
+            self.rejected += 1
+            raise QueueFull(f"{len(self._waiting)} runs already queued")
+
+        held = self._hold(key, self._enqueue(key, priority))
+
+        async def _run():
+            try:
+                async with held:
+                    await run()
+            finally:
+                self._runs.pop(key, None)
+
+        self._runs[key] = asyncio.create_task(_run())
+        return self.position(key) or 0
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": len(self._active),
+            "queued": len(self._waiting),
+            "max_queue": self.max_queue,
+            "started": self.started,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_s": round(self._wait_total / self.started, 3) if self.started else 0.0,
+        }
@@ -0,0 +1,305 @@
+"""
+Durable task store.
+
+Tasks (their status, conversation turns and pending approval payloads)
+are kept in a small SQLite file so history survives a restart and the
+server doesn't hold every task it has ever run in memory.
+
+* Only *live* tasks — ones that were just created or changed — are held
+  as objects.  Callers mutate a task and call ``save(task)``; the change
+  is written behind by a background thread in one transaction per
+  ``flush_interval_s``, so a run that updates its task many times costs
+  a handful of writes.  Tasks in a terminal state leave memory once
+  flushed.
+* ``list`` / ``count`` are indexed queries on ``(status, created_at)``
+  and ``created_at``; pending writes are flushed first, so reads never
+  see stale state.
+* Retention: terminal tasks older than ``retention_days`` are deleted and
+  at most ``max_tasks`` are kept (oldest terminal tasks first).  Runs at
+  startup and every ``compact_interval_s``; ``on_evict`` is handed the
+  deleted tasks so state kept elsewhere (agent checkpoints) goes with them.
+
+Agent handles and interrupt events can't be persisted, so a task that was
+pending or running when the process died is marked failed by
+``recover()`` rather than left to hang.  A task awaiting approval can be
+kept (``keep=``) when the agent's checkpoints are persistent too: its run
+resumes from the checkpoint once the approval arrives.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Generic, TypeVar
+
+from pydantic import BaseModel
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class TaskStore(Generic[T]):
+    """SQLite-backed repository of task models with write-behind updates.
+
+    Parameters
+    ----------
+    path : str
+        SQLite file (created if missing).
+    model : type[pydantic.BaseModel]
+        Task model; must have ``id``, ``status``, ``created_at``,
+        ``completed_at`` and ``source`` fields.
+    flush_interval_s : float
+        How long saved changes may sit in memory before being written.
+    retention_days : float
+        Terminal tasks older than this are deleted (``0`` keeps them).
+    max_tasks : int
+        Upper bound on stored tasks (``0`` means unbounded).
+    compact_interval_s : float
+        How often retention is applied while running.
+    on_evict : callable, optional
+        ``on_evict(tasks)`` with the tasks retention just deleted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        model: type[T],
+        flush_interval_s: float = 1.0,
+        retention_days: float = 30,
+        max_tasks: int = 5000,
+        compact_interval_s: float = 3600,
+        on_evict: Callable[[list[T]], None] | None = None,
+    ):
+        self.path = path
+        self.model = model
+        self.flush_interval_s = flush_interval_s
+        self.retention_days = retention_days
+        self.max_tasks = max_tasks
+        self.compact_interval_s = compact_interval_s
+        self.on_evict = on_evict
+        self.writes = 0
+        self.flushes = 0
+
+        self._lock = threading.Lock()         # guards _live / _dirty
+        self._db_lock = threading.Lock()      # guards the connection
+        self._live: dict[str, T] = {}
+        self._dirty: set[str] = set()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " source TEXT NOT NULL DEFAULT '',"
+                " created_at TEXT NOT NULL,"
+                " completed_at TEXT NOT NULL DEFAULT '',"
+                " data TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks (status, created_at)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_at)")
+            self._conn.commit()
+
+    # -- background writer ---------------------------------------------------
+
+    def start(self):
+        """Start the write-behind thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="task-store-writer", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the writer and flush whatever is pending."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        next_compact = time.monotonic() + self.compact_interval_s
+        while not self._stop.wait(self.flush_interval_s):
+            try:
+                self.flush()
+                if time.monotonic() >= next_compact:
+                    self.compact()
+                    next_compact = time.monotonic() + self.compact_interval_s
+            except Exception as e:
+                print(f"⚠️  Task store write failed: {e}")
+
+    # -- writes ----------------------------------------------------------------
+
+    def add(self, task: T):
+        """Insert a new task; written immediately so it is never lost."""
+        with self._lock:
+            self._live[task.id] = task
+            self._dirty.add(task.id)
+        self.flush()
+
+    def save(self, task: T):
+        """Record that *task* changed; written on the next flush."""
+        with self._lock:
+            self._live[task.id] = task
+            self._dirty.add(task.id)
+
+    def flush(self) -> int:
+        """Write every pending change in one transaction; return rows written."""
+        with self._lock:
+            if not self._dirty:
+                return 0
+            rows = [self._row(self._live[task_id]) for task_id in self._dirty]
+            done = [task_id for task_id in self._dirty if self._live[task_id].status in TERMINAL_STATUSES]
+            self._dirty.clear()
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tasks (id, status, source, created_at, completed_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        with self._lock:
+            # Finished tasks are re-read from disk on demand.  One saved
+            # again since the snapshot above stays until the next flush.
+            for task_id in done:
+                if task_id not in self._dirty:
+                    self._live.pop(task_id, None)
+        self.writes += len(rows)
+        self.flushes += 1
+        return len(rows)
+
+    @staticmethod
+    def _row(task: BaseModel) -> tuple:
+        return (
+            task.id,
+            task.status,
+            getattr(task, "source", ""),
+            task.created_at,
+            task.completed_at or "",
+            task.model_dump_json(),
+        )
+
+    # -- reads -----------------------------------------------------------------
+
+    def get(self, task_id: str) -> T | None:
+        """The task, or ``None``.  Call ``save`` after changing it."""
+        with self._lock:
+            live = self._live.get(task_id)
+        if live is not None:
+            return live
+        with self._db_lock:
+            row = self._conn.execute("SELECT data FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        task = self.model.model_validate_json(row[0])
+        with self._lock:
+            # A concurrent save() may have made another copy live meanwhile.
+            return self._live.get(task_id, task)
+
+    def list(self, status: str | None = None, limit: int | None = None, offset: int = 0) -> list[T]:
+        """Tasks newest first, optionally filtered by *status*."""
+        self.flush()
+        sql = "SELECT id, data FROM tasks"
+        params: list = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._db_lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        with self._lock:
+            return [self._live.get(task_id) or self.model.model_validate_json(data) for task_id, data in rows]
+
+    def count(self, status: str | None = None) -> int:
+        self.flush()
+        with self._db_lock:
+            if status:
+                return self._conn.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (status,)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    # -- maintenance -----------------------------------------------------------
+
+    def recover(self, reason: str = "Interrupted by server restart", keep: tuple[str, ...] = ()) -> int:
+        """Fail tasks left unfinished by a previous process; return how many.
+
+        Tasks in a *keep* status are left as they are — e.g.
+        ``awaiting_approval`` when the agent's state is checkpointed on
+        disk and the run can resume once the approval arrives.
+        """
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT data FROM tasks WHERE status NOT IN (?, ?)", TERMINAL_STATUSES
+            ).fetchall()
+        now = datetime.now(timezone.utc).isoformat()
+        recovered = 0
+        for (data,) in rows:
+            task = self.model.model_validate_json(data)
+            if task.id in self._live or task.status in keep:
+                continue
+            task.status = "failed"
+            task.result_summary = f"Error: {reason}"
+            task.completed_at = now
+            if hasattr(task, "interrupt_payload"):
+                task.interrupt_payload = None
+            self.save(task)
+            recovered += 1
+        self.flush()
+        return recovered
+
+    def compact(self) -> dict:
+        """Apply the retention policy; return ``{"expired": n, "trimmed": n}``."""
+        self.flush()
+        expired: list[tuple[str, str]] = []
+        trimmed: list[tuple[str, str]] = []
+        placeholders = ", ".join("?" * len(TERMINAL_STATUSES))
+        with self._db_lock:
+            if self.retention_days:
+                cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).isoformat()
+                expired = self._conn.execute(
+                    f"SELECT id, data FROM tasks WHERE created_at < ? AND status IN ({placeholders})",
+                    (cutoff, *TERMINAL_STATUSES),
+                ).fetchall()
+                self._delete(expired)
+            if self.max_tasks:
+                total = self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+                if total > self.max_tasks:
+                    trimmed = self._conn.execute(
+                        f"SELECT id, data FROM tasks WHERE status IN ({placeholders})"
+                        f" ORDER BY created_at ASC LIMIT ?",
+                        (*TERMINAL_STATUSES, total - self.max_tasks),
+                    ).fetchall()
+                    self._delete(trimmed)
+            self._conn.commit()
+            if expired or trimmed:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if self.on_evict and (expired or trimmed):
+            self.on_evict([self.model.model_validate_json(data) for _id, data in expired + trimmed])
+        return {"expired": len(expired), "trimmed": len(trimmed)}
+
+    def _delete(self, rows):
+        """Delete ``(id, data)`` rows; callers hold ``_db_lock``."""
+        self._conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id, _data in rows])
+
+    def stats(self) -> dict:
+        with self._lock:
+            live, dirty = len(self._live), len(self._dirty)
+        return {
+            "stored": self.count(),
+            "live": live,
+            "pending_writes": dirty,
+            "writes": self.writes,
+            "flushes": self.flushes,
+        }
@@ -0,0 +1,210 @@
+"""Anki MCP server tests against benchmarks/fake_ankiconnect.py — run with:
+python3 -m pytest test_anki_mcp_server.py"""
+import asyncio
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, ".")
+sys.path.insert(0, "benchmarks")
+
+import anki_mcp_server as anki
+from fake_ankiconnect import start_in_thread
+
+DECK = "Linear Algebra"
+
+
+def _fn(tool):
+    """The coroutine behind an ``@mcp.tool``."""
+    return getattr(tool, "fn", tool)
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """Start a fake AnkiConnect and point the client at it; yields a factory."""
+    servers = []
+
+    def start(add_notes_raises: bool = False):
+        server, url, counters, collection = start_in_thread(latency=0.001, add_notes_raises=add_notes_raises)
+        servers.append(server)
+        monkeypatch.setattr(anki, "ANKI_URL", url)
+        collection.decks.add(DECK)
+        return counters, collection
+
+    monkeypatch.setattr(anki, "_client", None)
+    monkeypatch.setattr(anki, "_pending", [])
+    monkeypatch.setattr(anki, "_flush_task", None)
+    monkeypatch.setattr(anki, "_action_stats", {})
+    monkeypatch.setattr(anki, "_request_stats", {"http_requests": 0, "multi_requests": 0})
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            if anki._client is not None:
+                await anki._client.aclose()
+    return asyncio.run(main())
+
+
+def _cards(*fronts):
+    return [anki.Card(front=f, back=f"{f} answer") for f in fronts]
+
+
+def test_add_cards_skips_existing_duplicate(fake):
+    _counters, collection = fake()
+    collection.run("addNote", {"note": anki._basic_note(DECK, _cards("eigenvalue")[0])})
+
+    out = run(_fn(anki.add_cards)(DECK, _cards("trace", "eigenvalue", "rank")))
+
+    assert (out["added"], out["skipped"], out["failed"]) == (2, 1, 0)
+    assert out["results"][1]["skipped"] is True
+    assert sorted(n["front"] for n in collection.notes.values()) == ["eigenvalue", "rank", "trace"]
+
+
+def test_add_cards_reconciles_partial_add_notes_failure(fake, monkeypatch):
+    _counters, collection = fake(add_notes_raises=True)
+    collection.run("addNote", {"note": anki._basic_note(DECK, _cards("eigenvalue")[0])})
+    time.sleep(0.002)                   # note IDs are millisecond timestamps
+
+    async def stale_check(notes):
+        # e.g. the duplicate was added after the check: addNotes will fail it.
+        return [(True, "") for _ in notes]
+
+    monkeypatch.setattr(anki, "_can_add", stale_check)
+    out = run(_fn(anki.add_cards)(DECK, _cards("trace", "eigenvalue", "rank")))
+
+    ids = {n["front"]: nid for nid, n in collection.notes.items()}
+    assert (out["added"], out["skipped"], out["failed"]) == (2, 1, 0)
+    assert out["results"][0] == {"index": 0, "success": True, "note_id": ids["trace"]}
+    assert out["results"][1] == {"index": 1, "success": False, "skipped": True, "reason": "duplicate"}
+    assert out["results"][2] == {"index": 2, "success": True, "note_id": ids["rank"]}
+
+
+def test_add_cards_reports_failure_when_nothing_was_added(fake, monkeypatch):
+    fake(add_notes_raises=True)
+
+    async def stale_check(notes):
+        return [(True, "") for _ in notes]
+
+    monkeypatch.setattr(anki, "_can_add", stale_check)
+    out = run(_fn(anki.add_cards)("Missing deck", _cards("trace", "rank")))
+
+    assert (out["added"], out["failed"]) == (0, 2)
+    assert all("deck was not found" in r["error"] for r in out["results"])
+
+
+def test_add_cards_fallback_reports_missing_deck_as_failed(fake, monkeypatch):
+    counters, collection = fake()
+    collection.run("addNote", {"note": anki._basic_note(DECK, _cards("eigenvalue")[0])})
+    run_action = collection.run
+
+    def older_ankiconnect(action, params):
+        # Versions before canAddNotesWithErrorDetail only answer yes/no.
+        if action == "canAddNotesWithErrorDetail":
+            raise ValueError("unsupported action")
+        return run_action(action, params)
+
+    monkeypatch.setattr(collection, "run", older_ankiconnect)
+    missing = run(_fn(anki.add_cards)("Missing deck", _cards("trace", "rank")))
+    duplicate = run(_fn(anki.add_cards)(DECK, _cards("trace", "eigenvalue")))
+
+    assert (missing["added"], missing["skipped"], missing["failed"]) == (0, 0, 2)
+    assert all("deck was not found" in r["error"] for r in missing["results"])
+    assert (duplicate["added"], duplicate["skipped"], duplicate["failed"]) == (1, 1, 0)
+    assert duplicate["results"][1]["reason"] == "duplicate"
+    assert counters["action:canAddNotes"] == 2
+
+
+def test_coalesce_window_from_env():
+    assert anki._coalesce_window("2") == 0.002
+    for disabled in (None, "", " ", "0", "-1"):
+        assert anki._coalesce_window(disabled) is None
+
+
+def test_concurrent_calls_share_one_multi_request(fake, monkeypatch):
+    counters, collection = fake()
+    monkeypatch.setattr(anki, "COALESCE_WINDOW_S", 0.01)
+
+    async def burst():
+        return await asyncio.gather(*(_fn(anki.add_card)(DECK, f"Q{i}", f"A{i}") for i in range(10)))
+
+    out = run(burst())
+
+    assert all(r["success"] for r in out)
+    assert len(collection.notes) == 10
+    assert counters["requests"] == 1
+    assert counters["connections"] == 1
+    assert counters["action:multi"] == 0 and counters["action:addNote"] == 10
+    assert anki.anki_stats()["multi_requests"] == 1
+
+
+def test_multi_is_split_at_max_actions(fake, monkeypatch):
+    counters, collection = fake()
+    monkeypatch.setattr(anki, "COALESCE_WINDOW_S", 0.01)
+    monkeypatch.setattr(anki, "MAX_MULTI_ACTIONS", 4)
+
+    async def burst():
+        return await asyncio.gather(*(_fn(anki.add_card)(DECK, f"Q{i}", f"A{i}") for i in range(10)))
+
+    run(burst())
+
+    assert counters["requests"] == 3
+    assert len(collection.notes) == 10
+
+
+def test_error_in_multi_only_fails_its_own_call(fake, monkeypatch):
+    counters, collection = fake()
+    collection.run("addNote", {"note": anki._basic_note(DECK, _cards("Q1")[0])})
+    monkeypatch.setattr(anki, "COALESCE_WINDOW_S", 0.01)
+
+    async def burst():
+        return await asyncio.gather(
+            _fn(anki.add_card)(DECK, "Q0", "A0"),
+            _fn(anki.add_card)(DECK, "Q1", "A1"),            # duplicate
+            _fn(anki.add_card)("Missing deck", "Q2", "A2"),
+            _fn(anki.list_decks)(),
+        )
+
+    added, duplicate, missing, decks = run(burst())
+
+    assert counters["requests"] == 1
+    assert added["success"] is True
+    assert duplicate == {"success": False, "skipped": True, "reason": "duplicate"}
+    assert missing["success"] is False and "deck was not found" in missing["error"]
+    assert DECK in decks
+    assert anki.anki_stats()["actions"]["addNote"]["errors"] == 2
+
+
+def test_disabled_window_sends_each_call(fake, monkeypatch):
+    counters, collection = fake()
+    monkeypatch.setattr(anki, "COALESCE_WINDOW_S", None)
+
+    async def burst():
+        return await asyncio.gather(*(_fn(anki.add_card)(DECK, f"Q{i}", f"A{i}") for i in range(5)))
+
+    out = run(burst())
+
+    assert all(r["success"] for r in out)
+    assert counters["requests"] == 5
+    assert counters["connections"] <= 5                 # pooled keep-alive connections
+    assert anki.anki_stats()["multi_requests"] == 0
+
+
+def test_sequential_calls_reuse_one_connection(fake, monkeypatch):
+    counters, _collection = fake()
+    monkeypatch.setattr(anki, "COALESCE_WINDOW_S", None)
+
+    async def sequential():
+        for _ in range(5):
+            await _fn(anki.list_decks)()
+
+    run(sequential())
+
+    assert counters["requests"] == 5
+    assert counters["connections"] == 1
@@ -0,0 +1,70 @@
+"""Chunking tests — run with: python3 -m pytest test_chunking.py"""
+import sys
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, ".")
+
+from chunking import MathStructureSplitter
+
+PAGE = """2.3 Eigenvalues and eigenvectors
+A scalar lambda is an eigenvalue of A when Av = lambda v for some nonzero v.
+
+Theorem 2.4 (Cayley-Hamilton). Every square matrix satisfies its own characteristic polynomial.
+Proof. Expand det(tI - A) and substitute A for t. □
+
+Definition 2.5. The trace of A is the sum of its diagonal entries.
+Example. The identity matrix of size n has trace n.
+"""
+
+
+def _split(text: str, **kwargs) -> list[Document]:
+    splitter = MathStructureSplitter(**kwargs)
+    return splitter.split_documents([Document(page_content=text, metadata={"page": 3})])
+
+
+def _assert_offsets(text: str, chunks: list[Document]):
+    for chunk in chunks:
+        start = chunk.metadata["start_index"]
+        assert text[start:start + len(chunk.page_content)] == chunk.page_content
+
+
+def test_start_index_points_at_chunk_text():
+    chunks = _split(PAGE, chunk_size=200, min_chunk_size=20)
+
+    assert len(chunks) > 1
+    _assert_offsets(PAGE, chunks)
+    assert all(c.metadata["page"] == 3 for c in chunks)
+
+
+def test_oversized_segment_offsets_follow_repeated_text():
+    # The fallback splitter returns identical pieces; each must map to its own place.
+    text = "Remark. " + "The rank is the dimension of the column space. " * 40
+
+    chunks = _split(text, chunk_size=120, min_chunk_size=20, fallback_overlap=0)
+
+    starts = [c.metadata["start_index"] for c in chunks]
+    assert len(chunks) > 2
+    assert starts == sorted(set(starts))
+    _assert_offsets(text, chunks)
+
+
+def test_proof_stays_with_its_theorem():
+    # The theorem alone would still fit after the heading; with its proof it doesn't.
+    chunks = _split(PAGE, chunk_size=220, min_chunk_size=20)
+
+    theorem = next(c for c in chunks if "Cayley-Hamilton" in c.page_content)
+    assert "Proof. Expand" in theorem.page_content
+    assert theorem.metadata["block_type"] == "theorem"
+    assert theorem.metadata["section"] == "2.3 Eigenvalues and eigenvectors"
+
+
+def test_consecutive_blocks_share_a_chunk_until_a_heading():
+    text = PAGE + "2.4 Diagonalisation\nA matrix is diagonalisable when it has a basis of eigenvectors.\n"
+
+    chunks = _split(text, chunk_size=1000, min_chunk_size=20)
+
+    assert len(chunks) == 2
+    assert "Definition 2.5" in chunks[0].page_content and "Example." in chunks[0].page_content
+    assert chunks[1].page_content.startswith("2.4 Diagonalisation")
+    assert chunks[1].metadata["section"] == "2.4 Diagonalisation"
@@ -0,0 +1,69 @@
+"""Compact index tests — run with: python3 -m pytest test_compact_index.py"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, ".")
+
+from compact_index import CompactIndexStore
+
+COLL = "algebra"
+
+
+def _vectors(n: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, 16)).astype(np.float32)
+
+
+def _versions(store: CompactIndexStore) -> list[str]:
+    return sorted(e.name for e in os.scandir(store.path(COLL)) if e.is_dir())
+
+
+def test_rebuild_publishes_new_version_and_keeps_previous(tmp_path):
+    store = CompactIndexStore(str(tmp_path))
+    store.build(COLL, ["a", "b"], _vectors(2, 0))
+    first = _versions(store)
+    store.build(COLL, ["a", "b", "c"], _vectors(3, 1))
+    store.build(COLL, ["d"], _vectors(1, 2))
+
+    versions = _versions(store)
+    assert len(versions) == 2 and first[0] not in versions
+    assert store.get(COLL).ids == ["d"]
+    assert store.dimension(COLL) == 16
+
+
+def test_get_rereads_pointer_when_version_vanishes_mid_read(tmp_path, monkeypatch):
+    store = CompactIndexStore(str(tmp_path))
+    store.build(COLL, ["a"], _vectors(1, 0))
+    store.build(COLL, ["b"], _vectors(1, 1))
+    store.build(COLL, ["c"], _vectors(1, 2))
+    store.release(COLL)
+    resolve = store._version
+    answers = iter(["v1-pruned-by-another-process"])
+
+    # The first lookup resolves a version that a concurrent build has since deleted.
+    monkeypatch.setattr(store, "_version", lambda coll: next(answers, None) or resolve(coll))
+
+    assert store.get(COLL).ids == ["c"]
+
+
+def test_get_returns_none_while_dropped(tmp_path, monkeypatch):
+    store = CompactIndexStore(str(tmp_path))
+    store.build(COLL, ["a"], _vectors(1, 0))
+    store.release(COLL)
+    monkeypatch.setattr(store, "_version", lambda coll: "v1-gone")
+
+    assert store.get(COLL) is None
+
+
+def test_build_replaces_unversioned_index(tmp_path):
+    store = CompactIndexStore(str(tmp_path))
+    os.makedirs(store.path(COLL))
+    for name in ("meta.json", "quant.npy", "codes.npy", "vectors.npy"):
+        open(os.path.join(store.path(COLL), name), "w").close()
+    assert store.get(COLL) is None
+
+    store.build(COLL, ["a"], _vectors(1, 0))
+
+    assert sorted(os.listdir(store.path(COLL))) == ["CURRENT"] + _versions(store)
+    assert store.get(COLL).ids == ["a"]
@@ -0,0 +1,39 @@
+"""Context packing tests — run with: python3 -m pytest test_context_packing.py"""
+import sys
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, ".")
+
+from context_packing import pack_context
+
+
+def _chunk(text: str, start: int) -> Document:
+    return Document(page_content=text, metadata={"source": "notes.pdf", "page": 3, "start_index": start})
+
+
+def test_trim_drops_worst_ranked_chunks_of_merged_passage():
+    intro = "Matrices are arrays of numbers. " * 10       # 320 chars each
+    detail = "Row operations preserve the span. " * 10
+    theorem = "A matrix is invertible iff det(A) != 0. " * 8
+    hits = [
+        ("algebra", _chunk(theorem, 660)),                # best hit, last on the page
+        ("algebra", _chunk(intro, 0)),
+        ("algebra", _chunk(detail, 330)),
+    ]
+
+    passages = pack_context(hits, max_tokens=180)
+
+    assert len(passages) == 1 and passages[0].trimmed
+    text = passages[0].text
+    assert theorem.strip() in text and intro.strip() in text
+    assert "Row operations" not in text
+
+
+def test_trim_cuts_a_lone_chunk_at_a_sentence():
+    body = "Eigenvalues solve det(A - tI) = 0. " * 40
+
+    passages = pack_context([("algebra", _chunk(body, 0))], max_tokens=60)
+
+    assert passages[0].trimmed and passages[0].text.endswith("0.")
+    assert len(passages[0].text) <= 240
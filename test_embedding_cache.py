@@ -0,0 +1,32 @@
+"""Embedding cache tests — run with: python3 -m pytest test_embedding_cache.py"""
+import sys
+
+sys.path.insert(0, ".")
+
+from embedding_cache import EmbeddingCache
+
+VECTOR = [0.5] * 256                  # 1 KiB packed as float32
+
+
+def test_writes_under_budget_skip_the_size_scan(tmp_path, monkeypatch):
+    cache = EmbeddingCache(str(tmp_path / "emb.sqlite"), max_size_mb=1)
+    scans = []
+    size = cache._size_bytes_locked
+    monkeypatch.setattr(cache, "_size_bytes_locked", lambda: scans.append(1) or size())
+
+    for i in range(50):
+        cache.put_many({f"k{i}": VECTOR})
+
+    assert not scans
+    assert cache.evictions == 0
+
+
+def test_eviction_keeps_the_cache_under_budget(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "emb.sqlite"), max_size_mb=0.01)   # ~10 vectors
+
+    for i in range(30):
+        cache.put_many({f"k{i}": VECTOR})
+
+    assert cache._size_bytes_locked() <= cache.max_bytes
+    assert cache.evictions > 0
+    assert cache.get_many(["k29"]) and not cache.get_many(["k0"])
@@ -0,0 +1,65 @@
+"""Embedding scheduler tests — run with: python3 -m pytest test_embedding_scheduler.py"""
+import sys
+
+sys.path.insert(0, ".")
+
+from embedding_backends import HashedNgramEmbeddings
+from embedding_scheduler import EmbeddingScheduler, ScheduledEmbeddings
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FlakyEmbeddings(HashedNgramEmbeddings):
+    """Hashed embeddings whose first *failures* requests hit a rate limit."""
+
+    def __init__(self, failures: int = 0):
+        super().__init__(dim=16)
+        self.failures = failures
+        self.requests: list[list[str]] = []
+
+    def embed_documents(self, texts):
+        self.requests.append(list(texts))
+        if self.failures:
+            self.failures -= 1
+            raise RateLimited("429 Too Many Requests")
+        return super().embed_documents(texts)
+
+
+def _scheduler(client, **kwargs) -> EmbeddingScheduler:
+    return EmbeddingScheduler(client.embed_documents, base_delay=0.001, **kwargs)
+
+
+def test_embed_keeps_input_order_across_batches():
+    client = FlakyEmbeddings()
+    texts = [f"chunk {i} " * (i + 1) for i in range(20)]
+
+    vectors = _scheduler(client, max_batch_tokens=20, max_batch_items=3).embed(texts)
+
+    assert len(client.requests) > 1
+    assert vectors == HashedNgramEmbeddings(dim=16).embed_documents(texts)
+
+
+def test_embed_query_retries_rate_limits_on_the_calling_thread():
+    client = FlakyEmbeddings(failures=2)
+    scheduler = _scheduler(client)
+
+    vector = ScheduledEmbeddings(client, scheduler).embed_query("eigenvalues")
+
+    assert vector == HashedNgramEmbeddings(dim=16).embed_query("eigenvalues")
+    assert client.requests == [["eigenvalues"]] * 3
+    assert scheduler.stats()["rate_limited"] == 2
+
+
+def test_scheduler_wraps_the_shared_client(rag, monkeypatch):
+    client = FlakyEmbeddings()
+    monkeypatch.setattr(rag, "embedding_backend", "openai")
+    monkeypatch.setattr(rag, "_base_client", client)
+    monkeypatch.setattr(rag, "_embedding_scheduler", None)
+
+    rag._embeddings().embed_documents(["trace"])
+    rag._embeddings().embed_query("rank")
+
+    assert rag._get_embedding_scheduler().embed_fn == client.embed_documents
+    assert client.requests == [["trace"], ["rank"]]
@@ -0,0 +1,40 @@
+"""Ingest worker tests — run with: python3 -m pytest test_ingest_worker.py"""
+import asyncio
+import sys
+
+sys.path.insert(0, ".")
+
+import ingest_worker
+from ingest_pipeline import PipelineStats
+from ingest_worker import IngestWorker
+
+
+def _fake_setup_retriever(pdf_path, coll_name, progress=None, should_cancel=None):
+    stats = PipelineStats(total_pages=4)
+    for page in range(1, 5):
+        stats.pages = page
+        stats.embedded = 3 * page
+        progress(stats)
+
+
+def test_progress_sink_receives_events_for_its_own_runs(rag, monkeypatch):
+    monkeypatch.setattr(rag, "setup_retriever", _fake_setup_retriever)
+    monkeypatch.setattr(ingest_worker, "_PROGRESS_INTERVAL_S", 0.0)
+    worker = IngestWorker()
+    seen: list[dict] = []
+
+    async def run(name: str, sink: bool):
+        if sink:
+            ingest_worker.progress_sink.set(seen.append)
+        await worker.ingest(f"/notes/{name}.pdf", name)
+
+    async def main():
+        await asyncio.gather(run("a", sink=True), run("b", sink=False))
+        await asyncio.sleep(0)              # let call_soon_threadsafe callbacks run
+
+    asyncio.run(main())
+
+    statuses = [e["status"] for e in seen]
+    assert statuses[0] == "running" and statuses[-1] == "completed"
+    assert seen[-1]["pages_done"] == 4 and seen[-1]["chunks_embedded"] == 12
+    assert {e["collection"] for e in seen} == {"a"}     # b's run set no sink
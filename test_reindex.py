@@ -0,0 +1,127 @@
+"""Re-index swap tests — run with: python3 -m pytest test_reindex.py"""
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, ".")
+
+import RAG
+import reindex
+from chromadb.api.models.Collection import Collection
+from conftest import EMBEDDING_DIM
+from embedding_backends import HashedNgramEmbeddings
+
+COLL = "algebra"
+SHADOW = COLL + "__reindex"
+OLD = COLL + "__old"
+
+
+def _fill(name: str, texts: list[str]):
+    vectors = HashedNgramEmbeddings(dim=EMBEDDING_DIM).embed_documents(texts)
+    RAG.vector_session.vectorstore(name)._collection.add(
+        ids=[f"{name}-{i}" for i in range(len(texts))],
+        embeddings=vectors,
+        documents=texts,
+        metadatas=[{"source_file": "notes.pdf"} for _ in texts],
+    )
+
+
+def _documents(name: str) -> list[str]:
+    return sorted(RAG.vector_session.client.get_collection(name).get()["documents"])
+
+
+def test_swap_replaces_collection(rag):
+    _fill(COLL, ["old eigenvalues", "old determinants"])
+    _fill(SHADOW, ["new eigenvalues"])
+
+    reindex._swap(COLL, SHADOW)
+
+    assert _documents(COLL) == ["new eigenvalues"]
+    assert set(rag.vector_session.list_collections()) == {COLL}
+    assert rag.vector_session.vectorstore(COLL)._collection.count() == 1
+
+
+def test_failed_swap_restores_original(rag, monkeypatch):
+    _fill(COLL, ["old eigenvalues", "old determinants"])
+    _fill(SHADOW, ["new eigenvalues"])
+    modify = Collection.modify
+
+    def failing_modify(self, *args, **kwargs):
+        if self.name == SHADOW:
+            raise RuntimeError("rename failed")
+        return modify(self, *args, **kwargs)
+
+    monkeypatch.setattr(Collection, "modify", failing_modify)
+    with pytest.raises(RuntimeError):
+        reindex._swap(COLL, SHADOW)
+
+    assert _documents(COLL) == ["old determinants", "old eigenvalues"]
+    assert OLD not in rag.vector_session.list_collections()
+    # A second attempt must not find (and delete) an "__old" copy.
+    monkeypatch.setattr(Collection, "modify", modify)
+    reindex._swap(COLL, SHADOW)
+    assert _documents(COLL) == ["new eigenvalues"]
+
+
+def test_recover_after_interrupted_swap(rag):
+    _fill(COLL, ["old eigenvalues"])
+    rag.vector_session.invalidate(COLL)
+    rag.vector_session.client.get_collection(COLL).modify(name=OLD)
+    # A lookup in between re-created the name as an empty collection.
+    rag.vector_session.vectorstore(COLL)
+
+    reindex._recover(COLL)
+
+    assert _documents(COLL) == ["old eigenvalues"]
+    assert OLD not in rag.vector_session.list_collections()
+
+
+def test_recover_drops_leftover_after_finished_swap(rag):
+    _fill(COLL, ["new eigenvalues"])
+    _fill(OLD, ["old eigenvalues"])
+
+    reindex._recover(COLL)
+
+    assert _documents(COLL) == ["new eigenvalues"]
+    assert OLD not in rag.vector_session.list_collections()
+
+
+def test_closed_holds_lookups(rag):
+    _fill(COLL, ["eigenvalues"])
+    got = []
+    with rag.vector_session.closed(COLL):
+        assert COLL not in rag.vector_session.resident()
+        lookup = threading.Thread(target=lambda: got.append(rag.vector_session.vectorstore(COLL)))
+        lookup.start()
+        time.sleep(0.1)
+        assert not got
+    lookup.join(timeout=5)
+    assert got and got[0]._collection.count() == 1
+
+
+def test_start_claims_the_run(rag, monkeypatch):
+    gate = threading.Event()
+    monkeypatch.setattr(reindex, "reindex_collection", lambda coll: gate.wait(5) and {"status": "ok"})
+
+    future = reindex.start([COLL])
+    assert reindex.is_running()
+    with pytest.raises(RuntimeError):
+        reindex.start([COLL])
+    gate.set()
+    assert future.result(timeout=5)["collections"] == {COLL: {"status": "ok"}}
+    assert not reindex.is_running()
+
+
+def test_start_records_failure(rag, monkeypatch):
+    def broken():
+        raise OSError("chroma unavailable")
+
+    monkeypatch.setattr(rag, "list_collections", broken)
+    future = reindex.start()
+    with pytest.raises(OSError):
+        future.result(timeout=5)
+    time.sleep(0.05)                    # done-callbacks run after result() wakes
+    assert reindex.last_report()["error"] == "OSError: chroma unavailable"
+    assert not reindex.is_running()
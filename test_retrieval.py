@@ -0,0 +1,63 @@
+"""Retrieval tests — run with: python3 -m pytest test_retrieval.py"""
+import sys
+
+import numpy as np
+
+sys.path.insert(0, ".")
+
+COLL = "algebra"
+PAGES = [
+    "Eigenvalues and eigenvectors of a square matrix satisfy Av = lambda v.",
+    "The fundamental theorem of calculus links derivatives and integrals.",
+    "Prime numbers have exactly two divisors; every integer factors into primes.",
+]
+QUERY = "eigenvalues of a matrix"
+
+
+def _ingest(rag, pages: list[str], file_hash: str):
+    rag.page_cache.put(file_hash, list(enumerate(pages)))
+    rag.setup_retriever("notes.pdf", coll_name=COLL, file_hash=file_hash)
+
+
+def _cosine(rag, text: str) -> float:
+    q, d = (np.asarray(v) for v in rag.vector_session.embeddings.embed_documents([QUERY, text]))
+    return float(q @ d / (np.linalg.norm(q) * np.linalg.norm(d)))
+
+
+def test_threshold_retriever_matches_retrieve(rag, monkeypatch):
+    _ingest(rag, PAGES, "v1")
+    threshold = 0.3
+    monkeypatch.setattr(rag, "default_search_type", "threshold")
+    monkeypatch.setattr(rag, "score_threshold", threshold)
+    monkeypatch.setattr(rag, "retrieval_cache", None)
+
+    via_retriever = rag.get_retriever(COLL).invoke(QUERY)
+    via_retrieve = rag.retrieve(COLL, QUERY, search_type="threshold")
+
+    assert [d.id for d in via_retriever] == [d.id for d in via_retrieve]
+    assert via_retrieve, "expected the eigenvalue page to clear the threshold"
+    assert len(via_retrieve) < len(PAGES)
+    assert all(_cosine(rag, d.page_content) >= threshold for d in via_retrieve)
+
+
+def test_reingest_invalidates_cached_results(rag):
+    _ingest(rag, PAGES, "v1")
+    first = rag.retrieve(COLL, QUERY, k=1, search_type="similarity")
+    assert "Eigenvalues" in first[0].page_content
+    assert rag.retrieval_cache.get(COLL, QUERY, 1, "similarity") == [first[0].id]
+
+    edited = ["Eigenvalues of a matrix are the roots of det(A - lambda I) = 0."] + PAGES[1:]
+    _ingest(rag, edited, "v2")
+
+    assert rag.retrieval_cache.get(COLL, QUERY, 1, "similarity") is None
+    second = rag.retrieve(COLL, QUERY, k=1, search_type="similarity")
+    assert second[0].page_content.startswith("Eigenvalues of a matrix are the roots")
+
+
+def test_unchanged_reingest_keeps_cached_results(rag):
+    _ingest(rag, PAGES, "v1")
+    first = rag.retrieve(COLL, QUERY, k=1, search_type="similarity")
+
+    _ingest(rag, PAGES, "v1")
+
+    assert rag.retrieval_cache.get(COLL, QUERY, 1, "similarity") == [first[0].id]
@@ -0,0 +1,132 @@
+"""Server restart-recovery tests — run with: python3 -m pytest test_server.py"""
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+sys.path.insert(0, ".")
+
+import agent_pool
+import server
+from task_store import TaskStore
+
+
+class FakeAgent:
+    """Records what each run was given and finishes without interrupts."""
+
+    def __init__(self):
+        self.inputs = []
+
+    async def astream_events(self, agent_input, config, version):
+        self.inputs.append(agent_input)
+        return
+        yield
+
+    async def aget_state(self, config):
+        return SimpleNamespace(values={"messages": [AIMessage("Saved the study guide.")]}, interrupts=(), tasks=())
+
+
+class RecordingScheduler:
+    full = False
+
+    def __init__(self):
+        self.runs = []
+
+    def submit(self, key, run, priority="interactive"):
+        self.runs.append(run)
+        return 0
+
+
+@pytest.fixture
+def app_state(tmp_path, monkeypatch):
+    """Server globals pointed at a throwaway task store and a fake agent."""
+    store = TaskStore(str(tmp_path / "tasks.sqlite"), server.Task)
+    pool = agent_pool.AgentPool(tools_check_interval_s=0)
+    agent = FakeAgent()
+
+    async def get():
+        return agent
+
+    monkeypatch.setattr(pool, "get", get)
+    monkeypatch.setattr(agent_pool, "_pool", pool)
+    monkeypatch.setattr(server, "_tasks", store)
+    monkeypatch.setattr(server, "_scheduler", RecordingScheduler())
+    monkeypatch.setattr(server, "_interrupt_events", {})
+
+    async def no_summary(task):
+        return None
+
+    monkeypatch.setattr(server, "_refresh_task_conversation_summary", no_summary)
+    yield SimpleNamespace(store=store, pool=pool, agent=agent, scheduler=server._scheduler)
+    store.close()
+
+
+def _checkpoint(pool, thread_id: str):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    pool.checkpointer.put(config, empty_checkpoint(), {}, {})
+
+
+def _awaiting(store) -> server.Task:
+    task = server.Task(
+        id="t1", message="Write a study guide", status="awaiting_approval", thread_id="task-t1",
+        interrupt_payload={"action_requests": [{"name": "write_file"}]},
+    )
+    store.add(task)
+    return task
+
+
+def test_approval_from_before_restart_resumes_from_checkpoint(app_state):
+    _awaiting(app_state.store)
+    _checkpoint(app_state.pool, "task-t1")
+    decisions = [{"type": "approve"}]
+
+    async def main():
+        out = await server.resolve_interrupt("t1", server.InterruptResponse(decisions=decisions))
+        assert out["status"] == "resumed"
+        await app_state.scheduler.runs[0]()
+
+    asyncio.run(main())
+
+    task = app_state.store.get("t1")
+    assert task.status == "completed" and task.result_summary == "Saved the study guide."
+    assert task.interrupt_payload is None
+    assert app_state.agent.inputs[0].resume == {"decisions": decisions}
+
+
+def test_approval_without_checkpoint_fails_clearly(app_state):
+    _awaiting(app_state.store)
+
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(server.resolve_interrupt("t1", server.InterruptResponse(decisions=[{"type": "approve"}])))
+
+    assert err.value.status_code == 409
+    assert app_state.store.get("t1").status == "failed"
+    assert not app_state.scheduler.runs
+
+
+def test_follow_up_on_lost_thread_is_rejected(app_state):
+    app_state.store.add(server.Task(id="t2", message="Hi", status="completed", thread_id="task-t2"))
+
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(server.send_follow_up("t2", server.FollowUpMessage(message="And eigenvectors?")))
+
+    assert err.value.status_code == 409
+    assert app_state.store.get("t2").status == "completed"
+
+
+def test_follow_up_continues_checkpointed_thread(app_state):
+    app_state.store.add(server.Task(id="t2", message="Hi", status="completed", thread_id="task-t2"))
+    _checkpoint(app_state.pool, "task-t2")
+
+    async def main():
+        await server.send_follow_up("t2", server.FollowUpMessage(message="And eigenvectors?"))
+        await app_state.scheduler.runs[0]()
+
+    asyncio.run(main())
+
+    assert app_state.agent.inputs == [{"messages": [{"role": "user", "content": "And eigenvectors?"}]}]
+    assert app_state.store.get("t2").status == "completed"
@@ -0,0 +1,170 @@
+"""Run scheduler tests — run with: python3 -m pytest test_task_scheduler.py"""
+import asyncio
+import sys
+
+import pytest
+
+sys.path.insert(0, ".")
+
+from task_scheduler import QueueFull, TaskScheduler
+
+
+class Tracker:
+    """Counts runs inside their slot and remembers the peak."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.order: list[str] = []
+
+    def run(self, key: str, hold: asyncio.Event | None = None):
+        async def _run():
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.order.append(key)
+            try:
+                if hold is not None:
+                    await hold.wait()
+                await asyncio.sleep(0)
+            finally:
+                self.running -= 1
+        return _run
+
+
+async def _settle(scheduler: TaskScheduler):
+    while scheduler._runs:
+        await asyncio.sleep(0.01)
+
+
+def test_priority_order():
+    async def main():
+        scheduler = TaskScheduler(workers=1, max_queue=10)
+        tracker = Tracker()
+        gate = asyncio.Event()
+        scheduler.submit("first", tracker.run("first", gate))
+        scheduler.submit("pdf", tracker.run("pdf"), "ambient")
+        assert scheduler.submit("chat", tracker.run("chat")) == 1   # ahead of the ambient run
+        gate.set()
+        await _settle(scheduler)
+        assert tracker.order == ["first", "chat", "pdf"]
+        assert tracker.peak == 1
+        assert scheduler.stats()["running"] == 0
+
+    asyncio.run(main())
+
+
+def test_queue_full():
+    async def main():
+        scheduler = TaskScheduler(workers=1, max_queue=1)
+        gate = asyncio.Event()
+        scheduler.submit("a", Tracker().run("a", gate))
+        scheduler.submit("b", Tracker().run("b"))
+        with pytest.raises(QueueFull):
+            scheduler.submit("c", Tracker().run("c"))
+        gate.set()
+        await _settle(scheduler)
+
+    asyncio.run(main())
+
+
+def test_paused_run_resumes_first():
+    async def main():
+        scheduler = TaskScheduler(workers=1, max_queue=10)
+        order = []
+        approved = asyncio.Event()
+
+        async def approval_run():
+            order.append("approval:start")
+            async with scheduler.paused("approval"):
+                await approved.wait()
+            order.append("approval:resumed")
+
+        release_b = asyncio.Event()
+
+        async def other(key, hold=None):
+            order.append(key)
+            if hold is not None:
+                await hold.wait()
+
+        scheduler.submit("approval", approval_run)
+        scheduler.submit("b", lambda: other("b", release_b))
+        await asyncio.sleep(0.01)           # b holds the slot the approval gave up
+        scheduler.submit("c", lambda: other("c"))
+        approved.set()
+        await asyncio.sleep(0.01)           # approval re-queues ahead of c
+        release_b.set()
+        await _settle(scheduler)
+        assert order == ["approval:start", "b", "approval:resumed", "c"]
+
+    asyncio.run(main())
+
+
+def test_cancel_during_requeue_keeps_slot_count():
+    async def main():
+        scheduler = TaskScheduler(workers=1, max_queue=10)
+        tracker = Tracker()
+        approved = asyncio.Event()
+        release_b = asyncio.Event()
+
+        async def approval_run():
+            async with scheduler.paused("approval"):
+                await approved.wait()
+
+        scheduler.submit("approval", approval_run)
+        await asyncio.sleep(0)
+        scheduler.submit("b", tracker.run("b", release_b))
+        await asyncio.sleep(0)
+        scheduler.submit("c", tracker.run("c"))
+        approved.set()                      # approval re-queues behind b, ahead of c
+        await asyncio.sleep(0.01)
+        assert scheduler.position("approval") == 1
+
+        scheduler._runs["approval"].cancel()
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["running"] == 1
+        assert tracker.order == ["b"]       # c must still be waiting for b's slot
+
+        release_b.set()
+        await _settle(scheduler)
+        assert tracker.peak == 1
+        assert scheduler.stats()["running"] == 0
+
+    asyncio.run(main())
+
+
+def test_cancel_after_resume_handover_releases_once():
+    async def main():
+        scheduler = TaskScheduler(workers=1, max_queue=10)
+        tracker = Tracker()
+        approved = asyncio.Event()
+        release_b = asyncio.Event()
+
+        async def approval_run():
+            async with scheduler.paused("approval"):
+                await approved.wait()
+
+        async def b_run():
+            await release_b.wait()
+            # Cancel the approval run after b's slot is handed to it but
+            # before it wakes up.
+            asyncio.get_running_loop().call_soon(scheduler._runs["approval"].cancel)
+
+        scheduler.submit("approval", approval_run)
+        await asyncio.sleep(0)
+        scheduler.submit("b", b_run)
+        await asyncio.sleep(0)
+        approved.set()
+        await asyncio.sleep(0.01)
+        scheduler.submit("c", tracker.run("c", asyncio.Event()))   # holds its slot
+        scheduler.submit("d", tracker.run("d"))
+        release_b.set()
+        await asyncio.sleep(0.05)
+
+        assert tracker.order == ["c"]
+        assert scheduler.stats()["running"] == 1
+        assert scheduler.position("d") == 1
+        for task in list(scheduler._runs.values()):
+            task.cancel()
+        await _settle(scheduler)
+
+    asyncio.run(main())
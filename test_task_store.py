@@ -0,0 +1,98 @@
+"""Task store tests — run with: python3 -m pytest test_task_store.py"""
+import asyncio
+import sys
+
+sys.path.insert(0, ".")
+
+from langgraph.checkpoint.base import empty_checkpoint
+from pydantic import BaseModel
+
+from agent_pool import AgentPool
+from task_store import TaskStore
+
+
+class Task(BaseModel):
+    id: str
+    status: str = "pending"
+    thread_id: str = ""
+    created_at: str = ""
+    completed_at: str = ""
+    result_summary: str = ""
+    source: str = "user"
+
+
+def _task(i: int, status: str = "completed") -> Task:
+    return Task(id=f"t{i}", status=status, thread_id=f"task-t{i}", created_at=f"2026-01-{i + 1:02d}T00:00:00")
+
+
+def test_trim_keeps_newest_and_reports_evicted(tmp_path):
+    evicted = []
+    store = TaskStore(str(tmp_path / "tasks.sqlite"), Task, retention_days=0, max_tasks=3, on_evict=evicted.extend)
+    for i in range(5):
+        store.add(_task(i))
+    store.add(_task(5, status="running"))    # live work is never trimmed
+
+    assert store.compact() == {"expired": 0, "trimmed": 3}
+    assert sorted(t.id for t in evicted) == ["t0", "t1", "t2"]
+    assert [t.id for t in store.list()] == ["t5", "t4", "t3"]
+    assert store.get("t0") is None
+    store.close()
+
+
+def test_expired_tasks_leave_the_checkpointer(tmp_path):
+    pool = AgentPool(tools_check_interval_s=0)
+
+    def forget(tasks):
+        for task in tasks:
+            asyncio.run(pool.forget(task.thread_id))
+
+    store = TaskStore(str(tmp_path / "tasks.sqlite"), Task, retention_days=30, max_tasks=0, on_evict=forget)
+    old = _task(0)
+    recent = Task(id="recent", status="completed", thread_id="task-recent", created_at="2999-01-01T00:00:00")
+    for task in (old, recent):
+        store.add(task)
+        config = {"configurable": {"thread_id": task.thread_id, "checkpoint_ns": ""}}
+        pool.checkpointer.put(config, empty_checkpoint(), {}, {})
+
+    assert store.compact()["expired"] == 1
+    assert pool.checkpointer.get(pool.config_for(old.thread_id)) is None
+    assert pool.checkpointer.get(pool.config_for(recent.thread_id)) is not None
+    store.close()
+
+
+def test_recover_keeps_resumable_approvals(tmp_path):
+    path = str(tmp_path / "tasks.sqlite")
+    store = TaskStore(path, Task)
+    store.add(_task(0, status="running"))
+    store.add(_task(1, status="awaiting_approval"))
+    store.close()
+
+    store = TaskStore(path, Task)
+    assert store.recover(keep=("awaiting_approval",)) == 1
+    assert store.get("t0").status == "failed"
+    assert store.get("t1").status == "awaiting_approval"
+    store.close()
+
+
+def test_checkpoints_survive_a_new_pool(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    config = {"configurable": {"thread_id": "task-t1", "checkpoint_ns": ""}}
+
+    async def first_process():
+        pool = AgentPool(tools_check_interval_s=0)
+        await pool.open_checkpoints(path)
+        await pool.checkpointer.aput(config, empty_checkpoint(), {}, {})
+        await pool.close_checkpoints()
+
+    async def second_process():
+        pool = AgentPool(tools_check_interval_s=0)
+        await pool.open_checkpoints(path)
+        try:
+            found = await pool.has_thread("task-t1"), await pool.has_thread("task-t2")
+            await pool.forget("task-t1")
+            return found, await pool.has_thread("task-t1")
+        finally:
+            await pool.close_checkpoints()
+
+    asyncio.run(first_process())
+    assert asyncio.run(second_process()) == ((True, False), False)
@@ -0,0 +1,42 @@
+"""Vector session tests — run with: python3 -m pytest test_vector_session.py"""
+import sys
+
+sys.path.insert(0, ".")
+
+from chromadb.api.models.Collection import Collection
+
+from compact_index import CompactIndexStore
+from embedding_backends import HashedNgramEmbeddings
+from vector_session import VectorSession, _HNSW_OVERHEAD_BYTES
+
+
+def _session(tmp_path, **kwargs) -> VectorSession:
+    embeddings = HashedNgramEmbeddings(dim=32)
+    session = VectorSession(str(tmp_path / "chroma"), lambda: embeddings, **kwargs)
+    texts = ["eigenvalues", "determinants", "null space"]
+    session.vectorstore("algebra")._collection.add(
+        ids=["a", "b", "c"], embeddings=embeddings.embed_documents(texts), documents=texts,
+    )
+    session.invalidate()
+    return session
+
+
+def test_estimate_uses_dimension_hint_without_reading_vectors(tmp_path, monkeypatch):
+    compact = CompactIndexStore(str(tmp_path / "compact"))
+    compact.build("algebra", ["a", "b", "c"], HashedNgramEmbeddings(dim=32).embed_documents(["x", "y", "z"]))
+    session = _session(tmp_path, dimension_hint=compact.dimension)
+    get = Collection.get
+
+    def no_embeddings(self, *args, **kwargs):
+        assert "embeddings" not in (kwargs.get("include") or []), "peeked at a vector"
+        return get(self, *args, **kwargs)
+
+    monkeypatch.setattr(Collection, "get", no_embeddings)
+    session.vectorstore("algebra")
+    assert session.stats()["resident_bytes"] == 3 * (32 * 4 + _HNSW_OVERHEAD_BYTES)
+
+
+def test_estimate_peeks_without_hint(tmp_path):
+    session = _session(tmp_path, dimension_hint=lambda name: None)
+    session.vectorstore("algebra")
+    assert session.stats()["resident_bytes"] == 3 * (32 * 4 + _HNSW_OVERHEAD_BYTES)
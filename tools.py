@@ -23,15 +23,22 @@ from typing_extensions import Annotated, Literal
 from dotenv import load_dotenv
 
 from RAG import (
-    get_retriever,
-    setup_retriever,
+    retrieve,
+    retrieve_many,
+    route,
     persist_directory,
     collection_name_from_filename,
     list_collections,
     embedding_model,
     chunk_size,
     chunk_overlap,
+    context_packing,
+    context_max_tokens,
+    context_merge_gap,
+    SEARCH_TYPES,
 )
+from context_packing import pack_context
+from ingest_worker import get_ingest_worker
 
 load_dotenv()
 
@@ -58,12 +65,37 @@ def _fetch_webpage(url: str, timeout: float = 10.0) -> str:
         return f"Error fetching {url}: {e}"
 
 
+def _format_chunks(hits: list, show_collection: bool) -> str:
+    """Render ``(collection, document)`` hits, best first, for the agent.
+
+    With ``rag.context_packing`` enabled, overlapping / adjacent chunks from
+    the same page are merged, duplicates dropped and the text trimmed to
+    the token budget.
+    """
+    if context_packing:
+        passages = pack_context(hits, context_max_tokens, context_merge_gap)
+        items = [(p.collection, p.page, p.text) for p in passages]
+    else:
+        items = [(coll, d.metadata.get("page"), d.page_content) for coll, d in hits]
+
+    parts = []
+    for i, (coll, page, text) in enumerate(items):
+        labels = []
+        if show_collection and coll:
+            labels.append(f"collection: {coll}")
+        if isinstance(page, int):
+            labels.append(f"p. {page + 1}")
+        suffix = f" ({', '.join(labels)})" if labels else ""
+        parts.append(f"**Chunk {i+1}**{suffix}:\n{text}")
+    return "\n\n---\n\n".join(parts)
+
+
 # ---------------------------------------------------------------------------
 # Retrieval
 # ---------------------------------------------------------------------------
 
 @tool
-def retrieval_tool(query: str, collection: str | None = None) -> str:
+def retrieval_tool(query: str, collection: str | None = None, search_type: str | None = None) -> str:
     """Search the vector database for lecture-note content relevant to *query*.
 
     **When to use this tool**
@@ -71,9 +103,21 @@ def retrieval_tool(query: str, collection: str | None = None) -> str:
       generate flashcards, or write revision material.
     - Always prefer this over web search — lecture notes are the primary source.
 
-        **Required collection selection**
-        - You must pass an explicit collection name.
-        - Call ``list_collections_tool`` first, then choose one collection.
+        **Collection selection**
+        - Pass an explicit collection name when you know it.
+        - Pass ``collection="auto"`` to let the router pick the most relevant
+          collection for the query (no ``list_collections_tool`` call needed).
+        - If unsure which collection holds the topic, pass ``collection="all"``
+          (or a comma-separated list of names) — this searches them all in one
+          call and labels each chunk with its collection.  Prefer this over
+          calling ``list_collections_tool`` and guessing.
+
+        **Search type** (optional — omit to use the configured default)
+        - ``"mmr"``: diverse results — use for broad topics so the chunks
+          cover different aspects instead of repeating one page.
+        - ``"threshold"``: only clearly relevant chunks; may return nothing.
+        - ``"bm25"`` / ``"hybrid"``: exact terms such as "Theorem 3.9".
+        - ``"similarity"``: plain nearest neighbours.
 
         **Tips for good queries**
     - Be specific: "definition of eigenvalue" beats "eigenvalues".
@@ -89,29 +133,55 @@ def retrieval_tool(query: str, collection: str | None = None) -> str:
     query : str
         Natural-language search query.
     collection : str, optional
-        ChromaDB collection to search. If omitted, this call is rejected.
-        Call ``list_collections_tool`` to see what's available first.
+        ChromaDB collection to search, ``"auto"`` to route to the best
+        match, ``"all"`` for every collection, or a comma-separated list of
+        names.  If omitted, this call is rejected.
+    search_type : str, optional
+        ``similarity``, ``mmr``, ``threshold``, ``bm25`` or ``hybrid``.
+        Applies to single-collection searches; multi-collection searches
+        always rank by similarity.
 
     Returns
     -------
     str
-        Formatted document chunks, or a "no results" message.
+        Formatted passages, best first, or a "no results" message.
+        Overlapping chunks from the same page are merged into one passage
+        and the total is capped to a token budget.
     """
+    if search_type and search_type not in SEARCH_TYPES:
+        return f"❌ Unknown search_type '{search_type}'. Use one of: {', '.join(SEARCH_TYPES)}."
     if not collection:
         return (
-            "❌ No collection specified. Call ``list_collections_tool`` first, "
-            "then call retrieval_tool again with an explicit collection name."
+            "❌ No collection specified. Pass a collection name, or "
+            "collection='all' to search every collection at once."
         )
 
-    retriever = get_retriever(collection)
-    docs = retriever.invoke(query)
+    routed_note = ""
+    if collection.strip().lower() == "auto":
+        ranked = route(query, limit=1)
+        if not ranked:
+            return "No collections exist yet. Ingest a PDF first with ``ingest_pdf_tool``."
+        collection = ranked[0][0]
+        routed_note = f"_(auto-routed to collection '{collection}')_\n\n"
+
+    names = [c.strip() for c in collection.split(",") if c.strip()]
+    if collection.strip().lower() == "all" or len(names) > 1:
+        scope = None if collection.strip().lower() == "all" else names
+        hits = retrieve_many(query, scope)
+        if not hits:
+            return (
+                "No relevant chunks found in any collection.  Try rephrasing your "
+                "query, or ingest the relevant PDF first."
+            )
+        return _format_chunks([(coll, d) for coll, d, _distance in hits], show_collection=True)
+
+    docs = retrieve(names[0], query, search_type=search_type)
     if not docs:
         return (
             "No relevant chunks found.  Try rephrasing your query, or use "
             "``list_collections_tool`` to check you're searching the right collection."
         )
-    parts = [f"**Chunk {i+1}:**\n{d.page_content}" for i, d in enumerate(docs)]
-    return "\n\n---\n\n".join(parts)
+    return routed_note + _format_chunks([(names[0], d) for d in docs], show_collection=False)
 
 
 @tool
@@ -137,7 +207,7 @@ def list_collections_tool() -> str:
 # ---------------------------------------------------------------------------
 
 @tool
-def ingest_pdf_tool(pdf_file_path: str, collection: str | None = None) -> str:
+async def ingest_pdf_tool(pdf_file_path: str, collection: str | None = None) -> str:
     """Ingest a PDF into the vector database so its content becomes searchable.
 
     **When to use this tool**
@@ -145,8 +215,8 @@ def ingest_pdf_tool(pdf_file_path: str, collection: str | None = None) -> str:
     - The user explicitly asks to add a document.
 
     **Idempotency note**
-    - Calling this twice on the same PDF will create duplicate chunks.
-      Check the manifest or ``list_collections_tool`` first.
+    - Safe to call again on the same PDF: unchanged files are skipped, and an
+      edited PDF only adds new/changed chunks and removes deleted ones.
 
     Parameters
     ----------
@@ -169,7 +239,8 @@ def ingest_pdf_tool(pdf_file_path: str, collection: str | None = None) -> str:
 
     coll = collection or collection_name_from_filename(pdf_file_path)
     try:
-        setup_retriever(str(path), coll)
+        # Runs on the ingest worker so the server's event loop stays responsive.
+        await get_ingest_worker().ingest(str(path), coll)
         return (
             f"✅ Ingested '{path.name}' into collection '{coll}'.\n"
             f"You can now search it with retrieval_tool(query, collection='{coll}')."
@@ -0,0 +1,217 @@
+"""
+Process-wide vector-store session.
+
+Opening a ``chromadb.PersistentClient`` starts Chroma's system components
+and reads its SQLite catalogue; wrapping a collection in ``Chroma`` loads
+its HNSW segment on first query.  Doing that per call made
+``list_collections_tool`` and every cold retrieval pay start-up costs.
+
+``VectorSession`` owns a single client, a single query-embedding object
+and one ``Chroma`` handle per collection, all created lazily and shared
+across threads.  Ingestion calls ``invalidate`` for the collections it
+touches so the next lookup picks up a fresh handle.
+
+Handles are kept in a bounded LRU.  Each is charged an estimate of its
+HNSW index size; when the number of resident collections or their total
+estimated bytes exceeds the budget, the least-recently-used handles are
+dropped and eviction listeners are told so they can release their own
+per-collection memory.  The same byte budget is handed to Chroma's
+segment cache so the index memory itself is released, not just our
+reference to it.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
+
+# Per-vector HNSW overhead on top of the float32 vector: 2 * M neighbour
+# links (Chroma's default M is 16) plus label / bookkeeping.
+_HNSW_OVERHEAD_BYTES = 2 * 16 * 4 + 16
+
+
+def estimate_index_bytes(handle: Chroma, dim: int | None = None) -> int:
+    """Rough resident size of a collection's HNSW index.
+
+    ``count()`` is answered from Chroma's catalogue.  Reading a vector to
+    learn the dimension would load the HNSW segment, so that is only done
+    when *dim* isn't supplied.
+    """
+    collection = handle._collection
+    count = collection.count()
+    if not count:
+        return 0
+    if dim is None:
+        peek = collection.get(limit=1, include=["embeddings"])
+        embeddings = peek.get("embeddings")
+        dim = len(embeddings[0]) if embeddings is not None and len(embeddings) else 0
+    return count * (dim * 4 + _HNSW_OVERHEAD_BYTES)
+
+
+class VectorSession:
+    """Shared Chroma client + bounded LRU of per-collection handles.
+
+    Parameters
+    ----------
+    persist_directory : str
+        Chroma persistence directory.
+    embeddings_factory : callable
+        Zero-argument callable returning the ``Embeddings`` used for
+        queries.  Called once, on first use.
+    max_collections : int, optional
+        Most collection handles kept open at once.
+    memory_budget_mb : float, optional
+        Upper bound on the estimated index memory of open handles.
+    dimension_hint : callable, optional
+        ``dimension_hint(collection)`` returning the vector dimension from
+        somewhere cheaper than the index, or ``None`` if unknown.
+    """
+
+    def __init__(
+        self,
+        persist_directory: str,
+        embeddings_factory,
+        max_collections: int | None = None,
+        memory_budget_mb: float | None = None,
+        dimension_hint=None,
+    ):
+        self.persist_directory = persist_directory
+        self._dimension_hint = dimension_hint
+        self._embeddings_factory = embeddings_factory
+        self.max_collections = max_collections
+        self.budget_bytes = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+        self._lock = threading.RLock()
+        self._reopen = threading.Condition(self._lock)
+        self._closed: set[str] = set()
+        self._client = None
+        self._embeddings: Embeddings | None = None
+        self._handles: OrderedDict[str, tuple[Chroma, int]] = OrderedDict()
+        self._resident_bytes = 0
+        self._listeners: list = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                import chromadb
+                from chromadb.config import Settings
+                settings = Settings()
+                if self.budget_bytes:
+                    settings = Settings(
+                        chroma_segment_cache_policy="LRU",
+                        chroma_memory_limit_bytes=self.budget_bytes,
+                    )
+                self._client = chromadb.PersistentClient(path=self.persist_directory, settings=settings)
+            return self._client
+
+    @property
+    def embeddings(self) -> Embeddings:
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = self._embeddings_factory()
+            return self._embeddings
+
+    def list_collections(self) -> list[str]:
+        return [c.name for c in self.client.list_collections()]
+
+    def add_eviction_listener(self, fn):
+        """Call ``fn(collection)`` whenever a handle is evicted or invalidated."""
+        self._listeners.append(fn)
+
+    def vectorstore(self, collection: str) -> Chroma:
+        """The shared ``Chroma`` handle for *collection* (created if missing)."""
+        with self._lock:
+            while collection in self._closed:
+                self._reopen.wait()
+            entry = self._handles.get(collection)
+            if entry is not None:
+                self._handles.move_to_end(collection)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            handle = Chroma(
+                client=self.client,
+                collection_name=collection,
+                embedding_function=self.embeddings,
+            )
+            dim = self._dimension_hint(collection) if self._dimension_hint else None
+            size = estimate_index_bytes(handle, dim)
+            self._handles[collection] = (handle, size)
+            self._resident_bytes += size
+            evicted = self._evict_locked(keep=collection)
+        self._notify(evicted)
+        return handle
+
+    def _evict_locked(self, keep: str) -> list[str]:
+        evicted: list[str] = []
+        while len(self._handles) > 1 and (
+            (self.max_collections and len(self._handles) > self.max_collections)
+            or (self.budget_bytes and self._resident_bytes > self.budget_bytes)
+        ):
+            name = next(iter(self._handles))
+            if name == keep:
+                break
+            _handle, size = self._handles.pop(name)
+            self._resident_bytes -= size
+            evicted.append(name)
+        self.evictions += len(evicted)
+        return evicted
+
+    def _notify(self, collections: list[str]):
+        for name in collections:
+            for fn in self._listeners:
+                fn(name)
+
+    def invalidate(self, collection: str | None = None):
+        """Drop the handle for *collection*, or every handle if ``None``."""
+        with self._lock:
+            names = list(self._handles) if collection is None else [collection]
+            dropped = []
+            for name in names:
+                entry = self._handles.pop(name, None)
+                if entry is not None:
+                    self._resident_bytes -= entry[1]
+                    dropped.append(name)
+        self._notify(dropped)
+
+    @contextmanager
+    def closed(self, collection: str):
+        """Drop *collection*'s handle and hold new lookups until the block exits.
+
+        ``reindex`` renames collections underneath their names; without this
+        a lookup in between would get a handle to the wrong collection, or
+        create an empty one under the name being swapped in.
+        """
+        with self._lock:
+            while collection in self._closed:
+                self._reopen.wait()
+            self._closed.add(collection)
+        try:
+            self.invalidate(collection)
+            yield
+        finally:
+            with self._lock:
+                self._closed.discard(collection)
+                self._reopen.notify_all()
+
+    def resident(self) -> list[str]:
+        """Collections that currently have an open handle, oldest first."""
+        with self._lock:
+            return list(self._handles)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resident": [{"collection": n, "bytes": e[1]} for n, e in self._handles.items()],
+                "resident_bytes": self._resident_bytes,
+                "budget_bytes": self.budget_bytes,
+                "max_collections": self.max_collections,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }